@@ -0,0 +1,182 @@
+from __future__ import annotations
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from src.main.core.infra.local_storage import LocalFileSystemClient
+from src.main.synthetic.cnes import generate_bronze
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_SCALES = [0.25, 1.0, 4.0]
+# período fixo: resultados comparáveis entre commits, independente da data de hoje
+DEFAULT_MONTHS = ["202401", "202402", "202403", "202404", "202405", "202406"]
+DEFAULT_OUT = "./local_storage/bench/results.jsonl"
+DEFAULT_ROOT = "./local_storage/bench/datalake"
+MARKER = "__BENCH_RESULT__ "
+
+
+def git_revision() -> tuple[str | None, bool]:
+    """(commit, dirty) do checkout atual; (None, False) fora de um repositório git."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def _run_unit(job: str, year_month: str | None, storage_root: str) -> dict:
+    """Roda um job num processo novo (RSS de pico isolado) contra o storage local."""
+    env = {
+        **os.environ,
+        "STORAGE_BACKEND": "local",
+        "STORAGE_LOCAL_ROOT": storage_root,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])),
+    }
+    cmd = [sys.executable, "-m", "src.main.bench.worker", "--job", job]
+    if year_month:
+        cmd += ["--year-month", year_month]
+
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    process_wall = time.perf_counter() - t0
+
+    record = None
+    for line in proc.stdout.splitlines():
+        if line.startswith(MARKER):
+            record = json.loads(line[len(MARKER):])
+    if record is None:
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or [""]
+        record = {"job": job, "status": "error", "error": f"worker saiu com código {proc.returncode}: {tail[0]}"}
+    record["process_wall_s"] = round(process_wall, 4)
+    return record
+
+
+def _result_row(base: dict, stage: str, record: dict) -> dict:
+    phases: dict[str, float] = {}
+    for p in record.get("phases", []):
+        phases[p["phase"]] = round(phases.get(p["phase"], 0.0) + p["wall_s"], 4)
+    return {
+        **base,
+        "stage": stage,
+        "job": record.get("job"),
+        "year_month": record.get("year_month"),
+        "status": record.get("status"),
+        "error": record.get("error"),
+        "wall_s": record.get("wall_s"),
+        "cpu_s": record.get("cpu_s"),
+        "process_wall_s": record.get("process_wall_s"),
+        "peak_rss_mb": record.get("peak_rss_mb"),
+        "bytes": record.get("bytes"),
+        "bytes_read": record.get("bytes_read"),
+        "bytes_written": record.get("bytes_written"),
+        "rows_in": record.get("rows_in"),
+        "rows_out": record.get("rows_out"),
+        "phases_wall_s": phases,
+    }
+
+
+def run_benchmark(scales: list[float] | None = None, year_months: list[str] | None = None,
+                  jobs: list[str] | None = None, out_path: str = DEFAULT_OUT, root: str = DEFAULT_ROOT,
+                  seed: int = 42, keep_data: bool = False) -> list[dict]:
+    """
+    Para cada escala: gera o bronze sintético num data lake local novo e roda,
+    na ordem do pipeline, cada unidade (job, mês) num processo separado.
+    Cada unidade vira uma linha JSON em out_path (append), marcada com o
+    commit, para comparar execuções com compare_results().
+    """
+    from src.main.data_domains.registry import pipeline_units
+
+    scales = scales or DEFAULT_SCALES
+    year_months = sorted(year_months or DEFAULT_MONTHS)
+    commit, dirty = git_revision()
+    run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:6]}"
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+
+    rows = []
+    for scale in scales:
+        storage_root = os.path.abspath(os.path.join(root, f"scale_{scale:g}"))
+        shutil.rmtree(storage_root, ignore_errors=True)
+
+        t0 = time.perf_counter()
+        counts = generate_bronze(LocalFileSystemClient(os.path.join(storage_root, "bronze")),
+                                 year_months, scale=scale, seed=seed)
+        print(f"→ escala {scale:g}: bronze sintético gerado em {time.perf_counter() - t0:.1f}s "
+              f"({sum(c.get('tbCargaHorariaSus', 0) for c in counts.values() if isinstance(c, dict))} vínculos)")
+
+        base = {
+            "run_id": run_id,
+            "commit": commit,
+            "dirty": dirty,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "scale": scale,
+            "seed": seed,
+            "n_months": len(year_months),
+        }
+        for stage, job, ym in pipeline_units(year_months, jobs=jobs):
+            row = _result_row(base, stage, _run_unit(job, ym, storage_root))
+            rows.append(row)
+            with open(out_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+            flag = "✓" if row["status"] == "ok" else "✗"
+            print(f"  {flag} {job:<34} {ym or '-':<7} {row['wall_s'] or 0:>8.2f}s "
+                  f"{row['peak_rss_mb'] or 0:>8.0f} MB" + (f"  {row['error']}" if row["error"] else ""))
+
+        if not keep_data:
+            shutil.rmtree(storage_root, ignore_errors=True)
+
+    print(f"Resultados: {out_path} (run_id={run_id}, commit={commit}{'+dirty' if dirty else ''})")
+    return rows
+
+
+def load_results(path: str = DEFAULT_OUT) -> pd.DataFrame:
+    with open(path, encoding="utf-8") as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
+
+
+def compare_results(path: str = DEFAULT_OUT, base: str | None = None, head: str | None = None) -> pd.DataFrame:
+    """
+    Compara dois commits (default: os dois últimos do arquivo) por (job, escala).
+    wall_s = soma dos meses de uma execução (mediana entre execuções do mesmo
+    commit); peak_rss_mb = máximo. ratio > 1 -> head mais lento/pesado.
+    """
+    df = load_results(path)
+    df = df[df["status"] == "ok"].copy()
+    df["commit"] = df["commit"].fillna("unknown").str[:10]
+    commits = list(dict.fromkeys(df.sort_values("created_at")["commit"]))
+    if head is None:
+        head = commits[-1] if commits else None
+    if base is None:
+        older = [c for c in commits if c != head[:10]] if head else []
+        base = older[-1] if older else None
+    if base is None or head is None:
+        raise ValueError("São necessários resultados de dois commits para comparar")
+    base, head = base[:10], head[:10]
+
+    per_run = (df[df["commit"].isin([base, head])]
+               .groupby(["commit", "run_id", "scale", "job"], as_index=False)
+               .agg(wall_s=("wall_s", "sum"), peak_rss_mb=("peak_rss_mb", "max")))
+    agg = per_run.groupby(["commit", "scale", "job"], as_index=False).agg(
+        wall_s=("wall_s", "median"), peak_rss_mb=("peak_rss_mb", "max"))
+
+    b = agg[agg["commit"] == base].drop(columns="commit")
+    h = agg[agg["commit"] == head].drop(columns="commit")
+    out = b.merge(h, on=["scale", "job"], how="outer", suffixes=("_base", "_head"))
+    out["wall_ratio"] = (out["wall_s_head"] / out["wall_s_base"]).round(3)
+    out["rss_ratio"] = (out["peak_rss_mb_head"] / out["peak_rss_mb_base"]).round(3)
+    out.attrs.update(base=base, head=head)
+    return out.sort_values(["scale", "job"]).reset_index(drop=True)
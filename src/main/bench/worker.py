@@ -0,0 +1,39 @@
+"""
+Processo de uma unidade do benchmark: roda um job sob o profiler e imprime o
+registro (wall/CPU/bytes/linhas/RSS por fase) numa linha com MARKER.
+O runner define STORAGE_BACKEND=local e STORAGE_LOCAL_ROOT antes de chamar.
+"""
+import argparse
+import json
+import sys
+import traceback
+
+from src.main.bench.runner import MARKER
+from src.main.core.infra.profiling import profiler
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="bench-worker")
+    p.add_argument("--job", required=True)
+    p.add_argument("--year-month")
+    args = p.parse_args(argv)
+
+    from src.main.data_domains.registry import get_job
+
+    JobCls = get_job(args.job)
+    kwargs = {"year_month": args.year_month} if args.year_month else {}
+    ok = True
+    try:
+        with profiler.job(args.job, year_month=args.year_month):
+            JobCls(**kwargs).run()
+    except Exception:
+        traceback.print_exc()
+        ok = False
+
+    record = next(j for j in reversed(profiler.jobs) if j["job"] == args.job)
+    print(MARKER + json.dumps(record, ensure_ascii=False, default=str))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
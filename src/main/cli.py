@@ -3,19 +3,31 @@ from __future__ import annotations
 
 import argparse
 import inspect
+import os
+import subprocess
+import sys
 from typing import Any, Dict
 from datetime import date
 from dateutil.relativedelta import relativedelta
 
-from .data_domains.registry import list_jobs, get_job
+from .data_domains.registry import list_jobs, get_job, pipeline_units, STAGES
 from .extract.extractor import Extractor
+from .core.layers.models import ArtifactStore
+from .core.infra.profiling import profiler
+from .core.infra.journal import RunJournal
+from .core.infra.local_storage import LocalFileSystemClient
+from .core.infra.storage import artifacts as artifacts_store, bronze as bronze_store
 
 
 # ------------ helpers ------------
+def _accepts(JobCls, param: str) -> bool:
+    return param in inspect.signature(JobCls.__init__).parameters
+
+
 def _build_kwargs_for(JobCls, args) -> Dict[str, Any]:
     """
     Monta kwargs dinamicamente com base na assinatura de __init__ do job.
-    Suporta year_month e artifact_name (se existirem na assinatura).
+    Suporta year_month, artifact_name e compression (se existirem na assinatura).
     """
     sig = inspect.signature(JobCls.__init__)
     params = sig.parameters
@@ -28,6 +40,9 @@ def _build_kwargs_for(JobCls, args) -> Dict[str, Any]:
     if "artifact_name" in params and getattr(args, "artifact_name", None) is not None:
         kwargs["artifact_name"] = args.artifact_name
 
+    if "compression" in params and getattr(args, "compression", None) is not None:
+        kwargs["compression"] = args.compression
+
     return kwargs
 
 
@@ -43,8 +58,9 @@ def cmd_run(args):
     kwargs = _build_kwargs_for(JobCls, args)
 
     print(f"→ Executando job `{args.job}` …")
-    job = JobCls(**kwargs)
-    job.run()
+    with profiler.job(args.job, year_month=kwargs.get("year_month")):
+        job = JobCls(**kwargs)
+        job.run()
     print(f"✓ `{args.job}` concluído com sucesso.")
 
 
@@ -57,80 +73,292 @@ def cmd_run_all(args):
     for key, JobCls in jobs.items():
         kwargs = _build_kwargs_for(JobCls, args)
         print(f"→ Executando `{key}` …")
-        job = JobCls(**kwargs)
-        job.run()
+        with profiler.job(key, year_month=kwargs.get("year_month")):
+            job = JobCls(**kwargs)
+            job.run()
         print(f"✓ `{key}` concluído\n")
 
 
 def cmd_extract(args):
     ex = Extractor(year_month=args.year_month, months_back=args.months_back)
     print(f"→ Extraindo CNES para {ex.year_month} …")
-    ex.download_zip()
-    ex.extract_zip()
-    ex.upload_to_datalake()
-    ex.cleanup()
+    with profiler.job("extract", year_month=ex.year_month):
+        ex.download_zip()
+        ex.extract_zip()
+        ex.upload_to_datalake()
+        ex.cleanup()
     print(f"✓ Bronze concluído para {ex.year_month}.")
 
+def cmd_artifacts(args):
+    store = ArtifactStore()
+    if args.version or args.latest:
+        meta = store.metadata(args.name, args.version)
+        for k, v in meta.items():
+            print(f"  {k}: {v}")
+        return
+
+    df = store.compare(args.name)
+    if df.empty:
+        print(f"Nenhuma versão em artifacts/{args.name}")
+        return
+    latest = (store.latest(args.name) or {}).get("version")
+    df["latest"] = df["version"].eq(latest).map({True: "*", False: ""})
+    print(df.to_string(index=False))
+
+
+PIPELINE_STAGES = ["extract", *STAGES]
+_STAGE_TITLES = {
+    "extract": "[1/4] Extraindo CNES (bronze)",
+    "table": "[2/4] Atualizando tabelas (silver/gold)",
+    "model": "[3/4] Treinando modelos e salvando artefatos",
+    "score": "[4/4] Pontuando o período mais recente",
+}
+
+
+def _resolve_year_months(args) -> list[str]:
+    if args.year_month:
+        return [args.year_month]
+    today = date.today().replace(day=1)
+    year_months = [
+        (today - relativedelta(months=i)).strftime("%Y%m")
+        for i in range(args.months_back)
+    ]
+    year_months.reverse()  # roda do mais antigo → mais novo
+    return year_months
+
+
+def _journal_fs(kind: str):
+    # "lake": artifacts/runs/<run_id>/ (junto do relatório de perfil); "local": ./local_storage/runs/<run_id>/
+    return artifacts_store.fs if kind == "lake" else LocalFileSystemClient("./local_storage")
+
+
+def _run_pipeline_unit(stage: str, job: str, ym: str | None, params: dict) -> list[str]:
+    """Executa uma unidade e devolve onde gravou (registrado no journal)."""
+    with profiler.job(job, year_month=ym):
+        if stage == "extract":
+            ex = Extractor(year_month=ym)
+            ex.download_zip()
+            ex.extract_zip()
+            ex.upload_to_datalake()
+            ex.cleanup()
+            return [f"bronze{ex.datalake_target_path}/"]
+
+        JobCls = get_job(job)
+        if stage == "table":
+            # tabelas sem year_month (ex.: populacao) são cargas completas
+            instance = JobCls(year_month=ym) if ym else JobCls()
+        else:
+            instance = JobCls(**_build_kwargs_for(JobCls, argparse.Namespace(**params)))
+        # jobs são singletons: numa nova tentativa a instância é a mesma, e as saídas
+        # da tentativa anterior não podem ir para o journal
+        if hasattr(instance, "outputs"):
+            instance.outputs = []
+        instance.run()
+        return list(getattr(instance, "outputs", []))
+
+
 def cmd_pipeline(args):
     """
-    Pipeline completo:
-    - extract (bronze)
-    - tables (silver/gold)
+    Pipeline completo, em unidades (stage, job, mês) registradas num journal:
+    - extract (bronze), um por mês
+    - tables: silver mês a mês; gold full (ex.: metrics) uma vez; gold mensal mês a mês
     - models (artifacts)
+    - score (gold/cnes_predictions)
+
+    --resume <run_id> pula as unidades já concluídas daquela execução (com os
+    mesmos meses/parâmetros); --from-stage refaz a partir de uma etapa.
+    Falhas são repetidas por unidade, com backoff exponencial.
     """
+    fs = _journal_fs(args.journal)
+    if args.resume:
+        journal = RunJournal.load(fs, args.resume)
+        print(f"→ Retomando execução {journal.run_id} …")
+    else:
+        journal = RunJournal(fs, profiler.run_id, params={
+            "year_months": _resolve_year_months(args),
+            "year_month": args.year_month,
+            "artifact_name": args.artifact_name,
+            "compression": args.compression,
+            "from_stage": args.from_stage,
+        })
+        print(f"→ Execução {journal.run_id} (journal em {args.journal}: {RunJournal.path(journal.run_id)})")
+    journal.sessions.append(profiler.run_id)
+
+    params = journal.params
+    units = [("extract", "extract", ym) for ym in params["year_months"]] + pipeline_units(params["year_months"])
+    if args.from_stage:
+        journal.reset_from(PIPELINE_STAGES, args.from_stage)
+    # a execução retomada mantém o ponto de partida original, salvo novo --from-stage
+    from_stage = args.from_stage or params.get("from_stage")
+    if from_stage:
+        first = PIPELINE_STAGES.index(from_stage)
+        units = [u for u in units if PIPELINE_STAGES.index(u[0]) >= first]
+    journal.save()
+
+    current = None
+    try:
+        for stage, job, ym in units:
+            if stage != current:
+                if current is not None:
+                    print(f"\n✓ Etapa {current} concluída.\n")
+                print(f"→ {_STAGE_TITLES[stage]} …")
+                current = stage
+            label = f"{job} [{ym}]" if ym else job
+            if journal.is_done(stage, job, ym):
+                print(f"  ↷ {label} (já concluído)")
+                continue
+            print(f"  • {label}")
+            journal.run_unit(stage, job, ym, lambda: _run_pipeline_unit(stage, job, ym, params),
+                             max_retries=args.max_retries, backoff=args.backoff)
+    except Exception:
+        print(f"\n✗ Pipeline interrompido. Retome com: python -m src.main pipeline --resume {journal.run_id}"
+              + (" --journal local" if args.journal == "local" else ""))
+        raise
 
-    # -------- resolver meses --------
-    if args.year_month:
-        year_months = [args.year_month]
+    print("\n✓ Pipeline completo executado com sucesso.")
+
+
+def _month_range(start: str, end: str) -> list[str]:
+    cur, last = date(int(start[:4]), int(start[4:]), 1), date(int(end[:4]), int(end[4:]), 1)
+    if cur > last:
+        raise SystemExit(f"--from {start} é posterior a --to {end}")
+    out = []
+    while cur <= last:
+        out.append(cur.strftime("%Y%m"))
+        cur += relativedelta(months=1)
+    return out
+
+
+def _backfill_worker_argv(args, backfill_id: str) -> list[str]:
+    argv = [sys.executable, "-m", "src.main", "backfill", "--from", args.start, "--to", args.end,
+            "--id", backfill_id, "--workers", "1", "--stages", *args.stages,
+            "--ttl", str(args.ttl), "--heartbeat", str(args.heartbeat), "--poll", str(args.poll),
+            "--max-attempts", str(args.max_attempts), "--backoff", str(args.backoff)]
+    if args.extract:
+        argv.append("--extract")
+    for flag, value in (("--artifact-name", args.artifact_name), ("--compression", args.compression)):
+        if value is not None:
+            argv += [flag, value]
+    return argv
+
+
+def cmd_backfill(args):
+    """
+    Backfill de um intervalo de meses por vários workers independentes (ex.:
+    vários containers com o mesmo comando). As unidades (stage, job, mês) são
+    disputadas por leases em artifacts/backfills/<id>/ — com expiração e
+    heartbeat, então um worker que morre devolve a unidade após --ttl s.
+    Gold só começa com toda a silver concluída (registry.backfill_plan).
+
+    --workers N > 1 sobe N processos locais com o mesmo --id. Rodar de novo o
+    mesmo comando retoma: unidades concluídas ficam marcadas em done/.
+    """
+    from .core.infra.backfill import run_worker
+    from .core.infra.leases import LeaseManager, unit_path
+    from .data_domains.registry import backfill_plan
+
+    year_months = _month_range(args.start, args.end)
+    backfill_id = args.id or f"backfill-{args.start}-{args.end}"
+
+    if args.workers > 1:
+        print(f"→ Backfill {backfill_id}: {len(year_months)} meses, {args.workers} workers locais …")
+        procs = [subprocess.Popen(_backfill_worker_argv(args, backfill_id)) for _ in range(args.workers)]
+        codes = [p.wait() for p in procs]
+        if any(codes):
+            raise SystemExit(f"✗ Backfill {backfill_id}: {sum(1 for c in codes if c)} worker(s) terminaram com falha.")
+        print(f"\n✓ Backfill {backfill_id} concluído.")
+        return
+
+    units, deps = backfill_plan(year_months, stages=args.stages, extract=args.extract)
+    params = {"artifact_name": args.artifact_name, "compression": args.compression}
+    leases = LeaseManager(artifacts_store.fs, f"backfills/{backfill_id}", ttl=args.ttl, heartbeat=args.heartbeat)
+    print(f"→ Worker {leases.owner} no backfill {backfill_id} ({len(units)} unidades) …")
+    result = run_worker(leases, units, deps, lambda stage, job, ym: _run_pipeline_unit(stage, job, ym, params),
+                        poll=args.poll, max_attempts=args.max_attempts, backoff=args.backoff)
+
+    print(f"\n✓ Worker {leases.owner}: {len(result['ran'])} unidade(s) executada(s).")
+    if result["stale"]:
+        print(f"  ⚠️ {len(result['stale'])} resultado(s) descartado(s): lease assumido por outro worker.")
+    if result["failed"]:
+        for unit in result["failed"]:
+            print(f"  ✗ {unit_path(unit)}")
+        print(f"  … e {len(result['blocked'])} unidade(s) bloqueada(s) por dependência.")
+        raise SystemExit(f"✗ Backfill {backfill_id} incompleto; veja artifacts/backfills/{backfill_id}/failed/.")
+
+
+def _query_filters(args) -> dict:
+    filters = dict(w.split("=", 1) for w in args.where or [])
+    if args.municipio:
+        filters["municipio"] = args.municipio
+    if args.atividade:
+        filters["atividade"] = args.atividade
+    if args.start or args.end:
+        filters["periodo"] = f"{args.start or ''}..{args.end or ''}"
+    return filters
+
+
+def cmd_query(args):
+    from .core.layers.gold_query import GoldQuery, run_query
+
+    with profiler.job("query", table=args.table):
+        out = run_query(GoldQuery(), args.table, _query_filters(args), columns=args.columns,
+                        group_by=args.group_by, aggs=args.agg, limit=args.limit)
+    df = out.to_pandas()
+    if args.format == "csv":
+        print(df.to_csv(index=False), end="")
+    elif args.format == "json":
+        print(df.to_json(orient="records", force_ascii=False))
     else:
-        today = date.today().replace(day=1)
-        year_months = [
-            (today - relativedelta(months=i)).strftime("%Y%m")
-            for i in range(args.months_back)
-        ]
-        year_months.reverse()  # roda do mais antigo → mais novo
-
-    # -------- 1. extract --------
-    for ym in year_months:
-        ex = Extractor(year_month=ym)
-        print(f"→ [1/3] Extraindo CNES para {ym} …")
-        ex.download_zip()
-        ex.extract_zip()
-        ex.upload_to_datalake()
-        ex.cleanup()
-        print(f"✓ Bronze concluído para {ym}.\n")
+        print(df.to_string(index=False) if len(df) else "(nenhuma linha)")
+        print(f"\n{len(df)} linha(s)")
 
-    # -------- 2. tables --------
-    print("→ [2/3] Atualizando tabelas (silver/gold) …")
-    jobs = list_jobs()
 
-    for ym in year_months:
-        print(f"\n→ Processando tabelas para {ym}")
-        for name, JobCls in jobs.items():
-            if getattr(JobCls, "job_type", None) != "table":
-                continue
+def cmd_serve(args):
+    from .core.layers.gold_query import GoldQuery, serve
 
-            print(f"  • {name}")
-            JobCls(year_month=ym).run()
+    engine = GoldQuery(refresh_interval=args.refresh_interval)
+    for name in args.preload or []:
+        print(f"  carregando gold/{name} ({engine.table(name).table.num_rows} linhas)")
+    serve(engine, host=args.host, port=args.port)
 
-    print("\n✓ Tabelas atualizadas.\n")
 
-    # -------- 3. models --------
-    print("→ [3/3] Treinando modelos e salvando artefatos …")
+def cmd_synth(args):
+    from .synthetic.cnes import generate_bronze
 
-    for name, JobCls in jobs.items():
-        if getattr(JobCls, "job_type", None) != "model":
-            continue
+    if bronze_store.backend != "local":
+        raise SystemExit("synth só grava no backend local (STORAGE_BACKEND=local) — não polui o bronze real.")
+    counts = generate_bronze(bronze_store.fs, args.months, scale=args.scale, seed=args.seed)
+    for ym in args.months:
+        print(f"  {ym}: " + ", ".join(f"{t}={n}" for t, n in counts[ym].items()))
+    print(f"✓ Bronze sintético (escala {args.scale:g}) em {bronze_store.fs.root}")
 
-        print(f"  • {name}")
-        kwargs = _build_kwargs_for(JobCls, args)
-        JobCls(**kwargs).run()
 
-    print("\n✓ Pipeline completo executado com sucesso.")
+def cmd_bench(args):
+    from .bench.runner import run_benchmark, compare_results
+
+    if args.compare is not None:
+        base, head = (args.compare + [None, None])[:2]
+        df = compare_results(args.out, base=base, head=head)
+        print(f"base={df.attrs['base']}  head={df.attrs['head']}")
+        print(df.to_string(index=False))
+        return
+    run_benchmark(scales=args.scales, year_months=args.months, jobs=args.jobs, out_path=args.out,
+                  seed=args.seed, keep_data=args.keep_data)
+
 
 # ------------ parser ------------
+def _add_profile_flag(parser):
+    parser.add_argument("--profile", action="store_true",
+                        help="cProfile por job + relatório JSON em local_storage/reports/ e artifacts/runs/<run_id>/")
+
+
+def _add_engine_flag(parser):
+    parser.add_argument("--engine", choices=["arrow", "pandas"],
+                        help="Engine das tabelas que suportam os dois (default: o do job; o mesmo que TABLE_ENGINE)")
+
+
 def build_parser():
-    p = argparse.ArgumentParser(prog="main", description="Runner de jobs (tables e models)")
+    p = argparse.ArgumentParser(prog="main", description="Runner de jobs (tables, models e score)")
     sub = p.add_subparsers(dest="cmd", required=True)
 
     # main list
@@ -138,31 +366,118 @@ def build_parser():
     p_list.set_defaults(func=cmd_list)
 
     # main run --job X [--year-month YYYYMM] [--artifact-name foo.joblib]
-    p_run = sub.add_parser("run", help="Roda um job específico (tabela ou modelo)")
+    p_run = sub.add_parser("run", help="Roda um job específico (tabela, modelo ou score)")
     p_run.add_argument("--job", required=True, help="Nome do job (ex.: cnes_estabelecimentos ou cnes_linear_regression)")
     p_run.add_argument("--year-month", help="Período YYYYMM (usado por tabelas/metrics que aceitam)")
     p_run.add_argument("--artifact-name", help="Nome do artefato (usado por modelos que aceitam)")
+    p_run.add_argument("--compression", help="Compressão do artefato: zlib[:nível], lz4, gzip, xz (default: nenhuma)")
+    _add_engine_flag(p_run)
+    _add_profile_flag(p_run)
     p_run.set_defaults(func=cmd_run)
 
     # main run-all [--year-month YYYYMM] [--artifact-name foo.joblib]
     p_run_all = sub.add_parser("run-all", help="Roda todos os jobs do registry")
     p_run_all.add_argument("--year-month", help="Período YYYYMM (passado aos jobs que aceitam)")
     p_run_all.add_argument("--artifact-name", help="Artefato (passado aos modelos que aceitam)")
+    _add_engine_flag(p_run_all)
+    _add_profile_flag(p_run_all)
     p_run_all.set_defaults(func=cmd_run_all)
 
     # main extract [--year-month YYYYMM | --months-back N]
     p_extract = sub.add_parser("extract", help="Baixa ZIP, extrai CSVs e sobe para o bronze")
     p_extract.add_argument("--year-month", help="Período YYYYMM; se omitido, usa hoje - months-back")
     p_extract.add_argument("--months-back", type=int, default=3, help="Meses para trás quando --year-month não for passado (default: 3)")
+    _add_profile_flag(p_extract)
     p_extract.set_defaults(func=cmd_extract)
 
     # main pipeline [--year-month YYYYMM | --months-back N] [--artifact-name foo.joblib]
-    p_pipeline = sub.add_parser("pipeline",help="Executa o pipeline completo (extract → tables → models)")
+    p_pipeline = sub.add_parser("pipeline",help="Executa o pipeline completo (extract → tables → models → score)")
     p_pipeline.add_argument("--year-month", help="Período YYYYMM")
     p_pipeline.add_argument("--months-back", type=int, default=3)
     p_pipeline.add_argument("--artifact-name", help="Nome do artefato")
+    p_pipeline.add_argument("--compression", help="Compressão dos artefatos (ex.: zlib:3)")
+    p_pipeline.add_argument("--resume", metavar="RUN_ID", help="Retoma a execução RUN_ID a partir da 1ª unidade não concluída")
+    p_pipeline.add_argument("--from-stage", choices=PIPELINE_STAGES, help="Refaz a partir desta etapa (pula as anteriores)")
+    p_pipeline.add_argument("--journal", choices=["lake", "local"], default="lake",
+                            help="Onde fica o journal: artifacts/runs/ no data lake (default) ou ./local_storage/runs/")
+    p_pipeline.add_argument("--max-retries", type=int, default=2, help="Novas tentativas por unidade (default: 2)")
+    p_pipeline.add_argument("--backoff", type=float, default=30.0, help="Espera inicial entre tentativas, dobra a cada uma (s)")
+    _add_engine_flag(p_pipeline)
+    _add_profile_flag(p_pipeline)
     p_pipeline.set_defaults(func=cmd_pipeline)
 
+    # main backfill --from YYYYMM --to YYYYMM [--workers N]
+    p_backfill = sub.add_parser("backfill", help="Backfill de um intervalo de meses com vários workers (leases no storage)")
+    p_backfill.add_argument("--from", dest="start", required=True, help="Primeiro período YYYYMM")
+    p_backfill.add_argument("--to", dest="end", required=True, help="Último período YYYYMM")
+    p_backfill.add_argument("--id", help="Identificador compartilhado pelos workers (default: backfill-<from>-<to>)")
+    p_backfill.add_argument("--workers", type=int, default=1, help="Processos locais (default: 1 — este processo é o worker)")
+    p_backfill.add_argument("--stages", nargs="+", choices=STAGES, default=["table"],
+                            help="Etapas incluídas (default: table)")
+    p_backfill.add_argument("--extract", action="store_true", help="Inclui o extract de cada mês (bronze)")
+    p_backfill.add_argument("--artifact-name", help="Nome do artefato (etapas model/score)")
+    p_backfill.add_argument("--compression", help="Compressão dos artefatos (ex.: zlib:3)")
+    p_backfill.add_argument("--ttl", type=float, default=300.0, help="Validade do lease sem heartbeat (s)")
+    p_backfill.add_argument("--heartbeat", type=float, default=60.0, help="Intervalo de renovação do lease (s)")
+    p_backfill.add_argument("--poll", type=float, default=5.0, help="Espera quando não há unidade disponível (s)")
+    p_backfill.add_argument("--max-attempts", type=int, default=3, help="Tentativas por unidade, somando todos os workers")
+    p_backfill.add_argument("--backoff", type=float, default=30.0, help="Espera inicial antes de repetir uma unidade (s)")
+    _add_engine_flag(p_backfill)
+    _add_profile_flag(p_backfill)
+    p_backfill.set_defaults(func=cmd_backfill)
+
+    # main query --table X [--municipio M] [--atividade A] [--from YYYYMM] [--to YYYYMM] [--group-by ...]
+    p_query = sub.add_parser("query", help="Consulta uma tabela gold (filtros indexados, agregações simples)")
+    p_query.add_argument("--table", required=True, help="Tabela gold (ex.: cnes_estabelecimentos_metrics)")
+    p_query.add_argument("--municipio", help="CO_MUNICIPIO_SEM_DIGITO (aceita lista a,b,c)")
+    p_query.add_argument("--atividade", help="DS_ATIVIDADE_PROFISSIONAL (aceita lista a,b,c)")
+    p_query.add_argument("--from", dest="start", help="Período inicial YYYYMM (inclusive)")
+    p_query.add_argument("--to", dest="end", help="Período final YYYYMM (inclusive)")
+    p_query.add_argument("--where", nargs="+", metavar="COL=VALOR", help="Outros filtros: valor, a,b,c ou min..max")
+    p_query.add_argument("--columns", nargs="+", help="Colunas retornadas")
+    p_query.add_argument("--group-by", nargs="+", help="Colunas de agrupamento")
+    p_query.add_argument("--agg", nargs="+", metavar="COL:FUNC",
+                         help="Agregações (sum, mean, min, max, count, count_distinct)")
+    p_query.add_argument("--limit", type=int, help="Máximo de linhas (sem agregação)")
+    p_query.add_argument("--format", choices=["table", "csv", "json"], default="table")
+    _add_profile_flag(p_query)
+    p_query.set_defaults(func=cmd_query)
+
+    # main serve [--port 8765] [--preload cnes_estabelecimentos_metrics]
+    p_serve = sub.add_parser("serve", help="Endpoint HTTP local (JSON) sobre as tabelas gold residentes")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.add_argument("--preload", nargs="+", help="Tabelas carregadas na subida")
+    p_serve.add_argument("--refresh-interval", type=float, default=30.0,
+                         help="Intervalo mínimo entre checagens de ETag por tabela (s)")
+    p_serve.set_defaults(func=cmd_serve)
+
+    # main artifacts --name X [--version V | --latest]
+    p_art = sub.add_parser("artifacts", help="Lista/compara versões de um artefato (lê só os metadados)")
+    p_art.add_argument("--name", required=True, help="Nome do artefato (ex.: cnes_linear_regression)")
+    p_art.add_argument("--version", help="Mostra o metadata.json de uma versão")
+    p_art.add_argument("--latest", action="store_true", help="Mostra o metadata.json da versão corrente")
+    p_art.set_defaults(func=cmd_artifacts)
+
+    # main synth --months 202401 202402 [--scale 1.0]
+    p_synth = sub.add_parser("synth", help="Gera meses sintéticos do CNES + população no bronze local")
+    p_synth.add_argument("--months", nargs="+", required=True, help="Períodos YYYYMM")
+    p_synth.add_argument("--scale", type=float, default=1.0, help="Fator de escala (1.0 ≈ 3 mil estabelecimentos)")
+    p_synth.add_argument("--seed", type=int, default=42)
+    p_synth.set_defaults(func=cmd_synth)
+
+    # main bench [--scales 0.25 1 4] [--months ...] [--jobs ...] | --compare [BASE [HEAD]]
+    p_bench = sub.add_parser("bench", help="Benchmark dos jobs sobre dados sintéticos em storage local")
+    p_bench.add_argument("--scales", type=float, nargs="+", help="Fatores de escala (default: 0.25 1 4)")
+    p_bench.add_argument("--months", nargs="+", help="Períodos YYYYMM (default: 202401..202406)")
+    p_bench.add_argument("--jobs", nargs="+", help="Só estes jobs (default: todos do registry)")
+    p_bench.add_argument("--seed", type=int, default=42)
+    p_bench.add_argument("--out", default="./local_storage/bench/results.jsonl", help="Arquivo JSONL de resultados")
+    p_bench.add_argument("--keep-data", action="store_true", help="Mantém o data lake sintético após rodar")
+    p_bench.add_argument("--compare", nargs="*", metavar="COMMIT",
+                         help="Compara resultados de dois commits (default: os dois últimos)")
+    p_bench.set_defaults(func=cmd_bench)
+
     return p
 
 
@@ -170,7 +485,26 @@ def build_parser():
 def main():
     parser = build_parser()
     args = parser.parse_args()
-    args.func(args)
- 
+    if getattr(args, "engine", None):
+        os.environ["TABLE_ENGINE"] = args.engine  # herdado pelos subprocessos (unidades, workers)
+    profile = getattr(args, "profile", False)
+    profiler.enable_cprofile = profile
+    try:
+        args.func(args)
+    finally:
+        if profile and profiler.jobs:
+            _write_run_report()
+
+
+def _write_run_report():
+    print(f"\n── Perfil da execução {profiler.run_id} ──")
+    print(profiler.summary())
+    try:
+        path = profiler.write_report(artifacts_store.fs)
+        print(f"Relatório: {path} (e artifacts/runs/{profiler.run_id}/report.json)")
+    except Exception as e:  # relatório nunca derruba o job
+        print(f"⚠️ Falha ao enviar relatório ao storage ({e}); gravando só localmente.")
+        print(f"Relatório: {profiler.write_report()}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
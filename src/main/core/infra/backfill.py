@@ -0,0 +1,105 @@
+from __future__ import annotations
+import time
+from typing import Callable, Dict, List, Set
+
+from src.main.core.infra.journal import NON_RETRYABLE
+from src.main.core.infra.leases import LeaseManager, Unit, unit_path
+
+
+def _doomed(units: List[Unit], deps: Dict[Unit, Set[Unit]], exhausted: Set[Unit]) -> Set[Unit]:
+    """Unidades que nunca vão rodar: esgotaram tentativas ou dependem (transitivamente) de uma que esgotou."""
+    doomed = set(exhausted)
+    for unit in units:  # units em ordem topológica
+        if deps.get(unit, set()) & doomed:
+            doomed.add(unit)
+    return doomed
+
+
+def chain_periods(units: List[Unit], deps: Dict[Unit, Set[Unit]], jobs: Set[str]) -> Dict[Unit, Set[Unit]]:
+    """
+    Para jobs com estado entre meses (ex.: CDC, que diffa contra o snapshot
+    anterior): (table, job, M) passa a depender de (table, job, M anterior
+    no backfill). Meses fora do backfill não entram na cadeia.
+    """
+    by_job: Dict[str, List[Unit]] = {}
+    for unit in units:
+        if unit[0] == "table" and unit[1] in jobs and unit[2] is not None:
+            by_job.setdefault(unit[1], []).append(unit)
+    for chain in by_job.values():
+        chain.sort(key=lambda u: u[2])
+        for prev, cur in zip(chain, chain[1:]):
+            deps.setdefault(cur, set()).add(prev)
+    return deps
+
+
+def run_worker(leases: LeaseManager, units: List[Unit], deps: Dict[Unit, Set[Unit]],
+               run_fn: Callable[[str, str, str | None], list], poll: float = 5.0,
+               max_attempts: int = 3, backoff: float = 30.0) -> dict:
+    """
+    Loop de um worker do backfill: pega (via lease) a primeira unidade pronta —
+    não concluída e com todas as dependências concluídas —, executa run_fn e
+    marca done/failed no storage. Sem unidade disponível (todas com lease de
+    outro worker ou esperando dependências), espera `poll` s.
+
+    Falhas liberam a unidade para qualquer worker depois de
+    backoff * 2^(tentativas-1) s, até max_attempts; erros em NON_RETRYABLE
+    esgotam de primeira. Termina quando tudo está concluído ou o que falta
+    depende de unidades esgotadas. Retorna {"ran", "failed", "blocked", "stale"}.
+
+    Fencing: run_fn roda dentro de leases.fence(unit), então cada gravação de
+    dado do job (check_fence em silver/gold/artefatos) confere antes se o lease
+    ainda é deste worker; perdido, o job aborta sem gravar mais nada. O mesmo
+    vale antes de registrar done/failed. Em ambos os casos a unidade vira
+    "stale" — quem tem a geração corrente refaz e registra. A checagem é por
+    arquivo: um job que perde o lease no meio de uma gravação de vários
+    arquivos pode ter deixado parte deles, que o novo dono sobrescreve.
+    """
+    ran: List[Unit] = []
+    stale: List[Unit] = []
+    try:
+        while True:
+            done = leases.done_units()
+            failures = leases.failures()
+            exhausted = {u for u, f in failures.items()
+                         if u not in done and (not f["retryable"] or f["attempts"] >= max_attempts)}
+            pending = [u for u in units if u not in done]
+            doomed = _doomed(units, deps, exhausted)
+            if all(u in doomed for u in pending):
+                return {"ran": ran, "failed": [u for u in pending if u in exhausted],
+                        "blocked": [u for u in pending if u not in exhausted], "stale": stale}
+
+            now = leases.clock()
+            ready = [u for u in pending
+                     if u not in doomed and deps.get(u, set()) <= done
+                     and failures.get(u, {}).get("retry_after", 0) <= now]
+            unit = next((u for u in ready if leases.acquire(u)), None)
+            if unit is None:
+                time.sleep(poll)
+                continue
+            if leases.is_done(unit):  # concluída entre a listagem e o lease
+                leases.release(unit)
+                continue
+
+            label = unit_path(unit)
+            print(f"  • [{leases.owner}] {label}")
+            t0 = time.perf_counter()
+            try:
+                with leases.fence(unit):
+                    outputs = run_fn(*unit) or []
+            except Exception as e:
+                if not leases.holds(unit):
+                    print(f"  ⚠️ {label}: lease perdido durante a execução; falha descartada")
+                    stale.append(unit)
+                    continue
+                record = leases.fail(unit, f"{type(e).__name__}: {e}",
+                                     retryable=not isinstance(e, NON_RETRYABLE), backoff=backoff)
+                print(f"  ✗ {label} falhou (tentativa {record['attempts']}): {record['error']}")
+                continue
+            if not leases.holds(unit):
+                print(f"  ⚠️ {label}: lease perdido durante a execução; resultado descartado")
+                stale.append(unit)
+                continue
+            leases.complete(unit, outputs=outputs, wall_s=round(time.perf_counter() - t0, 2))
+            ran.append(unit)
+    finally:
+        leases.close()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+import json
+import time
+from datetime import datetime, timezone
+from typing import Callable
+from azure.core.exceptions import ResourceNotFoundError
+
+# erros determinísticos (QC, schema, bug, input ausente): repetir só atrasa a falha
+NON_RETRYABLE = (ValueError, KeyError, TypeError, AttributeError, NotImplementedError,
+                 FileNotFoundError, ResourceNotFoundError)
+
+
+def unit_key(stage: str, job: str, year_month: str | None) -> str:
+    return f"{stage}:{job}:{year_month or '-'}"
+
+
+class RunJournal:
+    """
+    Diário de uma execução do pipeline em runs/<run_id>/journal.json (no
+    file system passado — artifacts do data lake ou um LocalFileSystemClient).
+
+    Guarda os parâmetros resolvidos da execução (meses, artefato, ...) e, por
+    unidade (stage, job, year_month), status, tentativas, duração e onde a
+    saída foi gravada. É regravado a cada unidade concluída/falha, então uma
+    execução interrompida pode ser retomada com --resume <run_id>.
+    """
+
+    def __init__(self, fs_client, run_id: str, params: dict | None = None):
+        self._fs = fs_client
+        self.run_id = run_id
+        self.params = params or {}
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.units: dict[str, dict] = {}
+        self.sessions: list[str] = []  # run_ids dos processos que tocaram este journal (relatórios de perfil)
+
+    @staticmethod
+    def path(run_id: str) -> str:
+        return f"runs/{run_id}/journal.json"
+
+    # ------------------------------
+    # Persistência
+    # ------------------------------
+    @classmethod
+    def load(cls, fs_client, run_id: str) -> "RunJournal":
+        try:
+            data = json.loads(fs_client.get_file_client(cls.path(run_id)).download_file().readall())
+        except (ResourceNotFoundError, FileNotFoundError):
+            raise FileNotFoundError(f"Journal não encontrado: {cls.path(run_id)}")
+        journal = cls(fs_client, data["run_id"], data.get("params"))
+        journal.created_at = data.get("created_at", journal.created_at)
+        journal.units = data.get("units", {})
+        journal.sessions = data.get("sessions", [])
+        return journal
+
+    def save(self) -> None:
+        payload = {
+            "run_id": self.run_id,
+            "created_at": self.created_at,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "params": self.params,
+            "sessions": self.sessions,
+            "units": self.units,
+        }
+        data = json.dumps(payload, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+        self._fs.get_file_client(self.path(self.run_id)).upload_data(data, overwrite=True)
+
+    # ------------------------------
+    # Estado das unidades
+    # ------------------------------
+    def is_done(self, stage: str, job: str, year_month: str | None) -> bool:
+        return self.units.get(unit_key(stage, job, year_month), {}).get("status") == "done"
+
+    def reset_from(self, stages: list[str], from_stage: str) -> None:
+        """Esquece unidades de from_stage em diante (serão refeitas)."""
+        redo = set(stages[stages.index(from_stage):])
+        self.units = {k: u for k, u in self.units.items() if u["stage"] not in redo}
+
+    def record(self, stage: str, job: str, year_month: str | None, status: str, **info) -> None:
+        self.units[unit_key(stage, job, year_month)] = {
+            "stage": stage,
+            "job": job,
+            "year_month": year_month,
+            "status": status,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            **info,
+        }
+        self.save()
+
+    def run_unit(self, stage: str, job: str, year_month: str | None, fn: Callable[[], list],
+                 max_retries: int = 2, backoff: float = 30.0) -> list:
+        """
+        Executa fn() (que retorna a lista de saídas gravadas) com até
+        max_retries novas tentativas, espera backoff * 2^(n-1) entre elas.
+        Erros em NON_RETRYABLE falham de primeira. Registra o resultado.
+        """
+        attempt, t0 = 0, time.perf_counter()
+        while True:
+            attempt += 1
+            try:
+                outputs = fn() or []
+            except Exception as e:
+                if isinstance(e, NON_RETRYABLE) or attempt > max_retries:
+                    self.record(stage, job, year_month, "failed", attempts=attempt,
+                                error=f"{type(e).__name__}: {e}", wall_s=round(time.perf_counter() - t0, 2))
+                    raise
+                wait = backoff * 2 ** (attempt - 1)
+                print(f"  ⚠️ {job} {year_month or ''} falhou ({type(e).__name__}: {e}); "
+                      f"tentativa {attempt + 1}/{max_retries + 1} em {wait:.0f}s")
+                time.sleep(wait)
+                continue
+            self.record(stage, job, year_month, "done", attempts=attempt, outputs=outputs,
+                        wall_s=round(time.perf_counter() - t0, 2))
+            return outputs
@@ -0,0 +1,235 @@
+from __future__ import annotations
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Set, Tuple
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+Unit = Tuple[str, str, Optional[str]]  # (stage, job, year_month)
+
+
+def unit_path(unit: Unit) -> str:
+    stage, job, ym = unit
+    return f"{stage}/{job}/{ym or '-'}"
+
+
+def _parse_unit_path(rel: str) -> Unit:
+    stage, job, ym = rel.split("/")
+    return stage, job, None if ym == "-" else ym
+
+
+class LeaseLost(RuntimeError):
+    """O lease da unidade em execução expirou e outro worker assumiu."""
+
+
+# checagem de lease da unidade em execução nesta thread (LeaseManager.fence)
+_fence: ContextVar[Callable[[], None] | None] = ContextVar("lease_fence", default=None)
+
+
+def check_fence() -> None:
+    """
+    Chamada pelos jobs logo antes de cada gravação de dado (silver, gold,
+    artefato): dentro de LeaseManager.fence(unit), levanta LeaseLost se o
+    lease foi perdido. Fora de um backfill (run, pipeline) não faz nada.
+    """
+    check = _fence.get()
+    if check is not None:
+        check()
+
+
+class LeaseManager:
+    """
+    Coordenação de vários workers (processos/containers) sobre o mesmo file
+    system, usando só criação exclusiva (upload_data(overwrite=False)):
+
+      <prefix>/leases/<stage>/<job>/<ym>/<gen>.json   dono da unidade (maior gen vale)
+      <prefix>/done/<stage>/<job>/<ym>.json          unidade concluída (saídas, duração)
+      <prefix>/failed/<stage>/<job>/<ym>.json        última falha (tentativas, erro)
+
+    Pegar uma unidade = criar a geração seguinte; só é permitido se a geração
+    corrente expirou (expires_at no passado) — a criação exclusiva garante um
+    único vencedor por geração. Uma thread de heartbeat renova os leases em
+    posse a cada `heartbeat` s; quem encontra uma geração maior que a sua
+    perdeu o lease (expirou e outro worker assumiu).
+
+    Gerações nunca são apagadas: release() grava um lease já expirado, para
+    que um dono antigo continue vendo a geração maior (holds() é o fencing
+    antes de gravar dados — fence() — e de registrar o resultado da unidade).
+    """
+
+    def __init__(self, fs_client, prefix: str, owner: str | None = None,
+                 ttl: float = 300.0, heartbeat: float | None = 60.0,
+                 clock: Callable[[], float] = time.time):
+        # heartbeat=None: sem renovação automática (renew() manual)
+        if heartbeat is not None and heartbeat >= ttl:
+            raise ValueError("heartbeat deve ser menor que ttl")
+        self._fs = fs_client
+        self.prefix = prefix.rstrip("/")
+        self.owner = owner or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+        self.clock = clock  # injetável nos testes (expiração determinística)
+        self._held: Dict[Unit, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ------------------------------
+    # IO
+    # ------------------------------
+    def _list(self, sub: str) -> list[str]:
+        base = f"{self.prefix}/{sub}"
+        try:
+            return [p.name[len(base) + 1:] for p in self._fs.get_paths(path=base, recursive=True)
+                    if not p.is_directory]
+        except (ResourceNotFoundError, FileNotFoundError):
+            return []
+
+    def _read(self, path: str) -> dict | None:
+        try:
+            return json.loads(self._fs.get_file_client(path).download_file().readall())
+        except (ResourceNotFoundError, FileNotFoundError):
+            return None
+
+    def _write(self, path: str, payload: dict, overwrite: bool) -> None:
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self._fs.get_file_client(path).upload_data(data, overwrite=overwrite)
+
+    def _lease_file(self, unit: Unit, gen: int) -> str:
+        return f"{self.prefix}/leases/{unit_path(unit)}/{gen:06d}.json"
+
+    def _generations(self, unit: Unit) -> list[int]:
+        names = self._list(f"leases/{unit_path(unit)}")
+        return sorted(int(n.removesuffix(".json")) for n in names if n.endswith(".json"))
+
+    def _lease_payload(self, unit: Unit, gen: int, released: bool = False) -> dict:
+        return {"owner": self.owner, "unit": unit_path(unit), "gen": gen,
+                "expires_at": 0 if released else self.clock() + self.ttl,
+                "renewed_at": datetime.now(timezone.utc).isoformat()}
+
+    # ------------------------------
+    # Leases
+    # ------------------------------
+    def acquire(self, unit: Unit) -> bool:
+        gens = self._generations(unit)
+        gen = 0
+        if gens:
+            current = self._read(self._lease_file(unit, gens[-1]))
+            if current and current["expires_at"] > self.clock():
+                return False
+            gen = gens[-1] + 1
+        try:
+            self._write(self._lease_file(unit, gen), self._lease_payload(unit, gen), overwrite=False)
+        except ResourceExistsError:
+            return False  # outro worker criou a mesma geração primeiro
+        with self._lock:
+            self._held[unit] = gen
+        self._start_heartbeat()
+        return True
+
+    def holds(self, unit: Unit) -> bool:
+        """True se a geração deste worker ainda é a corrente (ninguém assumiu a unidade)."""
+        with self._lock:
+            gen = self._held.get(unit)
+        if gen is None:
+            return False
+        if self._generations(unit)[-1:] != [gen]:
+            with self._lock:
+                self._held.pop(unit, None)
+            return False
+        return True
+
+    @contextmanager
+    def fence(self, unit: Unit):
+        """Durante o bloco, check_fence() (chamada antes de cada gravação) exige holds(unit)."""
+        def check() -> None:
+            if not self.holds(unit):
+                raise LeaseLost(f"lease perdido: {unit_path(unit)} (expirou e foi assumido por outro worker)")
+
+        token = _fence.set(check)
+        try:
+            yield
+        finally:
+            _fence.reset(token)
+
+    def renew(self, unit: Unit) -> bool:
+        """Estende o lease; False (e larga a unidade) se outro worker já assumiu."""
+        with self._lock:
+            gen = self._held.get(unit)
+        if not self.holds(unit):
+            if gen is not None:
+                print(f"  ⚠️ lease perdido: {unit_path(unit)} (expirou e foi assumido por outro worker)")
+            return False
+        self._write(self._lease_file(unit, gen), self._lease_payload(unit, gen), overwrite=True)
+        return True
+
+    def release(self, unit: Unit) -> None:
+        with self._lock:
+            gen = self._held.pop(unit, None)
+        if gen is not None and self._generations(unit)[-1:] == [gen]:
+            self._write(self._lease_file(unit, gen), self._lease_payload(unit, gen, released=True),
+                        overwrite=True)
+
+    def _start_heartbeat(self) -> None:
+        if self.heartbeat is None:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._heartbeat_loop, name="lease-heartbeat", daemon=True)
+            self._thread.start()
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.heartbeat):
+            with self._lock:
+                units = list(self._held)
+            for unit in units:
+                try:
+                    self.renew(unit)
+                except Exception as e:  # rede: tenta de novo no próximo ciclo (ttl > heartbeat)
+                    print(f"  ⚠️ heartbeat falhou para {unit_path(unit)}: {type(e).__name__}: {e}")
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        for unit in list(self._held):
+            self.release(unit)
+
+    # ------------------------------
+    # Estado das unidades
+    # ------------------------------
+    def done_units(self) -> Set[Unit]:
+        return {_parse_unit_path(n.removesuffix(".json")) for n in self._list("done")}
+
+    def is_done(self, unit: Unit) -> bool:
+        return self._read(f"{self.prefix}/done/{unit_path(unit)}.json") is not None
+
+    def failures(self) -> Dict[Unit, dict]:
+        out = {}
+        for n in self._list("failed"):
+            record = self._read(f"{self.prefix}/failed/{n}")
+            if record:
+                out[_parse_unit_path(n.removesuffix(".json"))] = record
+        return out
+
+    def complete(self, unit: Unit, **info) -> None:
+        self._write(f"{self.prefix}/done/{unit_path(unit)}.json",
+                    {"owner": self.owner, "finished_at": datetime.now(timezone.utc).isoformat(), **info},
+                    overwrite=True)
+        self.release(unit)
+
+    def fail(self, unit: Unit, error: str, retryable: bool, backoff: float) -> dict:
+        path = f"{self.prefix}/failed/{unit_path(unit)}.json"
+        attempts = (self._read(path) or {}).get("attempts", 0) + 1
+        record = {"owner": self.owner, "attempts": attempts, "retryable": retryable, "error": error,
+                  "retry_after": self.clock() + backoff * 2 ** (attempts - 1),
+                  "failed_at": datetime.now(timezone.utc).isoformat()}
+        self._write(path, record, overwrite=True)
+        self.release(unit)
+        return record
@@ -0,0 +1,113 @@
+import os
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+
+class LocalFileSystemClient:
+    """
+    Stand-in local (um diretório por file system) para o FileSystemClient do
+    ADLS Gen2 — só o subconjunto que o projeto usa:
+
+      fs.get_paths(path, recursive=True)      -> [obj.name, obj.is_directory, obj.etag]
+      fs.get_file_client(path).download_file().readall() / .properties.etag
+      fs.get_file_client(path).upload_data(data, overwrite=...)
+      fs.get_file_client(path).get_file_properties() / .delete_file()
+
+    Erros seguem o SDK (ResourceNotFoundError / ResourceExistsError). Escritas
+    são atômicas (tmp + rename); overwrite=False publica via hard link, que
+    falha se o destino já existe — mesmo contrato de create-if-not-exists.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _abs(self, path: str) -> str:
+        return os.path.join(self.root, *[p for p in path.strip("/").split("/") if p])
+
+    def _rel(self, dirpath: str, name: str) -> str:
+        return os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, "/")
+
+    def get_file_client(self, path: str) -> "LocalFileClient":
+        return LocalFileClient(self, path.strip("/"))
+
+    def get_paths(self, path: str | None = None, recursive: bool = True):
+        base = self._abs(path or "")
+        if not os.path.isdir(base):
+            raise ResourceNotFoundError(f"O caminho especificado não existe: {path}")
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames.sort()
+            for d in dirnames:
+                yield SimpleNamespace(name=self._rel(dirpath, d), is_directory=True)
+            for f in sorted(filenames):
+                if ".tmp-" in f:
+                    continue
+                try:
+                    st = os.stat(os.path.join(dirpath, f))
+                except FileNotFoundError:  # removido durante a listagem
+                    continue
+                # como PathProperties do SDK: etag/content_length permitem detectar mudança sem baixar
+                yield SimpleNamespace(name=self._rel(dirpath, f), is_directory=False,
+                                      etag=_etag(st), content_length=st.st_size)
+            if not recursive:
+                break
+
+
+def _etag(st: os.stat_result) -> str:
+    return f'"0x{st.st_mtime_ns:X}{st.st_ino:X}"'
+
+
+class LocalFileClient:
+    def __init__(self, fs: LocalFileSystemClient, path: str):
+        self.fs = fs
+        self.path = path
+        self._abs = fs._abs(path)
+
+    def get_file_properties(self):
+        try:
+            st = os.stat(self._abs)
+        except FileNotFoundError:
+            raise ResourceNotFoundError(f"O arquivo especificado não existe: {self.path}")
+        return SimpleNamespace(
+            name=self.path,
+            size=st.st_size,
+            etag=_etag(st),
+            last_modified=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+        )
+
+    def download_file(self):
+        props = self.get_file_properties()
+        with open(self._abs, "rb") as f:
+            data = f.read()
+        return SimpleNamespace(properties=props, readall=lambda: data)
+
+    def upload_data(self, data, overwrite: bool = False, **_kwargs) -> dict:
+        if hasattr(data, "read"):
+            data = data.read()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        os.makedirs(os.path.dirname(self._abs), exist_ok=True)
+        tmp = f"{self._abs}.tmp-{uuid.uuid4().hex}"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        try:
+            if overwrite:
+                os.replace(tmp, self._abs)
+            else:
+                try:
+                    os.link(tmp, self._abs)
+                except FileExistsError:
+                    raise ResourceExistsError(f"O arquivo especificado já existe: {self.path}")
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return {"etag": self.get_file_properties().etag}
+
+    def delete_file(self) -> None:
+        try:
+            os.remove(self._abs)
+        except FileNotFoundError:
+            raise ResourceNotFoundError(f"O arquivo especificado não existe: {self.path}")
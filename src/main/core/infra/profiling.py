@@ -0,0 +1,248 @@
+from __future__ import annotations
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import resource
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+def peak_rss_mb() -> float:
+    """Pico de RSS da vida do processo (e dos filhos já finalizados, ex.: workers loky)."""
+    per_mb = 1024 * 1024 if sys.platform == "darwin" else 1024  # ru_maxrss: bytes no macOS, KB no Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / per_mb, 1)
+
+
+def current_rss_mb() -> float | None:
+    """RSS atual do processo via /proc/self/statm; None onde não houver /proc (ex.: macOS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+class _Peak:
+    __slots__ = ("value",)
+
+    def __init__(self, value: float):
+        self.value = value
+
+
+class RssSampler:
+    """
+    Pico de RSS de um intervalo (fase/job), não da vida do processo: uma única
+    thread amostra o RSS a cada `interval` s enquanto houver medições abertas
+    e atualiza o pico de cada uma. Não vê a memória de processos filhos; sem
+    /proc cai no high-water mark do processo (peak_rss_mb).
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._open: set[_Peak] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> _Peak | None:
+        rss = current_rss_mb()
+        if rss is None:
+            return None
+        peak = _Peak(rss)
+        with self._lock:
+            self._open.add(peak)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="rss-sampler", daemon=True)
+                self._thread.start()
+        return peak
+
+    def stop(self, peak: _Peak | None) -> float:
+        if peak is None:
+            return peak_rss_mb()
+        with self._lock:
+            self._open.discard(peak)
+        return max(peak.value, current_rss_mb() or 0.0)
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._open:
+                    self._thread = None
+                    return
+                watched = list(self._open)
+            rss = current_rss_mb() or 0.0
+            for peak in watched:
+                peak.value = max(peak.value, rss)
+
+
+# fases que movem bytes de/para o storage (as demais só medem o dado em memória)
+READ_PHASES = ("download",)
+WRITE_PHASES = ("upload",)
+
+
+class Phase:
+    """Uma medição (wall/CPU) com contadores opcionais preenchidos pelo chamador."""
+
+    def __init__(self, name: str, **meta):
+        self.name = name
+        self.meta = meta
+        self.bytes: int | None = None
+        self.rows_in: int | None = None
+        self.rows_out: int | None = None
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.peak_rss_mb = 0.0
+
+    def to_dict(self) -> dict:
+        out = {"phase": self.name, "wall_s": round(self.wall_s, 4), "cpu_s": round(self.cpu_s, 4),
+               "peak_rss_mb": self.peak_rss_mb}
+        for k in ("bytes", "rows_in", "rows_out"):
+            v = getattr(self, k)
+            if v is not None:
+                out[k] = int(v)
+        if self.meta:
+            out.update(self.meta)
+        return out
+
+
+class Profiler:
+    """
+    Coletor de telemetria do processo: um relatório por execução (run_id), com
+    um registro por job e, dentro dele, as fases (list, download, parse,
+    definition, fit, serialize, upload, ...).
+
+        with profiler.job("cnes_estabelecimentos", year_month="202401"):
+            with profiler.phase("download", path=p) as ph:
+                data = ...
+                ph.bytes = len(data)
+
+    Fases fora de um job são medidas mas não registradas: processos longos
+    (ex.: serve) não acumulam registros. O peak_rss_mb de fase/job é o pico
+    amostrado dentro do próprio intervalo; o do relatório é o da vida do
+    processo (inclui filhos). Com enable_cprofile=True
+    cada job também roda sob cProfile (top funções no relatório + .prof local).
+    """
+
+    def __init__(self):
+        self.run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:6]}"
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.enable_cprofile = False
+        self.report_dir = "./local_storage/reports"
+        self.jobs: list[dict] = []
+        self._current: dict | None = None
+        self._rss = RssSampler()
+
+    # ------------------------------
+    # Coleta
+    # ------------------------------
+
+    @contextmanager
+    def phase(self, name: str, **meta):
+        ph = Phase(name, **meta)
+        rss = self._rss.start()
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield ph
+        finally:
+            ph.wall_s = time.perf_counter() - t0
+            ph.cpu_s = time.process_time() - c0
+            ph.peak_rss_mb = self._rss.stop(rss)
+            if self._current is not None:
+                self._current["phases"].append(ph.to_dict())
+
+    @contextmanager
+    def job(self, name: str, **meta):
+        meta = {k: v for k, v in meta.items() if v is not None}
+        record = {"job": name, **meta, "status": "running", "phases": []}
+        previous, self._current = self._current, record
+        self.jobs.append(record)
+
+        prof = cProfile.Profile() if self.enable_cprofile else None
+        rss = self._rss.start()
+        t0, c0 = time.perf_counter(), time.process_time()
+        if prof:
+            prof.enable()
+        try:
+            yield record
+            record["status"] = "ok"
+        except BaseException as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if prof:
+                prof.disable()
+                record["cprofile"] = self._dump_cprofile(prof, name, meta)
+            record["wall_s"] = round(time.perf_counter() - t0, 4)
+            record["cpu_s"] = round(time.process_time() - c0, 4)
+            record["peak_rss_mb"] = self._rss.stop(rss)
+            # só fases de I/O: serialize/parse/extract medem o mesmo dado em memória
+            record["bytes_read"] = sum(p.get("bytes", 0) for p in record["phases"] if p["phase"] in READ_PHASES)
+            record["bytes_written"] = sum(p.get("bytes", 0) for p in record["phases"]
+                                          if p["phase"] in WRITE_PHASES)
+            record["bytes"] = record["bytes_read"] + record["bytes_written"]
+            record["rows_in"] = sum(p.get("rows_out", 0) for p in record["phases"] if p["phase"] == "parse")
+            record["rows_out"] = sum(p.get("rows_in", 0) for p in record["phases"] if p["phase"] == "serialize")
+            self._current = previous
+
+    def _dump_cprofile(self, prof: cProfile.Profile, name: str, meta: dict, top: int = 25) -> dict:
+        os.makedirs(self.report_dir, exist_ok=True)
+        suffix = "_".join(str(v) for v in meta.values())
+        prof_path = os.path.join(self.report_dir, f"{self.run_id}_{name}{'_' + suffix if suffix else ''}.prof")
+        prof.dump_stats(prof_path)
+
+        out = io.StringIO()
+        pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(top)
+        return {"path": prof_path, "top_cumulative": out.getvalue().splitlines()}
+
+    # ------------------------------
+    # Relatório
+    # ------------------------------
+    def report(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "peak_rss_mb": peak_rss_mb(),
+            "jobs": self.jobs,
+        }
+
+    def write_report(self, fs_client=None) -> str:
+        """Grava <report_dir>/<run_id>.json e, se fs_client, runs/<run_id>/report.json no storage."""
+        payload = json.dumps(self.report(), ensure_ascii=False, indent=2, default=str).encode("utf-8")
+        os.makedirs(self.report_dir, exist_ok=True)
+        local_path = os.path.join(self.report_dir, f"{self.run_id}.json")
+        with open(local_path, "wb") as f:
+            f.write(payload)
+        if fs_client is not None:
+            fs_client.get_file_client(f"runs/{self.run_id}/report.json").upload_data(payload, overwrite=True)
+        return local_path
+
+    def summary(self) -> str:
+        lines = [f"{'job':<40} {'status':<7} {'wall_s':>9} {'cpu_s':>9} {'MB lido':>9} {'MB grav.':>9} "
+                 f"{'rows_out':>10} {'rss_MB':>8}"]
+        for j in self.jobs:
+            label = j["job"] + (f" [{j['year_month']}]" if j.get("year_month") else "")
+            lines.append(
+                f"{label:<40} {j.get('status', '-'):<7} {j.get('wall_s', 0):>9.2f} {j.get('cpu_s', 0):>9.2f} "
+                f"{j.get('bytes_read', 0) / 1e6:>9.1f} {j.get('bytes_written', 0) / 1e6:>9.1f} "
+                f"{j.get('rows_out', 0):>10} {j.get('peak_rss_mb', 0):>8.0f}"
+            )
+        return "\n".join(lines)
+
+
+# instância compartilhada do processo
+profiler = Profiler()
@@ -1,7 +1,15 @@
 class SingletonMeta(type):
+    """
+    Uma instância viva por classe. Se a classe for chamada com argumentos
+    diferentes (ex.: outro year_month), a instância é recriada — do contrário
+    um loop mensal reutilizaria os inputs do primeiro período.
+    """
     _instances = {}
+
     def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
+        key = (args, tuple(sorted(kwargs.items())))
+        cached = cls._instances.get(cls)
+        if cached is None or cached[0] != key:
             inst = super().__call__(*args, **kwargs)
-            cls._instances[cls] = inst
-        return cls._instances[cls]
+            cls._instances[cls] = (key, inst)
+        return cls._instances[cls][1]
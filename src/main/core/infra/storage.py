@@ -1,15 +1,32 @@
 import os
 from azure.storage.filedatalake import DataLakeServiceClient
+from .local_storage import LocalFileSystemClient
 
 
 class Storage:
+    """
+    File system do data lake. STORAGE_BACKEND escolhe o backend:
+      - "azure" (default): ADLS Gen2 (STORAGE_ACCOUNT_NAME / STORAGE_ACCOUNT_KEY)
+      - "local": diretório <STORAGE_LOCAL_ROOT>/<file_system> (testes e benchmarks)
+    """
+
     def __init__(
         self,
         account_name: str | None = None,
         file_system: str = "bronze",
+        backend: str | None = None,
     ):
-        self.account_name = account_name or os.getenv("STORAGE_ACCOUNT_NAME")
         self.file_system = file_system
+        self.backend = backend or os.getenv("STORAGE_BACKEND", "azure")
+
+        if self.backend == "local":
+            self.account_name = None
+            self.client = None
+            root = os.getenv("STORAGE_LOCAL_ROOT", "./local_storage/datalake")
+            self.fs = LocalFileSystemClient(os.path.join(root, self.file_system))
+            return
+
+        self.account_name = account_name or os.getenv("STORAGE_ACCOUNT_NAME")
 
         if not self.account_name:
             raise ValueError("STORAGE_ACCOUNT_NAME não definido")
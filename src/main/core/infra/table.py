@@ -1,11 +1,32 @@
-from typing import Dict
+import os
+from typing import Dict, List
 import pandas as pd
 from .singleton import SingletonMeta
 
 class Table(metaclass=SingletonMeta):
     layer: str
     allowed_layers: list[str]
+    # jobs (do registry) que precisam ter rodado para o mesmo mês antes deste
+    depends_on: list[str] = []
+    # formato das entradas/saídas de definition():
+    #   "pandas" -> pandas.DataFrame (compatibilidade; padrão dos jobs antigos)
+    #   "arrow"  -> pyarrow.Table do read ao write, sem conversões (ver core/layers/columnar.py)
+    engine: str = "pandas"
+    # engines com definition implementada; jobs portados para "arrow" mantêm
+    # "pandas" como alternativa, escolhida com TABLE_ENGINE=pandas (ou --engine no CLI)
+    engines: tuple = ()
 
     def __init__(self, name: str):
         self.name = name
+        self.engine = self.resolve_engine()
         self.inputs: Dict[str, pd.DataFrame] = {}
+        # caminhos gravados pelo job ("<layer>/<path>"), registrados no journal do pipeline
+        self.outputs: List[str] = []
+
+    @classmethod
+    def resolve_engine(cls) -> str:
+        """TABLE_ENGINE, se o job suporta esse engine; senão o engine da classe."""
+        wanted = os.getenv("TABLE_ENGINE")
+        if wanted and wanted not in ("pandas", "arrow"):
+            raise ValueError(f"TABLE_ENGINE inválido: {wanted} (use pandas ou arrow)")
+        return wanted if wanted in (cls.engines or (cls.engine,)) else cls.engine
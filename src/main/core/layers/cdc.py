@@ -0,0 +1,224 @@
+"""
+Change data capture mês a mês para tabelas Silver (snapshot completo por período).
+
+  silver/<tabela>/<YYYYMM>.parquet        snapshot (com ROW_HASH)
+  silver/<tabela>_delta/<YYYYMM>.parquet  linhas I/U/D em relação ao período anterior
+
+O delta tem todas as colunas do snapshot + CDC_OP ("I" inserida, "U" alterada,
+"D" removida — com os valores antigos) + CDC_BASE (período de referência).
+Funções de linha/delta aceitam pandas.DataFrame ou pyarrow.Table (jobs com engine = "arrow").
+"""
+from __future__ import annotations
+import io
+import re
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from azure.core.exceptions import ResourceNotFoundError
+
+from src.main.core.layers import columnar
+
+HASH_COL = "ROW_HASH"
+OP_COL = "CDC_OP"
+BASE_COL = "CDC_BASE"
+DELTA_SUFFIX = "_delta"
+
+
+def delta_table(table_name: str) -> str:
+    return f"{table_name}{DELTA_SUFFIX}"
+
+
+def value_columns(df: pd.DataFrame, key: str, exclude: Iterable[str] = ()) -> List[str]:
+    skip = {key, HASH_COL, OP_COL, BASE_COL, *exclude}
+    names = df.column_names if isinstance(df, pa.Table) else df.columns
+    return sorted(c for c in names if c not in skip)
+
+
+def row_hash(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """
+    uint64 por linha sobre as colunas (ordem fixa, valores como texto -> estável entre dtypes).
+    Em pyarrow.Table só as colunas do hash passam pelo pandas (texto Arrow, sem cópia para
+    object), para o hash continuar igual ao dos snapshots já gravados.
+    """
+    if isinstance(df, pa.Table):
+        df = df.select(columns).to_pandas()
+    return pd.util.hash_pandas_object(df[columns].astype(str), index=False).to_numpy()
+
+
+def with_row_hash(df, columns: List[str]):
+    """Cópia de df com ROW_HASH (substitui a coluna se já existir)."""
+    hashes = row_hash(df, columns)
+    if isinstance(df, pa.Table):
+        if HASH_COL in df.column_names:
+            df = df.drop_columns([HASH_COL])
+        return df.append_column(HASH_COL, pa.array(hashes, type=pa.uint64()))
+    return df.assign(**{HASH_COL: hashes})
+
+
+def compute_delta(prev_keys: pd.DataFrame, cur: pd.DataFrame, key: str) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Hash join de [key, ROW_HASH] do período anterior com o atual.
+    Retorna (linhas I/U do atual com CDC_OP, chaves removidas).
+    """
+    if isinstance(cur, pa.Table):
+        return _compute_delta_arrow(prev_keys, cur, key)
+    joined = cur[[key, HASH_COL]].merge(prev_keys[[key, HASH_COL]], on=key, how="outer",
+                                        suffixes=("", "_prev"), indicator=True)
+    inserted = joined.loc[joined["_merge"] == "left_only", key]
+    changed = joined.loc[(joined["_merge"] == "both") & (joined[HASH_COL] != joined[f"{HASH_COL}_prev"]), key]
+    removed = joined.loc[joined["_merge"] == "right_only", key].to_numpy()
+
+    ops = pd.concat([pd.Series("I", index=inserted), pd.Series("U", index=changed)])
+    upserts = cur[cur[key].isin(ops.index)].copy()
+    upserts[OP_COL] = upserts[key].map(ops)
+    return upserts, removed
+
+
+def _compute_delta_arrow(prev_keys: pa.Table, cur: pa.Table, key: str) -> Tuple[pa.Table, np.ndarray]:
+    prev_hash = f"{HASH_COL}_prev"
+    joined = cur.select([key, HASH_COL]).join(
+        prev_keys.select([key, HASH_COL]).rename_columns([key, prev_hash]), key, join_type="full outer")
+    inserted = joined.filter(pc.is_null(joined[prev_hash]))[key]
+    changed = joined.filter(pc.fill_null(pc.not_equal(joined[HASH_COL], joined[prev_hash]), False))[key]
+    removed = joined.filter(pc.is_null(joined[HASH_COL]))[key].to_numpy()
+
+    upserted = pa.chunked_array(inserted.chunks + changed.chunks, type=cur[key].type).combine_chunks()
+    upserts = cur.filter(pc.is_in(cur[key], value_set=upserted))
+    ops = pc.if_else(pc.is_in(upserts[key], value_set=inserted.combine_chunks()), "I", "U")
+    return upserts.append_column(OP_COL, pc.cast(ops, pa.large_string())), removed
+
+
+# ------------------------------
+# Delta de um período (mesmo algoritmo para pandas.DataFrame e pyarrow.Table;
+# o tipo do snapshot atual decide o das leituras do anterior)
+# ------------------------------
+def _read_like(like, data: bytes, columns: List[str] | None = None, filters: list | None = None):
+    if isinstance(like, pa.Table):
+        return columnar.read_parquet(data, columns=columns, filters=filters)
+    return pd.read_parquet(io.BytesIO(data), engine="pyarrow", columns=columns, filters=filters)
+
+
+def _column_names(df) -> List[str]:
+    return df.column_names if isinstance(df, pa.Table) else list(df.columns)
+
+
+def _select(df, columns: List[str]):
+    return df.select(columns) if isinstance(df, pa.Table) else df[columns]
+
+
+def _with_constant(df, column: str, value):
+    if isinstance(df, pa.Table):
+        return df.append_column(column, columnar.constant(value, len(df)))
+    return df.assign(**{column: value})
+
+
+def _concat_like(like, parts: list):
+    if isinstance(like, pa.Table):
+        return columnar.concat(parts)
+    return pd.concat(parts, ignore_index=True)
+
+
+def compute_period_delta(cur, key: str, previous: bytes | None = None, exclude: Iterable[str] = ()):
+    """
+    Delta de `cur` (com ROW_HASH) contra o snapshot anterior em bytes Parquet:
+    hash join em [key, ROW_HASH] (só essas colunas são lidas do anterior) e
+    leitura filtrada das linhas removidas, com os valores antigos e op "D".
+    Sem anterior, tudo entra como "I". O chamador acrescenta CDC_BASE (with_base).
+    """
+    if previous is None:
+        return _with_constant(cur, OP_COL, "I")
+    if HASH_COL in pq.read_schema(io.BytesIO(previous)).names:
+        prev_keys = _read_like(cur, previous, columns=[key, HASH_COL])
+    else:  # snapshot gravado antes do CDC ser ligado
+        prev_keys = _read_like(cur, previous)
+        prev_keys = with_row_hash(prev_keys, value_columns(prev_keys, key, exclude))
+
+    upserts, removed = compute_delta(prev_keys, cur, key)
+    parts = [upserts]
+    if len(removed):
+        deleted = _read_like(cur, previous, filters=[(key, "in", list(removed))])
+        if HASH_COL not in _column_names(deleted):
+            deleted = with_row_hash(deleted, value_columns(deleted, key, exclude))
+        names = _column_names(deleted)
+        deleted = _select(deleted, [c for c in _column_names(cur) if c in names])
+        parts.append(_with_constant(deleted, OP_COL, "D"))
+    return _concat_like(cur, parts)
+
+
+def with_base(delta, base_period: str | None):
+    """CDC_BASE = período de referência do delta (nulo no primeiro)."""
+    return _with_constant(delta, BASE_COL, base_period)
+
+
+def op_counts(delta) -> dict:
+    """{op: linhas} do delta."""
+    if isinstance(delta, pa.Table):
+        return {v["values"]: v["counts"] for v in delta[OP_COL].value_counts().to_pylist()}
+    return delta[OP_COL].value_counts().to_dict()
+
+
+def apply_delta(base: pd.DataFrame, delta: pd.DataFrame, key: str) -> pd.DataFrame:
+    """base (snapshot do período anterior) + delta -> snapshot do período do delta."""
+    kept = base[~base[key].isin(delta[key])]
+    upserts = delta[delta[OP_COL] != "D"].drop(columns=[OP_COL, BASE_COL])
+    return pd.concat([kept, upserts[[c for c in kept.columns if c in upserts.columns]]], ignore_index=True)
+
+
+# ------------------------------
+# IO
+# ------------------------------
+def list_periods(fs_client, table_name: str) -> List[Tuple[str, str]]:
+    """[(YYYYMM, path)] de <tabela>/YYYYMM.parquet, em ordem; [] se a tabela não existe."""
+    out = []
+    try:
+        for p in fs_client.get_paths(path=table_name, recursive=True):
+            m = re.search(r"/(\d{6})\.parquet$", p.name)
+            if not p.is_directory and m:
+                out.append((m.group(1), p.name))
+    except (ResourceNotFoundError, FileNotFoundError):
+        return []
+    return sorted(out)
+
+
+def read_parquet(fs_client, path: str, columns: List[str] | None = None, filters: list | None = None) -> pd.DataFrame:
+    data = fs_client.get_file_client(path).download_file().readall()
+    return pd.read_parquet(io.BytesIO(data), engine="pyarrow", columns=columns, filters=filters)
+
+
+def rebuild_snapshot(fs_client, table_name: str, year_month: str, key: str,
+                     base_period: str | None = None) -> pd.DataFrame:
+    """
+    Reconstrói silver/<tabela> em year_month a partir de um snapshot base e dos
+    deltas seguintes. base_period=None usa o snapshot mais recente <= year_month
+    (o próprio mês, se existir). Falha se faltar algum delta na cadeia.
+    Colunas fora do hash (cdc_exclude, ex.: YYYYMM) ficam com o valor do mês
+    em que a linha mudou pela última vez.
+    """
+    snapshots = dict(list_periods(fs_client, table_name))
+    deltas = dict(list_periods(fs_client, delta_table(table_name)))
+
+    if base_period is None:
+        candidates = [ym for ym in snapshots if ym <= year_month]
+        if not candidates:
+            raise FileNotFoundError(f"Nenhum snapshot de silver/{table_name} até {year_month}")
+        base_period = max(candidates)
+    if base_period not in snapshots:
+        raise FileNotFoundError(f"Snapshot base silver/{table_name}/{base_period}.parquet não existe")
+
+    df = read_parquet(fs_client, snapshots[base_period])
+    current = base_period
+    for ym in sorted(p for p in deltas if base_period < p <= year_month):
+        delta = read_parquet(fs_client, deltas[ym])
+        delta_base = delta[BASE_COL].iloc[0] if len(delta) else current
+        if delta_base != current:
+            raise ValueError(f"Cadeia de deltas quebrada em {table_name}: {ym} é relativo a {delta_base}, "
+                             f"esperado {current}")
+        df = apply_delta(df, delta, key)
+        current = ym
+    if current != year_month:
+        raise FileNotFoundError(f"Sem delta de silver/{table_name} para chegar a {year_month} (parou em {current})")
+    return df
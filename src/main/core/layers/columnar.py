@@ -0,0 +1,112 @@
+"""
+Utilitários Arrow para jobs com engine = "arrow" (definition() recebe e devolve pyarrow.Table).
+
+Os dados ficam colunares do read ao write: CSV/Parquet são lidos direto para
+pyarrow.Table e gravados sem passar por pandas. Filtros, joins (encode/gather
+de core/layers/dimensions.py), group-bys e operações de texto usam
+pyarrow.compute, que paraleliza nos núcleos disponíveis.
+
+Equivalências usadas nos ports:
+    df.drop_duplicates(subset=k)          -> first_rows(t, k)
+    a + "_" + b                           -> concat_str(t, [a, b], "_")
+    pd.to_numeric(s, errors="coerce")     -> to_int(t[c])
+    df.groupby(col)                       -> partitions(t, col)
+    pd.concat([a, b], axis=1)             -> hstack([a, b])
+"""
+from __future__ import annotations
+import csv
+import io
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# mesmos marcadores de nulo do pandas.read_csv (dtype=str)
+NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+# ------------------------------
+# IO
+# ------------------------------
+def read_csv(data: bytes, encoding: str = "latin-1") -> pa.Table:
+    """CSV do DATASUS (';', aspas, latin-1) com todas as colunas como texto; linhas malformadas são puladas."""
+    import pyarrow.csv as pacsv
+    header = next(csv.reader([data.split(b"\n", 1)[0].decode(encoding).rstrip("\r")], delimiter=";"))
+
+    def skip(row):
+        print(f"  ! linha {row.number} ignorada: {row.text[:80]!r}")
+        return "skip"
+
+    return pacsv.read_csv(
+        io.BytesIO(data),
+        read_options=pacsv.ReadOptions(encoding=encoding),
+        parse_options=pacsv.ParseOptions(delimiter=";", quote_char='"', invalid_row_handler=skip),
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: pa.large_string() for c in header},
+            null_values=NULL_VALUES, strings_can_be_null=True,
+        ),
+    )
+
+
+def read_parquet(data: bytes, columns: List[str] | None = None, filters: list | None = None) -> pa.Table:
+    return pq.read_table(io.BytesIO(data), columns=columns, filters=filters)
+
+
+def to_parquet_bytes(table: pa.Table, compression: str = "snappy") -> bytes:
+    buf = io.BytesIO()
+    pq.write_table(table, buf, compression=compression)
+    return buf.getvalue()
+
+
+def concat(tables: List[pa.Table]) -> pa.Table:
+    """pd.concat(ignore_index=True) para tabelas de períodos diferentes (promove string/large_string, nulos etc.)."""
+    return pa.concat_tables(tables, promote_options="permissive")
+
+
+# ------------------------------
+# Compute
+# ------------------------------
+def first_rows(table: pa.Table, key: str) -> pa.Table:
+    """Primeira linha de cada valor de `key`, na ordem original (drop_duplicates(subset=key))."""
+    pos = pc.index_in(table[key], value_set=pc.unique(table[key])).to_numpy(zero_copy_only=False)
+    _, first = np.unique(pos, return_index=True)
+    if len(first) == table.num_rows:
+        return table
+    return table.take(np.sort(first))
+
+
+def hstack(tables: List[pa.Table]) -> pa.Table:
+    """Colunas de várias tabelas de mesmo comprimento lado a lado (pd.concat(axis=1))."""
+    return pa.Table.from_arrays([c for t in tables for c in t.columns],
+                                names=[n for t in tables for n in t.column_names])
+
+
+def concat_str(table: pa.Table, columns: List[str], sep: str = "") -> pa.ChunkedArray:
+    """Concatenação elemento a elemento (nulo em qualquer coluna -> nulo, como o + do pandas)."""
+    arrays = [table[c] for c in columns]
+    return pc.binary_join_element_wise(*arrays, pa.scalar(sep, arrays[0].type))
+
+
+def to_int(values: pa.ChunkedArray | pa.Array, type: pa.DataType = pa.int64()) -> pa.ChunkedArray:
+    """Texto -> inteiro; valores não numéricos viram nulo (pd.to_numeric(errors="coerce"))."""
+    if pa.types.is_integer(values.type):
+        return pc.cast(values, type)
+    text = pc.utf8_trim_whitespace(values)
+    valid = pc.match_substring_regex(text, r"^[+-]?\d+$")
+    return pc.cast(pc.if_else(valid, text, pa.scalar(None, text.type)), type)
+
+
+def constant(value, length: int, type: pa.DataType = pa.large_string()) -> pa.Array:
+    return pa.repeat(pa.scalar(value, type), length)
+
+
+def partitions(table: pa.Table, column: str) -> Iterator[Tuple[object, pa.Table]]:
+    """(valor, linhas) para cada valor de `column`, em ordem crescente (groupby(col, sort=True))."""
+    for value in pc.unique(table[column]).sort().to_pylist():
+        if value is not None:
+            yield value, table.filter(pc.equal(table[column], value))
@@ -0,0 +1,86 @@
+"""
+Dimensões compartilhadas com códigos inteiros densos (silver/dim_<nome>/<YYYYMM>.parquet).
+
+Uma dimensão é a tabela de referência deduplicada pela chave natural e
+ordenada por ela; o código (SK_*, int32) é a posição da linha. Assim o fato
+guarda só o código, e "juntar" atributos é um take no array da coluna:
+
+    codes = encode(dim, "CO_CBO", fatos["CO_CBO"])      # -1 = sem correspondência
+    attrs = gather(dim, codes[codes >= 0], ["DS_ATIVIDADE_PROFISSIONAL"])
+
+Os códigos valem só com a dimensão do mesmo mês (chaves novas deslocam as posições).
+encode/gather aceitam também pyarrow.Table (jobs com engine = "arrow"): o lookup
+vira pc.index_in e o gather um Table.take.
+"""
+from __future__ import annotations
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+DIM_PREFIX = "dim_"
+
+
+def dim_table(name: str) -> str:
+    return f"{DIM_PREFIX}{name}"
+
+
+def build_dimension(df: pd.DataFrame, key: str | List[str], code_col: str,
+                    attributes: List[str] | None = None) -> pd.DataFrame:
+    """[code_col, *key, *attributes]: 1ª ocorrência de cada chave, ordenada pela chave, código = posição."""
+    keys = [key] if isinstance(key, str) else list(key)
+    cols = keys + [c for c in (attributes or []) if c not in keys]
+    dim = (df[cols].dropna(subset=keys)
+           .drop_duplicates(subset=keys, keep="first")
+           .sort_values(keys, kind="stable")
+           .reset_index(drop=True))
+    dim.insert(0, code_col, np.arange(len(dim), dtype=np.int32))
+    return dim
+
+
+def encode(dim: pd.DataFrame, key: str | List[str], values: pd.Series | pd.DataFrame) -> np.ndarray:
+    """
+    Código da dimensão para cada valor de chave (int32, -1 quando ausente).
+    Chave composta: `values` é um DataFrame com as colunas na ordem de `key` (nomes livres).
+    """
+    if isinstance(dim, pa.Table):
+        return _encode_arrow(dim, key, values)
+    if isinstance(key, str):
+        codes = pd.Index(dim[key]).get_indexer(values)
+    else:
+        index = pd.MultiIndex.from_frame(dim[list(key)])
+        codes = index.get_indexer(pd.MultiIndex.from_frame(values))
+    return codes.astype(np.int32, copy=False)
+
+
+def gather(dim: pd.DataFrame, codes: np.ndarray, columns: List[str], fill_missing: bool = False) -> pd.DataFrame:
+    """
+    Atributos da dimensão nas posições `codes`, um take por coluna (sem passar por object).
+    Códigos -1 só são aceitos com fill_missing=True (viram nulo, como num left join).
+    """
+    if isinstance(dim, pa.Table):
+        indices = pa.array(codes, mask=codes < 0) if fill_missing else codes
+        return dim.select(columns).take(indices)
+    return pd.DataFrame({c: dim[c].array.take(codes, allow_fill=fill_missing) for c in columns})
+
+
+# separador das chaves compostas no lookup Arrow (index_in não aceita struct)
+_KEY_SEP = "\x1f"
+
+
+def _encode_arrow(dim: pa.Table, key: str | List[str], values: pa.ChunkedArray | pa.Table) -> np.ndarray:
+    if isinstance(key, str):
+        value_set, lookup = dim[key], values
+    else:
+        value_set = _join_keys([dim[k] for k in key])
+        lookup = _join_keys(values.columns)
+    value_set = pc.cast(value_set, lookup.type).combine_chunks()
+    codes = pc.fill_null(pc.index_in(lookup, value_set=value_set), -1)
+    return codes.to_numpy().astype(np.int32, copy=False)
+
+
+def _join_keys(columns: list) -> pa.ChunkedArray:
+    text = pa.large_string()
+    return pc.binary_join_element_wise(*[pc.cast(c, text) for c in columns], pa.scalar(_KEY_SEP, text))
@@ -2,12 +2,20 @@ import io
 import re
 import pandas as pd
 from typing import List, Tuple
+from azure.core.exceptions import ResourceNotFoundError
 from src.main.core.infra.table import Table
 from src.main.core.infra.storage import silver as silver_store, gold as gold_store
+from src.main.core.infra.profiling import profiler
+from src.main.core.infra.leases import check_fence
+from src.main.core.layers import cdc, columnar
 
 class Gold(Table):
     layer = "gold"
     allowed_layers = ["silver", "gold"]
+    # True -> grava em <name>/year_month=YYYYMM/data.parquet (requer self.year_month)
+    partitioned: bool = False
+    # "<col>" -> grava um arquivo por valor: <name>/<col>=<valor>/data.parquet
+    partition_by: str | None = None
 
     def __init__(self, name: str, silver_store=silver_store, gold_store=gold_store):
         super().__init__(name)
@@ -18,11 +26,24 @@ class Gold(Table):
     # Helpers genéricos internos
     # ------------------------------
     def _download_bytes(self, fs_client, path: str) -> bytes:
-        return fs_client.get_file_client(path).download_file().readall()
+        with profiler.phase("download", path=path) as ph:
+            data = fs_client.get_file_client(path).download_file().readall()
+            ph.bytes = len(data)
+        return data
 
-    def _read_single_parquet(self, fs_client, path: str) -> pd.DataFrame:
+    def _read_single_parquet(self, fs_client, path: str, columns: List[str] | None = None,
+                             filters: list | None = None) -> pd.DataFrame:
         data = self._download_bytes(fs_client, path)
-        return pd.read_parquet(io.BytesIO(data), engine="pyarrow")
+        with profiler.phase("parse", path=path) as ph:
+            if self.engine == "arrow":
+                df = columnar.read_parquet(data, columns=columns, filters=filters)
+            else:
+                df = pd.read_parquet(io.BytesIO(data), engine="pyarrow", columns=columns, filters=filters)
+            ph.rows_out = len(df)
+        return df
+
+    def _concat(self, frames: list):
+        return columnar.concat(frames) if self.engine == "arrow" else pd.concat(frames, ignore_index=True)
 
     def _list_parquets(self, fs_client, base_table_path: str) -> List[Tuple[str, str]]:
         """
@@ -32,7 +53,9 @@ class Gold(Table):
           - <table>/year_month=YYYYMM/data.parquet
         """
         out: List[Tuple[str, str]] = []
-        for p in fs_client.get_paths(path=base_table_path, recursive=True):
+        with profiler.phase("list", path=base_table_path):
+            paths = list(fs_client.get_paths(path=base_table_path, recursive=True))
+        for p in paths:
             if not p.is_directory and p.name.endswith(".parquet"):
                 ym = None
                 m1 = re.search(r"/(\d{6})\.parquet$", p.name)
@@ -49,7 +72,8 @@ class Gold(Table):
     # ------------------------------
     # Leitura da SILVER
     # ------------------------------
-    def read_silver_parquet(self, table_name: str, year_month: str | None = None) -> pd.DataFrame:
+    def read_silver_parquet(self, table_name: str, year_month: str | None = None,
+                           columns: List[str] | None = None) -> pd.DataFrame:
         files = self._list_parquets(self._silver_fs, table_name)
         if not files:
             raise FileNotFoundError(f"Nenhum Parquet encontrado em silver/{table_name}")
@@ -58,18 +82,32 @@ class Gold(Table):
             sel = [path for ym, path in files if ym == year_month]
             if not sel:
                 raise FileNotFoundError(f"Não achei silver/{table_name} para {year_month}")
-            return self._read_single_parquet(self._silver_fs, sel[0])
+            return self._read_single_parquet(self._silver_fs, sel[0], columns=columns)
 
         # todos os períodos
-        return pd.concat(
-            [self._read_single_parquet(self._silver_fs, path) for _, path in files],
-            ignore_index=True
-        )
+        return self._concat([self._read_single_parquet(self._silver_fs, path, columns=columns) for _, path in files])
+
+    def read_silver_delta(self, table_name: str, year_month: str,
+                          columns: List[str] | None = None) -> pd.DataFrame:
+        """Linhas alteradas de silver/<tabela> em year_month (CDC_OP I/U/D), para atualizações incrementais."""
+        return self.read_silver_parquet(cdc.delta_table(table_name), year_month, columns=columns)
+
+    def read_silver_snapshot(self, table_name: str, year_month: str, key: str = "SK_REGISTRO",
+                             base_period: str | None = None) -> pd.DataFrame:
+        """Snapshot de year_month reconstruído a partir de base_period + deltas (ver cdc.rebuild_snapshot)."""
+        with profiler.phase("rebuild", table=table_name, year_month=year_month) as ph:
+            df = cdc.rebuild_snapshot(self._silver_fs, table_name, year_month, key, base_period=base_period)
+            ph.rows_out = len(df)
+        if self.engine == "arrow":  # a reconstrução em si continua em pandas
+            import pyarrow as pa
+            return pa.Table.from_pandas(df, preserve_index=False)
+        return df
 
     # ------------------------------
     # Leitura da GOLD (novo)
     # ------------------------------
-    def read_gold_parquet(self, table_name: str, year_month: str | None = None) -> pd.DataFrame:
+    def read_gold_parquet(self, table_name: str, year_month: str | None = None,
+                           columns: List[str] | None = None) -> pd.DataFrame:
         files = self._list_parquets(self._gold_fs, table_name)
         if not files:
             raise FileNotFoundError(f"Nenhum Parquet encontrado em gold/{table_name}")
@@ -78,13 +116,43 @@ class Gold(Table):
             sel = [path for ym, path in files if ym == year_month]
             if not sel:
                 raise FileNotFoundError(f"Não achei gold/{table_name} para {year_month}")
-            return self._read_single_parquet(self._gold_fs, sel[0])
+            return self._read_single_parquet(self._gold_fs, sel[0], columns=columns)
 
         # todos os períodos
-        return pd.concat(
-            [self._read_single_parquet(self._gold_fs, path) for _, path in files],
-            ignore_index=True
-        )
+        return self._concat([self._read_single_parquet(self._gold_fs, path, columns=columns) for _, path in files])
+
+    # ------------------------------
+    # Tabelas particionadas por coluna (<table>/<col>=<valor>/data.parquet)
+    # ------------------------------
+    def _list_partitions(self, fs_client, base_table_path: str, partition_col: str) -> List[Tuple[str, str]]:
+        out: List[Tuple[str, str]] = []
+        pattern = re.compile(rf"{re.escape(partition_col)}=([^/]+)/data\.parquet$")
+        with profiler.phase("list", path=base_table_path):
+            paths = list(fs_client.get_paths(path=base_table_path, recursive=True))
+        for p in paths:
+            if not p.is_directory:
+                m = pattern.search(p.name)
+                if m:
+                    out.append((m.group(1), p.name))
+        out.sort(key=lambda t: t[0])
+        return out
+
+    def read_gold_partitions(self, table_name: str, partition_col: str, values: List | None = None,
+                             columns: List[str] | None = None, filters: list | None = None) -> pd.DataFrame:
+        """
+        Lê partições gold/<table>/<col>=<valor>/data.parquet.
+          - values=None -> todas as partições
+          - values=[...] -> só as partições pedidas (as demais nem são baixadas)
+          - filters -> pushdown de linhas dentro de cada partição (sintaxe do pyarrow)
+        """
+        files = self._list_partitions(self._gold_fs, table_name, partition_col)
+        if values is not None:
+            wanted = {str(v) for v in values}
+            files = [(v, path) for v, path in files if v in wanted]
+        if not files:
+            raise FileNotFoundError(f"Nenhuma partição {partition_col}= encontrada em gold/{table_name}")
+        return self._concat([self._read_single_parquet(self._gold_fs, path, columns=columns, filters=filters)
+                             for _, path in files])
 
     # utilitários de períodos (opcionais)
     def list_silver_periods(self, table_name: str) -> List[str]:
@@ -104,16 +172,50 @@ class Gold(Table):
     # ------------------------------
     # Escrita na GOLD
     # ------------------------------
-    def _write_parquet_to_gold(self, df: pd.DataFrame) -> None:
-        if not isinstance(df, pd.DataFrame):
-            raise TypeError("definition() deve retornar um pandas.DataFrame")
+    def _gold_dest_path(self, table_name: str | None = None) -> str:
+        name = table_name or self.name
+        if self.partitioned:
+            return f"{name}/year_month={self.year_month}/data.parquet"
+        return f"{name}/data.parquet"
+
+    def _write_parquet_to_gold(self, df) -> None:
+        if isinstance(df, dict):
+            # vários destinos de uma vez (ex.: níveis do cubo): {tabela: DataFrame}
+            for table_name, part in df.items():
+                self._write_gold_table(part, table_name)
+            return
+        self._write_gold_table(df, self.name)
+
+    def _write_gold_table(self, df, table_name: str) -> None:
         import pyarrow as pa  # mantido local como na Silver
-        import pyarrow.parquet as pq
-        buf = io.BytesIO()
-        df.to_parquet(buf, index=False, engine="pyarrow", compression="snappy")
-        buf.seek(0)
-        dest_path = f"{self.name}/data.parquet"
-        self._gold_fs.get_file_client(dest_path).upload_data(buf.getvalue(), overwrite=True)
+        if not isinstance(df, (pd.DataFrame, pa.Table)):
+            raise TypeError("definition() deve retornar um pandas.DataFrame ou pyarrow.Table")
+        if self.partition_by:
+            parts = (columnar.partitions(df, self.partition_by) if isinstance(df, pa.Table)
+                     else df.groupby(self.partition_by, sort=True))
+            for value, part in parts:
+                self._upload_parquet(part, f"{table_name}/{self.partition_by}={value}/data.parquet")
+            try:  # layout antigo (não particionado) da mesma tabela: leitores recursivos leriam em dobro
+                self._gold_fs.get_file_client(f"{table_name}/data.parquet").delete_file()
+            except (ResourceNotFoundError, FileNotFoundError):
+                pass
+            return
+        self._upload_parquet(df, self._gold_dest_path(table_name))
+
+    def _upload_parquet(self, df, dest_path: str) -> None:
+        with profiler.phase("serialize", path=dest_path) as ph:
+            if isinstance(df, pd.DataFrame):
+                buf = io.BytesIO()
+                df.to_parquet(buf, index=False, engine="pyarrow", compression="snappy")
+                data = buf.getvalue()
+            else:
+                data = columnar.to_parquet_bytes(df)
+            ph.rows_in, ph.bytes = len(df), len(data)
+        check_fence()
+        with profiler.phase("upload", path=dest_path) as ph:
+            self._gold_fs.get_file_client(dest_path).upload_data(data, overwrite=True)
+            ph.bytes = len(data)
+        self.outputs.append(f"gold/{dest_path}")
         print(f"  → Gravado em gold: {dest_path} ({len(df)} registros)")
 
     # ------------------------------
@@ -123,5 +225,7 @@ class Gold(Table):
         print(f"Processando Gold: {self.name} para período {getattr(self, 'year_month', 'TODOS')}")
         if not hasattr(self, "definition"):
             raise AttributeError("Implemente .definition(self) na subclasse.")
-        df = self.definition()
+        with profiler.phase("definition") as ph:
+            df = self.definition()
+            ph.rows_out = sum(map(len, df.values())) if isinstance(df, dict) else len(df)
         self._write_parquet_to_gold(df)
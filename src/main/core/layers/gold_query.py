@@ -0,0 +1,350 @@
+"""
+Consultas sobre a Gold com as tabelas residentes em memória (Arrow).
+
+    from src.main.core.layers.gold_query import GoldQuery
+    q = GoldQuery()
+    q.lookup("cnes_estabelecimentos_metrics", CO_MUNICIPIO_SEM_DIGITO=355030,
+             PERIODO=(202301, 202312))
+    q.aggregate("cnes_estabelecimentos_metrics", by=["YYYY"],
+                aggs={"TOTAL_PROFISSIONAIS": "sum"}, DS_ATIVIDADE_PROFISSIONAL="MEDICO CLINICO")
+
+Cada tabela é carregada inteira uma vez (todos os data.parquet, com colunas de
+partição hive) e ganha PERIODO (int YYYYMM) quando houver YYYYMM, YYYY+MM ou
+year_month=. Índices: ordenado para colunas inteiras (ponto e intervalo via
+searchsorted), hash para as demais (valor -> linhas). A tabela só é relida
+quando os ETags dos arquivos mudam (checado no máximo a cada refresh_interval s;
+sem ETag, vale tamanho + last_modified). A releitura trava só a própria tabela,
+e quem chega durante ela recebe a versão anterior.
+
+Filtros: valor escalar (igualdade), tupla (min, max) inclusiva ou lista (IN).
+"""
+from __future__ import annotations
+import io
+import json
+import threading
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from azure.core.exceptions import ResourceNotFoundError
+
+from src.main.core.infra.storage import gold as gold_store
+from src.main.core.infra.profiling import profiler
+
+PERIOD_COL = "PERIODO"
+INDEX_COLUMNS = ["CO_MUNICIPIO_SEM_DIGITO", "DS_ATIVIDADE_PROFISSIONAL", PERIOD_COL]
+# nomes curtos aceitos pelo CLI/HTTP
+ALIASES = {"municipio": "CO_MUNICIPIO_SEM_DIGITO", "atividade": "DS_ATIVIDADE_PROFISSIONAL",
+           "periodo": PERIOD_COL}
+
+
+class SortedIndex:
+    """Colunas inteiras: argsort + searchsorted (ponto, intervalo e IN)."""
+
+    def __init__(self, values: np.ndarray):
+        self.order = np.argsort(values, kind="stable")
+        self.sorted = values[self.order]
+
+    def rows(self, cond) -> np.ndarray:
+        if isinstance(cond, tuple):
+            lo, hi = cond
+            a = 0 if lo is None else np.searchsorted(self.sorted, int(lo), side="left")
+            b = len(self.sorted) if hi is None else np.searchsorted(self.sorted, int(hi), side="right")
+            return self.order[a:b]
+        # valores repetidos no IN não repetem linhas
+        values = np.unique([int(v) for v in (cond if isinstance(cond, list) else [cond])])
+        parts = [self.order[np.searchsorted(self.sorted, v, side="left"):
+                            np.searchsorted(self.sorted, v, side="right")] for v in values]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+class HashIndex:
+    """Demais colunas: valor -> posições (um factorize + argsort na carga)."""
+
+    def __init__(self, values: np.ndarray):
+        codes, uniques = pd.factorize(values)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self.rows_by_value = {v: order[bounds[i]:bounds[i + 1]] for i, v in enumerate(uniques)}
+
+    def rows(self, cond) -> np.ndarray:
+        if isinstance(cond, tuple):
+            raise ValueError("Intervalo só é suportado em colunas inteiras (índice ordenado)")
+        values = dict.fromkeys(str(v) for v in (cond if isinstance(cond, list) else [cond]))
+        parts = [self.rows_by_value.get(v, np.empty(0, dtype=np.int64)) for v in values]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+class ResidentTable:
+    def __init__(self, name: str, table: pa.Table, etags: Tuple, index_columns: List[str]):
+        self.name = name
+        self.table = table
+        self.etags = etags
+        self.loaded_at = time.time()
+        self.checked_at = self.loaded_at
+        self.indexes: Dict[str, SortedIndex | HashIndex] = {}
+        for col in index_columns:
+            if col not in table.column_names:
+                continue
+            arr = table.column(col)
+            if pa.types.is_integer(arr.type):
+                self.indexes[col] = SortedIndex(arr.fill_null(-1).to_numpy())
+            else:
+                self.indexes[col] = HashIndex(arr.cast(pa.string()).to_numpy(zero_copy_only=False))
+
+    def select(self, filters: dict) -> pa.Table:
+        indexed = {c: v for c, v in filters.items() if c in self.indexes}
+        others = {c: v for c, v in filters.items() if c not in self.indexes}
+
+        table = self.table
+        if indexed:
+            candidates = sorted((self.indexes[c].rows(v) for c, v in indexed.items()), key=len)
+            rows = candidates[0]
+            # rows() devolve posições sem repetição (valores distintos -> faixas disjuntas)
+            for other in candidates[1:]:
+                rows = np.intersect1d(rows, other, assume_unique=True)
+            table = table.take(pa.array(np.sort(rows)))
+        for col, cond in others.items():
+            if col not in table.column_names:
+                raise KeyError(f"Coluna {col} não existe em gold/{self.name}")
+            table = table.filter(_mask(table.column(col), cond))
+        return table
+
+
+def _mask(column: pa.ChunkedArray, cond):
+    if isinstance(cond, tuple):
+        lo, hi = cond
+        masks = []
+        if lo is not None:
+            masks.append(pc.greater_equal(column, pa.scalar(lo).cast(column.type)))
+        if hi is not None:
+            masks.append(pc.less_equal(column, pa.scalar(hi).cast(column.type)))
+        return masks[0] if len(masks) == 1 else pc.and_(*masks)
+    values = cond if isinstance(cond, list) else [cond]
+    return pc.is_in(column, value_set=pa.array(values).cast(column.type))
+
+
+def _version(path) -> str | None:
+    """ETag do arquivo; sem ETag no backend, tamanho + last_modified (ainda muda a cada escrita)."""
+    etag = getattr(path, "etag", None)
+    if etag:
+        return etag
+    size, modified = getattr(path, "content_length", None), getattr(path, "last_modified", None)
+    return f"{size}:{modified}" if size is not None or modified is not None else None
+
+
+def _with_partitions(table: pa.Table, path: str) -> pa.Table:
+    """Colunas hive do caminho (<col>=<valor>/) que não estão no arquivo."""
+    for segment in path.split("/")[:-1]:
+        if "=" in segment:
+            col, value = segment.split("=", 1)
+            if col not in table.column_names:
+                table = table.append_column(col, pa.array([value] * len(table), pa.string()))
+    return table
+
+
+def _decode_dictionaries(table: pa.Table) -> pa.Table:
+    """Categóricas do pandas (dictionary) viram o tipo dos valores: filtros e group_by uniformes."""
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, pc.cast(table.column(i), field.type.value_type))
+    return table
+
+
+def _with_period(table: pa.Table) -> pa.Table:
+    if PERIOD_COL in table.column_names:
+        return table
+    names = table.column_names
+    if "YYYYMM" in names:
+        period = pc.cast(pc.cast(table.column("YYYYMM"), pa.string()), pa.int32())
+    elif "YYYY" in names and "MM" in names:
+        yyyy = pc.cast(pc.cast(table.column("YYYY"), pa.string()), pa.int32())
+        mm = pc.cast(pc.cast(table.column("MM"), pa.string()), pa.int32())
+        period = pc.add(pc.multiply(yyyy, 100), mm)
+    elif "year_month" in names:
+        period = pc.cast(table.column("year_month"), pa.int32())
+    else:
+        return table
+    return table.append_column(PERIOD_COL, period)
+
+
+class GoldQuery:
+    """
+    Leitor da Gold com tabelas residentes e índices. Não é um job (nem Table):
+    uma instância por processo de consulta, sem outputs nem registro no journal.
+    """
+
+    def __init__(self, gold_store=gold_store, index_columns: List[str] | None = None,
+                 refresh_interval: float = 30.0):
+        self._gold_fs = gold_store.fs
+        self.index_columns = index_columns or INDEX_COLUMNS
+        self.refresh_interval = refresh_interval
+        self._tables: Dict[str, ResidentTable] = {}
+        self._locks: Dict[str, threading.Lock] = {}  # um por tabela: carga/refresh
+        self._lock = threading.Lock()  # só protege self._locks
+
+    # ------------------------------
+    # Carga e refresh
+    # ------------------------------
+    def _files(self, name: str) -> List[Tuple[str, str | None]]:
+        with profiler.phase("list", path=name):
+            try:
+                paths = [p for p in self._gold_fs.get_paths(path=name, recursive=True)
+                         if not p.is_directory and p.name.endswith(".parquet")]
+            except ResourceNotFoundError:
+                paths = []
+        if not paths:
+            raise FileNotFoundError(f"Nenhum Parquet encontrado em gold/{name}")
+        return sorted((p.name, _version(p)) for p in paths)
+
+    def _load(self, name: str, files: List[Tuple[str, str | None]]) -> ResidentTable:
+        parts = []
+        for path, _ in files:
+            with profiler.phase("download", path=path) as ph:
+                data = self._gold_fs.get_file_client(path).download_file().readall()
+                ph.bytes = len(data)
+            with profiler.phase("parse", path=path) as ph:
+                part = _with_partitions(pq.read_table(io.BytesIO(data)), path)
+                ph.rows_out = part.num_rows
+            parts.append(part)
+        table = pa.concat_tables([_decode_dictionaries(p) for p in parts], promote_options="permissive")
+        table = _with_period(table.combine_chunks())
+        with profiler.phase("index", table=name, rows_in=table.num_rows):
+            return ResidentTable(name, table, tuple(files), self.index_columns)
+
+    def _table_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def table(self, name: str) -> ResidentTable:
+        """Tabela residente; relê só se a lista de arquivos/ETags mudou."""
+        resident = self._tables.get(name)
+        if resident is not None and time.time() - resident.checked_at < self.refresh_interval:
+            return resident
+        lock = self._table_lock(name)
+        # já carregada: se outra thread está checando/relendo, serve a versão atual
+        if not lock.acquire(blocking=resident is None):
+            return resident
+        try:
+            resident = self._tables.get(name)
+            now = time.time()
+            if resident is not None and now - resident.checked_at < self.refresh_interval:
+                return resident  # carregada enquanto esperava o lock
+            files = self._files(name)
+            if resident is None or tuple(files) != resident.etags:
+                resident = self._load(name, files)
+                self._tables[name] = resident
+            resident.checked_at = now
+            return resident
+        finally:
+            lock.release()
+
+    def tables(self) -> List[dict]:
+        return [{"name": t.name, "rows": t.table.num_rows, "files": len(t.etags),
+                 "indexes": sorted(t.indexes), "loaded_at": t.loaded_at} for t in self._tables.values()]
+
+    # ------------------------------
+    # Consultas
+    # ------------------------------
+    def lookup(self, name: str, columns: List[str] | None = None, limit: int | None = None,
+               **filters) -> pa.Table:
+        out = self.table(name).select(filters)
+        if columns:
+            out = out.select(columns)
+        return out.slice(0, limit) if limit is not None else out
+
+    def aggregate(self, name: str, by: List[str], aggs: Dict[str, str], **filters) -> pa.Table:
+        """GROUP BY `by` com aggs {coluna: sum|mean|min|max|count|count_distinct}."""
+        selected = self.table(name).select(filters)
+        out = selected.group_by(by).aggregate([(col, fn) for col, fn in aggs.items()])
+        return out.sort_by([(c, "ascending") for c in by]) if by else out
+
+
+# ------------------------------
+# Parâmetros textuais (CLI / HTTP)
+# ------------------------------
+def parse_filter(value: str):
+    """'a..b' -> (a, b) (lados opcionais); 'a,b,c' -> [a, b, c]. Os valores são convertidos no tipo da coluna."""
+    if ".." in value:
+        lo, hi = value.split("..", 1)
+        return (lo or None, hi or None)
+    if "," in value:
+        return value.split(",")
+    return value
+
+
+def parse_aggs(specs: List[str]) -> Dict[str, str]:
+    """['TOTAL_PROFISSIONAIS:sum', ...] -> {coluna: função}."""
+    out = {}
+    for spec in specs:
+        col, _, fn = spec.partition(":")
+        out[col] = fn or "sum"
+    return out
+
+
+def run_query(engine: GoldQuery, name: str, filters: Dict[str, str], columns: List[str] | None = None,
+              group_by: List[str] | None = None, aggs: List[str] | None = None,
+              limit: int | None = None) -> pa.Table:
+    parsed = {ALIASES.get(k, k): parse_filter(v) for k, v in filters.items()}
+    if group_by or aggs:
+        return engine.aggregate(name, by=group_by or [], aggs=parse_aggs(aggs or []), **parsed)
+    return engine.lookup(name, columns=columns, limit=limit, **parsed)
+
+
+def serve(engine: GoldQuery, host: str = "127.0.0.1", port: int = 8765) -> None:
+    """
+    HTTP mínimo (somente leitura, JSON):
+      GET /tables
+      GET /query/<tabela>?municipio=355030&periodo=202301..202312&columns=A,B&limit=100
+      GET /query/<tabela>?atividade=MEDICO%20CLINICO&group_by=YYYY&agg=TOTAL_PROFISSIONAIS:sum
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    reserved = {"columns", "group_by", "agg", "limit"}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload) -> None:
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            parts = [p for p in url.path.split("/") if p]
+            try:
+                if parts == ["tables"]:
+                    return self._send(200, engine.tables())
+                if len(parts) != 2 or parts[0] != "query":
+                    return self._send(404, {"error": "use /tables ou /query/<tabela>"})
+                t0 = time.perf_counter()
+                split = lambda k: params[k].split(",") if params.get(k) else None
+                out = run_query(engine, parts[1], {k: v for k, v in params.items() if k not in reserved},
+                                columns=split("columns"), group_by=split("group_by"), aggs=split("agg"),
+                                limit=int(params["limit"]) if "limit" in params else None)
+                self._send(200, {"rows": out.to_pylist(), "n": out.num_rows,
+                                 "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2)})
+            except FileNotFoundError as e:
+                self._send(404, {"error": str(e)})
+            except (KeyError, ValueError, TypeError, pa.ArrowInvalid) as e:
+                self._send(400, {"error": f"{type(e).__name__}: {e}"})
+
+        def log_message(self, fmt, *args):
+            print(f"  {self.address_string()} {fmt % args}")
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"→ Servindo gold em http://{host}:{port} (/tables, /query/<tabela>) — Ctrl+C para sair")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
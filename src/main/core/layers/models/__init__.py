@@ -1,4 +1,9 @@
 # src/main/core/layers/models/__init__.py
-from .model import Model
+from .model import Model, quality_metrics
+from .artifact_store import ArtifactStore
+from .cache import ArtifactCache, get_artifact_cache
+from .predictor import Predictor
+from .validation import time_series_cv, rolling_origin_folds
 
-__all__ = ["Model"]
+__all__ = ["Model", "quality_metrics", "ArtifactStore", "ArtifactCache", "get_artifact_cache", "Predictor",
+           "time_series_cv", "rolling_origin_folds"]
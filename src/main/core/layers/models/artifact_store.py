@@ -0,0 +1,187 @@
+# src/main/core/layers/models/artifact_store.py
+from __future__ import annotations
+import hashlib
+import io
+import json
+import platform
+from datetime import datetime, timezone
+import joblib
+import pandas as pd
+from azure.core.exceptions import ResourceNotFoundError
+
+from ...infra.storage import artifacts as artifacts_store
+from ...infra.profiling import profiler
+
+
+COMPRESSIONS = ("zlib", "gzip", "bz2", "lzma", "xz", "lz4")
+
+
+def parse_compression(compression: str | None):
+    """
+    "zlib" | "zlib:3" | "lz4" | "gzip:6" | "xz" | None -> argumento `compress` do joblib.
+    None = sem compressão (permite mmap no ArtifactCache).
+    """
+    if not compression:
+        return 0
+    method, _, level = compression.partition(":")
+    if method not in COMPRESSIONS:
+        raise ValueError(f"Compressão desconhecida: {method} (use {', '.join(COMPRESSIONS)})")
+    if method == "lz4":
+        try:
+            import lz4  # noqa: F401 — o joblib só usa se estiver instalado
+        except ImportError:
+            raise ValueError("Compressão lz4 requer o pacote lz4 (pip install lz4)") from None
+    return (method, int(level)) if level else (method, 3)
+
+
+class ArtifactStore:
+    """
+    Store versionado de artefatos em artifacts/:
+
+        <name>/versions/<version>/model.joblib    (imutável)
+        <name>/versions/<version>/metadata.json   (sidecar: QC, período, features, inputs, tamanho)
+        <name>/latest.json                        (ponteiro para a versão corrente)
+
+    O blob e o sidecar são gravados com overwrite=False; o ponteiro só é trocado
+    depois deles, num único upload pequeno — leitores nunca veem uma versão
+    incompleta. Listar/comparar/escolher versões lê apenas os sidecars.
+    """
+
+    def __init__(self, artifacts_fs=None):
+        self._fs = artifacts_fs or artifacts_store.fs
+
+    # ------------------------------
+    # Paths
+    # ------------------------------
+    @staticmethod
+    def version_dir(name: str, version: str) -> str:
+        return f"{name}/versions/{version}"
+
+    @classmethod
+    def model_path(cls, name: str, version: str) -> str:
+        return f"{cls.version_dir(name, version)}/model.joblib"
+
+    @classmethod
+    def metadata_path(cls, name: str, version: str) -> str:
+        return f"{cls.version_dir(name, version)}/metadata.json"
+
+    @staticmethod
+    def latest_path(name: str) -> str:
+        return f"{name}/latest.json"
+
+    # ------------------------------
+    # IO helpers
+    # ------------------------------
+    def _read_json(self, path: str) -> dict:
+        return json.loads(self._fs.get_file_client(path).download_file().readall())
+
+    def _write_json(self, path: str, payload: dict, overwrite: bool) -> None:
+        data = json.dumps(payload, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+        self._fs.get_file_client(path).upload_data(data, overwrite=overwrite)
+
+    # ------------------------------
+    # Escrita
+    # ------------------------------
+    def save(self, obj, name: str, metadata: dict | None = None, compression: str | None = None) -> dict:
+        with profiler.phase("serialize", artifact=name) as ph:
+            buf = io.BytesIO()
+            joblib.dump(obj, buf, compress=parse_compression(compression))
+            blob = buf.getvalue()
+            ph.bytes = len(blob)
+
+        sha256 = hashlib.sha256(blob).hexdigest()
+        created_at = datetime.now(timezone.utc)
+        version = f"{created_at:%Y%m%dT%H%M%SZ}-{sha256[:8]}"
+
+        meta = {
+            **(metadata or {}),
+            "name": name,
+            "version": version,
+            "created_at": created_at.isoformat(),
+            "model_path": self.model_path(name, version),
+            "compression": compression,
+            "size_bytes": len(blob),
+            "sha256": sha256,
+            "python": platform.python_version(),
+        }
+
+        with profiler.phase("upload", path=meta["model_path"]) as ph:
+            self._fs.get_file_client(meta["model_path"]).upload_data(blob, overwrite=False)
+            ph.bytes = len(blob)
+        self._write_json(self.metadata_path(name, version), meta, overwrite=False)
+        self._write_json(self.latest_path(name), {
+            "version": version,
+            "model_path": meta["model_path"],
+            "metadata_path": self.metadata_path(name, version),
+        }, overwrite=True)
+        return meta
+
+    # ------------------------------
+    # Leitura (só metadados)
+    # ------------------------------
+    def latest(self, name: str) -> dict | None:
+        try:
+            return self._read_json(self.latest_path(name))
+        except (ResourceNotFoundError, FileNotFoundError):
+            return None
+
+    def resolve(self, name: str, version: str | None = None) -> str:
+        """Path do blob de uma versão (default: a apontada por latest.json)."""
+        if version is not None:
+            return self.model_path(name, version)
+        pointer = self.latest(name)
+        if pointer is None:
+            raise FileNotFoundError(f"Nenhuma versão publicada em artifacts/{name}")
+        return pointer["model_path"]
+
+    def list_versions(self, name: str) -> list[str]:
+        base = f"{name}/versions"
+        out = []
+        try:
+            for p in self._fs.get_paths(path=base, recursive=True):
+                if not p.is_directory and p.name.endswith("/metadata.json"):
+                    out.append(p.name.split("/")[-2])
+        except (ResourceNotFoundError, FileNotFoundError):
+            return []
+        return sorted(out)
+
+    def metadata(self, name: str, version: str | None = None) -> dict:
+        if version is None:
+            pointer = self.latest(name)
+            if pointer is None:
+                raise FileNotFoundError(f"Nenhuma versão publicada em artifacts/{name}")
+            return self._read_json(pointer["metadata_path"])
+        return self._read_json(self.metadata_path(name, version))
+
+    def compare(self, name: str) -> pd.DataFrame:
+        """Uma linha por versão com métricas de QC, período e tamanho."""
+        rows = []
+        for v in self.list_versions(name):
+            meta = self.metadata(name, v)
+            period = meta.get("training_period") or {}
+            rows.append({
+                "version": v,
+                "created_at": meta.get("created_at"),
+                # só métricas escalares (o detalhe por fold da CV fica no sidecar)
+                **{k: v for k, v in (meta.get("qc_metrics") or {}).items()
+                   if isinstance(v, (int, float, str, bool)) or v is None},
+                "period_start": period.get("start"),
+                "period_end": period.get("end"),
+                "compression": meta.get("compression"),
+                "size_bytes": meta.get("size_bytes"),
+            })
+        return pd.DataFrame(rows)
+
+    def best(self, name: str, metric: str = "R2", higher_is_better: bool = True) -> dict | None:
+        df = self.compare(name)
+        if df.empty or metric not in df.columns:
+            return None
+        df = df.dropna(subset=[metric]).sort_values(metric, ascending=not higher_is_better)
+        return self.metadata(name, df.iloc[0]["version"]) if len(df) else None
+
+    # ------------------------------
+    # Blob
+    # ------------------------------
+    def load(self, name: str, version: str | None = None):
+        data = self._fs.get_file_client(self.resolve(name, version)).download_file().readall()
+        return joblib.load(io.BytesIO(data))
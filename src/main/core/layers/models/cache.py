@@ -0,0 +1,90 @@
+# src/main/core/layers/models/cache.py
+from __future__ import annotations
+import os
+import re
+import threading
+import warnings
+import joblib
+
+from ...infra.storage import artifacts as artifacts_store
+
+
+class ArtifactCache:
+    """
+    Cache em processo de artefatos joblib, chaveado por (path, ETag).
+
+    - Memória: o objeto carregado fica residente enquanto o ETag não mudar.
+    - Disco: o blob é baixado uma única vez para cache_dir/<path>/<etag>.joblib
+      e carregado com mmap_mode="r" — arrays numpy do pickle ficam mapeados em
+      vez de copiados. Artefatos comprimidos não suportam mmap; o joblib cai
+      para leitura normal. Ao baixar um ETag novo, as cópias dos anteriores
+      do mesmo path são apagadas.
+    """
+
+    def __init__(self, artifacts_fs=None, cache_dir: str = "./local_storage/artifacts_cache"):
+        self.artifacts_fs = artifacts_fs or artifacts_store.fs
+        self.cache_dir = cache_dir
+        self._mem: dict[str, tuple[str, object]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _safe(name: str) -> str:
+        return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")
+
+    def etag(self, path: str) -> str:
+        return self.artifacts_fs.get_file_client(path).get_file_properties().etag
+
+    def _local_copy(self, path: str, etag: str) -> str:
+        local_dir = os.path.join(self.cache_dir, self._safe(path))
+        local_path = os.path.join(local_dir, f"{self._safe(etag)}.joblib")
+        if not os.path.exists(local_path):
+            os.makedirs(local_dir, exist_ok=True)
+            data = self.artifacts_fs.get_file_client(path).download_file().readall()
+            tmp = f"{local_path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, local_path)  # atômico: leitores concorrentes nunca veem arquivo parcial
+            self._remove_stale(local_dir, keep=local_path)
+        return local_path
+
+    @staticmethod
+    def _remove_stale(local_dir: str, keep: str) -> None:
+        """Apaga as cópias de ETags anteriores do mesmo path (mmaps já abertos seguem válidos no POSIX)."""
+        for name in os.listdir(local_dir):
+            path = os.path.join(local_dir, name)
+            if name.endswith(".joblib") and path != keep:
+                try:
+                    os.remove(path)
+                except OSError:  # em uso (Windows) ou já removido por outro processo
+                    pass
+
+    def get(self, path: str) -> tuple[object, str]:
+        """Retorna (objeto, etag), baixando/carregando só se o ETag mudou."""
+        etag = self.etag(path)
+        with self._lock:
+            hit = self._mem.get(path)
+            if hit is not None and hit[0] == etag:
+                return hit[1], etag
+
+            local_path = self._local_copy(path, etag)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)  # comprimido -> sem mmap
+                obj = joblib.load(local_path, mmap_mode="r")
+            self._mem[path] = (etag, obj)
+            print(f"  → Artefato carregado: artifacts/{path} (etag={etag})")
+            return obj, etag
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+
+
+_default_cache: ArtifactCache | None = None
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """Cache compartilhado do processo (um por worker/container)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ArtifactCache()
+    return _default_cache
@@ -2,13 +2,31 @@
 from __future__ import annotations
 import io
 import re
-import joblib
 import pandas as pd
 from typing import List, Tuple
 from sklearn.pipeline import Pipeline
 
 # stores compartilhados do projeto
 from ...infra.storage import gold as gold_store, artifacts as artifacts_store
+from ...infra.profiling import profiler
+from ...infra.leases import check_fence
+from .artifact_store import ArtifactStore, parse_compression
+from .validation import time_series_cv
+
+def quality_metrics(pipe: Pipeline, x_test: pd.DataFrame, y_test: pd.Series) -> dict:
+    """
+    MAE, RMSE e R² do pipeline no conjunto de teste. Função de módulo para poder
+    ser chamada de workers (process pool) sem instanciar o Model.
+    """
+    from sklearn.metrics import mean_absolute_error, root_mean_squared_error, r2_score
+
+    y_pred = pipe.predict(x_test)
+    return {
+        "MAE": float(mean_absolute_error(y_test, y_pred)),
+        "RMSE": float(root_mean_squared_error(y_test, y_pred)),
+        "R2": float(r2_score(y_test, y_pred)),
+    }
+
 
 class Model:
     """
@@ -16,15 +34,31 @@ class Model:
     Contrato mínimo:
       - __init__(artifact_name)
       - pipeline() -> Pipeline   (a subclasse implementa e, opcionalmente, roda seu QC)
+        ou, para jobs que publicam vários artefatos (ex.: um por segmento),
+        run() -> None sobrescrito, publicando cada um com _save_artifact(name=...);
+        nesse caso pipeline() não é implementado nem chamado
+
+    Metadados do artefato (sidecar do ArtifactStore):
+      - qc_metrics          -> preenchido por execute_quality_check()
+      - input_fingerprints  -> {path: etag} de tudo que foi lido da GOLD
+      - metadata            -> livre para a subclasse (features, training_period, ...)
     """
 
-    def __init__(self, artifact_name: str, *, gold_fs=None, artifacts_fs=None):
+    def __init__(self, artifact_name: str, *, gold_fs=None, artifacts_fs=None,
+                 compression: str | None = None):
         self.artifact_name = artifact_name
+        parse_compression(compression)  # valida antes do treino, não só no save
+        self.compression = compression
         self.inputs: dict[str, pd.DataFrame] = {}
+        self.qc_metrics: dict = {}
+        self.input_fingerprints: dict[str, str] = {}
+        self.metadata: dict = {}
+        self.outputs: list[str] = []  # artefatos publicados (artifacts/<path>)
 
         # permite injetar FS (para testes); por padrão usa os singletons do projeto
         self._gold_fs = gold_fs or gold_store.fs
         self._artifacts_fs = artifacts_fs or artifacts_store.fs
+        self.store = ArtifactStore(self._artifacts_fs)
 
     # ============================================================
     # 1) Contrato que a subclasse deve implementar
@@ -44,11 +78,19 @@ class Model:
     #      - gold/<table>/year_month=YYYYMM/data.parquet
     # ============================================================
     def _download_bytes(self, fs_client, path: str) -> bytes:
-        return fs_client.get_file_client(path).download_file().readall()
-
-    def _read_single_parquet_from_gold(self, path: str) -> pd.DataFrame:
+        with profiler.phase("download", path=path) as ph:
+            downloader = fs_client.get_file_client(path).download_file()
+            self.input_fingerprints[path] = downloader.properties.etag
+            data = downloader.readall()
+            ph.bytes = len(data)
+        return data
+
+    def _read_single_parquet_from_gold(self, path: str, columns: List[str] | None = None) -> pd.DataFrame:
         data = self._download_bytes(self._gold_fs, path)
-        return pd.read_parquet(io.BytesIO(data), engine="pyarrow")
+        with profiler.phase("parse", path=path) as ph:
+            df = pd.read_parquet(io.BytesIO(data), engine="pyarrow", columns=columns)
+            ph.rows_out = len(df)
+        return df
 
     def _list_gold_parquets(self, table_name: str) -> List[Tuple[str, str]]:
         """
@@ -56,7 +98,9 @@ class Model:
         """
         results: List[Tuple[str, str]] = []
         base = f"{table_name}"
-        for p in self._gold_fs.get_paths(path=base, recursive=True):
+        with profiler.phase("list", path=base):
+            paths = list(self._gold_fs.get_paths(path=base, recursive=True))
+        for p in paths:
             if p.is_directory or not p.name.endswith(".parquet"):
                 continue
             ym = None
@@ -71,11 +115,13 @@ class Model:
         results.sort(key=lambda t: t[0])
         return results
 
-    def read_gold_parquet(self, table_name: str, year_month: str | None = None) -> pd.DataFrame:
+    def read_gold_parquet(self, table_name: str, year_month: str | None = None,
+                          columns: List[str] | None = None) -> pd.DataFrame:
         """
         Lê Parquet(s) da GOLD.
           - year_month=None  -> concatena todos os períodos encontrados
           - year_month="202401" -> lê apenas esse período
+          - columns=[...] -> projeção de colunas (só decodifica o necessário)
         """
         files = self._list_gold_parquets(table_name)
         if not files:
@@ -85,25 +131,38 @@ class Model:
             sel = [p for ym, p in files if ym == year_month]
             if not sel:
                 raise FileNotFoundError(f"Não achei gold/{table_name} para {year_month}")
-            return self._read_single_parquet_from_gold(sel[0])
+            return self._read_single_parquet_from_gold(sel[0], columns=columns)
 
         # concatena todos
-        dfs = [self._read_single_parquet_from_gold(p) for _, p in files]
+        dfs = [self._read_single_parquet_from_gold(p, columns=columns) for _, p in files]
         return pd.concat(dfs, ignore_index=True)
 
     # ============================================================
     # 3) Helper de escrita — artifacts
     # ============================================================
-    def _save_artifact(self, pipe: Pipeline) -> str:
+    def artifact_metadata(self) -> dict:
+        return {
+            **self.metadata,
+            "model_class": type(self).__name__,
+            "qc_metrics": self.qc_metrics,
+            "inputs": self.input_fingerprints,
+        }
+
+    def _save_artifact(self, pipe: Pipeline, name: str | None = None, extra_metadata: dict | None = None) -> str:
         """
-        Salva em artifacts/<artifact_name> (flat). Se quiser hierarquia, mude aqui.
+        Publica uma nova versão imutável em artifacts/<name>/versions/<versão>/
+        (blob + metadata.json) e move artifacts/<name>/latest.json para ela.
+        name permite gravar vários artefatos por job (ex.: um por segmento).
         """
-        dest_path = f"{self.artifact_name}"
-        buf = io.BytesIO()
-        joblib.dump(pipe, buf)
-        buf.seek(0)
-        self._artifacts_fs.get_file_client(dest_path).upload_data(buf.getvalue(), overwrite=True)
-        return dest_path
+        check_fence()
+        meta = self.store.save(
+            pipe,
+            name=name or self.artifact_name,
+            metadata={**self.artifact_metadata(), **(extra_metadata or {})},
+            compression=self.compression,
+        )
+        self.outputs.append(f"artifacts/{meta['model_path']}")
+        return meta["model_path"]
 
     # ============================================================
     # 4) Quality Check (opcional para uso dentro do pipeline)
@@ -114,25 +173,48 @@ class Model:
         Executa QC do Pipeline e retorna métricas (MAE, RMSE, R²).
         Use dentro da sua implementação de `pipeline()` para decidir salvar/retornar.
         """
-        from sklearn.metrics import mean_absolute_error, root_mean_squared_error, r2_score
-
-        y_pred = pipe.predict(x_test)
-        mae = float(mean_absolute_error(y_test, y_pred))
-        rmse = float(root_mean_squared_error(y_test, y_pred))
-        r2 = float(r2_score(y_test, y_pred))
-
-        # Verifica se as métricas atendem aos limites
-        for metric, value in zip(["MAE", "RMSE", "R2"], [mae, rmse, r2]):
-            if metric in thresholds and value < thresholds[metric]:
-                raise ValueError(f"QC falhou: {metric}={value} < {thresholds[metric]}")
-        print(f"✅ QC métricas: MAE={mae}, RMSE={rmse}, R2={r2}")
-        return {"MAE": mae, "RMSE": rmse, "R2": r2}
+        metrics = quality_metrics(pipe, x_test, y_test)
+        self.qc_metrics = metrics
+        self.check_thresholds(metrics, thresholds)
+        print(f"✅ QC métricas: MAE={metrics['MAE']}, RMSE={metrics['RMSE']}, R2={metrics['R2']}")
+        return metrics
+
+    def cross_validate(self, pipe: Pipeline, x: pd.DataFrame, y: pd.Series, dates, thresholds: dict,
+                       n_folds: int = 12, horizon: int = 1, n_jobs: int | None = None) -> dict:
+        """
+        QC por validação cruzada de origem móvel (ver validation.time_series_cv).
+        Os limites são aplicados à média dos folds; o resumo (com desvio e o
+        detalhe por fold) vai para qc_metrics e, daí, para o sidecar do artefato.
+        """
+        with profiler.phase("cross_validate", rows_in=len(x)):
+            summary = time_series_cv(pipe, x, y, dates, n_folds=n_folds, horizon=horizon, n_jobs=n_jobs)
+        self.qc_metrics = summary
+        print(
+            f"✅ CV ({summary['n_folds']} folds): "
+            f"MAE={summary['MAE']:.6f}±{summary['MAE_std']:.6f}, "
+            f"RMSE={summary['RMSE']:.6f}±{summary['RMSE_std']:.6f}, "
+            f"R2={summary['R2']:.4f}±{summary['R2_std']:.4f}"
+        )
+        self.check_thresholds(summary, thresholds)
+        return summary
+
+    @staticmethod
+    def check_thresholds(metrics: dict, thresholds: dict) -> None:
+        # Verifica se as métricas atendem aos limites: MAE/RMSE são tetos, R2 é piso
+        for metric in ["MAE", "RMSE"]:
+            value = metrics[metric]
+            if metric in thresholds and value > thresholds[metric]:
+                raise ValueError(f"QC falhou: {metric}={value} > {thresholds[metric]}")
+        if "R2" in thresholds and metrics["R2"] < thresholds["R2"]:
+            raise ValueError(f"QC falhou: R2={metrics['R2']} < {thresholds['R2']}")
 
     # ============================================================
     # 5) Execução — pega o pipeline e salva o artefato
-    #    (QC fica a cargo do pipeline(), se você quiser travar antes)
+    #    (QC fica a cargo do pipeline(), se você quiser travar antes;
+    #     jobs de vários artefatos sobrescrevem este método)
     # ============================================================
     def run(self) -> None:
-        pipe = self.pipeline()  # a subclasse pode ter chamado execute_quality_check internamente
+        with profiler.phase("definition"):
+            pipe = self.pipeline()  # a subclasse pode ter chamado execute_quality_check internamente
         dest = self._save_artifact(pipe)
         print(f"✅ Artifact salvo em artifacts/{dest}")
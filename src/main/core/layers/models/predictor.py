@@ -0,0 +1,74 @@
+# src/main/core/layers/models/predictor.py
+from __future__ import annotations
+import time
+import numpy as np
+import pandas as pd
+
+from .artifact_store import ArtifactStore
+from .cache import ArtifactCache, get_artifact_cache
+
+
+class Predictor:
+    """
+    API de inferência que mantém o modelo "quente" entre chamadas.
+
+    A versão vem do ponteiro latest.json do ArtifactStore (ou é fixada via
+    `version`) e o blob do ArtifactCache; ponteiro e ETag são revalidados no
+    máximo a cada `refresh_seconds` (leituras de metadados), então chamadas
+    repetidas de predict() não baixam nem desserializam nada.
+
+        predictor = Predictor("cnes_linear_regression", features=FEATURES)
+        y_hat = predictor.predict(df)
+    """
+
+    def __init__(self, artifact_name: str, features: list[str], *, version: str | None = None,
+                 cache: ArtifactCache | None = None, refresh_seconds: float = 300.0):
+        self.artifact_name = artifact_name
+        self.features = list(features)
+        self.pinned_version = version
+        self.refresh_seconds = refresh_seconds
+        self._cache = cache or get_artifact_cache()
+        self._store = ArtifactStore(self._cache.artifacts_fs)
+        self._model = None
+        self._model_path: str | None = None
+        self._etag: str | None = None
+        self._checked_at = 0.0
+
+    @property
+    def etag(self) -> str | None:
+        return self._etag
+
+    @property
+    def model_path(self) -> str | None:
+        return self._model_path
+
+    def model(self):
+        now = time.monotonic()
+        if self._model is None or now - self._checked_at >= self.refresh_seconds:
+            self._model_path = self._store.resolve(self.artifact_name, self.pinned_version)
+            self._model, self._etag = self._cache.get(self._model_path)
+            self._checked_at = now
+        return self._model
+
+    def predict(self, df: pd.DataFrame, batch_size: int | None = None) -> np.ndarray:
+        """
+        Predição vetorizada. Por padrão um único predict() para o frame inteiro;
+        batch_size limita o pico de memória do one-hot em frames muito grandes.
+        Linhas com feature ausente recebem NaN.
+        """
+        model = self.model()
+        X = df[self.features]
+        out = np.full(len(X), np.nan, dtype=np.float64)
+        ok = X.notna().all(axis=1).to_numpy()
+        if not ok.any():
+            return out
+
+        X_ok = X[ok]
+        if batch_size is None or len(X_ok) <= batch_size:
+            out[ok] = model.predict(X_ok)
+        else:
+            out[ok] = np.concatenate([
+                model.predict(X_ok.iloc[i:i + batch_size])
+                for i in range(0, len(X_ok), batch_size)
+            ])
+        return out
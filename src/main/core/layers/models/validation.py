@@ -0,0 +1,91 @@
+# src/main/core/layers/models/validation.py
+from __future__ import annotations
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import mean_absolute_error, root_mean_squared_error, r2_score
+
+METRICS = ["MAE", "RMSE", "R2"]
+
+
+def rolling_origin_folds(sorted_dates: np.ndarray, n_folds: int, horizon: int = 1) -> list[tuple[int, int, int]]:
+    """
+    Folds de origem móvel sobre linhas já ordenadas por data.
+
+    Cada fold testa `horizon` datas distintas e treina com tudo que vem antes
+    (janela expansível). Retorna [(train_end, test_start, test_end)] em índices
+    de linha — train = [0, train_end), test = [test_start, test_end).
+    """
+    unique_dates = np.unique(sorted_dates)
+    max_folds = (len(unique_dates) - 1) // horizon
+    n_folds = min(n_folds, max_folds)
+    if n_folds < 1:
+        raise ValueError(f"Datas insuficientes para CV: {len(unique_dates)} distintas, horizon={horizon}")
+
+    first = len(unique_dates) - n_folds * horizon
+    bounds = np.searchsorted(sorted_dates, unique_dates, side="left")
+    bounds = np.append(bounds, len(sorted_dates))
+
+    folds = []
+    for f in range(n_folds):
+        k = first + f * horizon
+        start = int(bounds[k])
+        end = int(bounds[k + horizon])
+        folds.append((start, start, end))
+    return folds
+
+
+def _rows(X, start: int, stop: int):
+    return X.iloc[start:stop] if hasattr(X, "iloc") else X[start:stop]
+
+
+def _fit_fold(pipe, X, y: np.ndarray, train_end: int, test_start: int, test_end: int) -> dict:
+    # pipeline inteiro por fold: o vocabulário das categóricas sai só do treino
+    # (categoria que só aparece no teste depende de handle_unknown="ignore")
+    est = clone(pipe)
+    est.fit(_rows(X, 0, train_end), y[:train_end])
+    y_test = y[test_start:test_end]
+    y_pred = est.predict(_rows(X, test_start, test_end))
+    return {
+        "n_train": train_end,
+        "n_test": test_end - test_start,
+        "MAE": float(mean_absolute_error(y_test, y_pred)),
+        "RMSE": float(root_mean_squared_error(y_test, y_pred)),
+        "R2": float(r2_score(y_test, y_pred)),
+    }
+
+
+def time_series_cv(pipe, X, y, dates, n_folds: int = 12, horizon: int = 1, n_jobs: int | None = None) -> dict:
+    """
+    Validação cruzada de origem móvel para um Pipeline (pré-processamento + estimador).
+
+    - O Pipeline inteiro (pré-processamento incluso) é ajustado em cada fold só
+      com as linhas de treino: nenhum vocabulário/estatística vem do teste.
+    - As linhas são ordenadas por data; treino e teste são fatias contíguas.
+    - Os folds rodam em paralelo (loky); arrays grandes vão para os workers via memmap.
+    - Retorna média, desvio, mínimo e máximo de MAE/RMSE/R² e o detalhe por fold.
+    """
+    dates = np.asarray(dates)
+    order = np.argsort(dates, kind="stable")
+    sorted_dates = dates[order]
+    X_sorted = X.iloc[order] if hasattr(X, "iloc") else X[order]
+    y_sorted = np.asarray(y, dtype=np.float64)[order]
+
+    folds = rolling_origin_folds(sorted_dates, n_folds=n_folds, horizon=horizon)
+    results = Parallel(n_jobs=n_jobs or -1, backend="loky", max_nbytes="1M", mmap_mode="r")(
+        delayed(_fit_fold)(pipe, X_sorted, y_sorted, tr_end, te_start, te_end)
+        for tr_end, te_start, te_end in folds
+    )
+
+    for (_, te_start, _), r in zip(folds, results):
+        r["test_from"] = str(sorted_dates[te_start])[:10]
+
+    summary: dict = {"n_folds": len(results), "horizon": horizon}
+    for m in METRICS:
+        values = np.array([r[m] for r in results])
+        summary[m] = float(values.mean())
+        summary[f"{m}_std"] = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+        summary[f"{m}_min"] = float(values.min())
+        summary[f"{m}_max"] = float(values.max())
+    summary["folds"] = results
+    return summary
@@ -2,10 +2,17 @@ import io
 import pandas as pd
 from src.main.core.infra.table import Table
 from src.main.core.infra.storage import bronze, silver as silver_store
+from src.main.core.infra.profiling import profiler
+from src.main.core.infra.leases import check_fence
+from src.main.core.layers import cdc, columnar, dimensions
 
 class Silver(Table):
     layer = "silver"
     allowed_layers = ["bronze", "silver"]
+    # CDC opcional: com cdc_key definido, cada run também grava <name>_delta/<ym>.parquet
+    # (linhas inseridas/alteradas/removidas vs. o período anterior, ver core/layers/cdc.py)
+    cdc_key: str | None = None
+    cdc_exclude: tuple = ()  # colunas fora do hash de linha (metadados que mudam todo mês)
 
     def __init__(self, name: str, bronze_store=bronze, silver_store=silver_store):
         super().__init__(name)
@@ -13,8 +20,16 @@ class Silver(Table):
         self._silver_fs = silver_store.fs
 
     def _read_csv_from_fs(self, fs_client, path: str) -> pd.DataFrame:
-        file_client = fs_client.get_file_client(path)
-        data = file_client.download_file().readall()
+        with profiler.phase("download", path=path) as ph:
+            data = fs_client.get_file_client(path).download_file().readall()
+            ph.bytes = len(data)
+        with profiler.phase("parse", path=path) as ph:
+            df = columnar.read_csv(data) if self.engine == "arrow" else self._parse_csv(data)
+            ph.rows_out = len(df)
+        return df
+
+    @staticmethod
+    def _parse_csv(data: bytes) -> pd.DataFrame:
         try:
             return pd.read_csv(io.BytesIO(data), sep=";", quotechar='"', dtype=str,
                                encoding="latin-1", engine="python", on_bad_lines="warn")
@@ -33,21 +48,79 @@ class Silver(Table):
     def read_csv_from_silver(self, path: str) -> pd.DataFrame:
         return self._read_csv_from_fs(self._silver_fs, path)
 
-    def _write_parquet_to_silver(self, df: pd.DataFrame, year_month: str) -> None:
-        if not isinstance(df, pd.DataFrame):
-            raise TypeError("definition() deve retornar um pandas.DataFrame")
+    def read_dimension(self, name: str, year_month: str, columns: list[str] | None = None) -> pd.DataFrame:
+        """silver/dim_<name>/<YYYYMM>.parquet (gravada pelo job cnes_dimensoes do mesmo mês)."""
+        path = f"{dimensions.dim_table(name)}/{year_month}.parquet"
+        with profiler.phase("download", path=path) as ph:
+            data = self._silver_fs.get_file_client(path).download_file().readall()
+            ph.bytes = len(data)
+        with profiler.phase("parse", path=path) as ph:
+            if self.engine == "arrow":
+                df = columnar.read_parquet(data, columns=columns)
+            else:
+                df = pd.read_parquet(io.BytesIO(data), engine="pyarrow", columns=columns)
+            ph.rows_out = len(df)
+        return df
+
+    def _write_parquet_to_silver(self, df, year_month: str, table_name: str | None = None) -> None:
         import pyarrow as pa  # opcional: mantido local
-        import pyarrow.parquet as pq
-        buf = io.BytesIO()
-        df.to_parquet(buf, index=False, engine="pyarrow", compression="snappy")
-        buf.seek(0)
-        dest_path = f"{self.name}/{year_month}.parquet"
-        self._silver_fs.get_file_client(dest_path).upload_data(buf.getvalue(), overwrite=True)
+        if not isinstance(df, (pd.DataFrame, pa.Table)):
+            raise TypeError("definition() deve retornar um pandas.DataFrame ou pyarrow.Table")
+        dest_path = f"{table_name or self.name}/{year_month}.parquet"
+        with profiler.phase("serialize", path=dest_path) as ph:
+            if isinstance(df, pa.Table):
+                data = columnar.to_parquet_bytes(df)
+            else:
+                buf = io.BytesIO()
+                df.to_parquet(buf, index=False, engine="pyarrow", compression="snappy")
+                data = buf.getvalue()
+            ph.rows_in, ph.bytes = len(df), len(data)
+        check_fence()
+        with profiler.phase("upload", path=dest_path) as ph:
+            self._silver_fs.get_file_client(dest_path).upload_data(data, overwrite=True)
+            ph.bytes = len(data)
+        self.outputs.append(f"silver/{dest_path}")
         print(f"  → Gravado em silver: {dest_path} ({len(df)} registros)")
 
     def run(self) -> None:
         print(f"Processando Silver: {self.name} para período {getattr(self, 'year_month', 'N/A')}")
         if not hasattr(self, "year_month") or not isinstance(self.year_month, str):
             raise AttributeError("Defina self.year_month (ex.: '202401') antes de .run().")
-        df = self.definition()
+        with profiler.phase("definition") as ph:
+            df = self.definition()
+            ph.rows_out = sum(map(len, df.values())) if isinstance(df, dict) else len(df)
+        if isinstance(df, dict):
+            # vários destinos de uma vez (ex.: dimensões): {tabela: DataFrame} -> <tabela>/<ym>.parquet
+            for table_name, part in df.items():
+                self._write_parquet_to_silver(part, self.year_month, table_name=table_name)
+            return
+        if self.cdc_key:
+            df = cdc.with_row_hash(df, cdc.value_columns(df, self.cdc_key, self.cdc_exclude))
         self._write_parquet_to_silver(df, self.year_month)
+        if self.cdc_key:
+            self._write_delta(df)
+
+    # ------------------------------
+    # CDC
+    # ------------------------------
+    def _write_delta(self, df) -> None:
+        """
+        Delta de self.year_month contra o snapshot mais recente anterior
+        (cdc.compute_period_delta; pandas ou Arrow conforme o engine).
+        Reprocessar um mês antigo exige refazer os deltas dos meses seguintes.
+        """
+        ym = self.year_month
+        previous = [(p, path) for p, path in cdc.list_periods(self._silver_fs, self.name) if p < ym]
+
+        with profiler.phase("cdc", rows_in=len(df)) as ph:
+            base_ym, data = None, None
+            if previous:
+                base_ym, prev_path = previous[-1]
+                data = self._silver_fs.get_file_client(prev_path).download_file().readall()
+            delta = cdc.with_base(cdc.compute_period_delta(df, self.cdc_key, data, self.cdc_exclude), base_ym)
+            ph.rows_out = len(delta)
+
+        counts = cdc.op_counts(delta)
+        print(f"  Δ CDC {self.name} {base_ym or '-'} → {ym}: "
+              + ", ".join(f"{op}={counts.get(op, 0)}" for op in ("I", "U", "D")))
+        self._write_parquet_to_silver(delta, ym, table_name=cdc.delta_table(self.name))
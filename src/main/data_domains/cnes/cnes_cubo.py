@@ -0,0 +1,182 @@
+from src.main.core.layers.gold import Gold
+import numpy as np
+import pandas as pd
+
+
+# região pelo 1º dígito do código IBGE do município/UF
+REGIOES = {"1": "Norte", "2": "Nordeste", "3": "Sudeste", "4": "Sul", "5": "Centro-Oeste"}
+
+# família CBO 2002 (4 primeiros dígitos) -> grupo de especialidade médica
+GRUPOS_CBO = {
+    "2251": "MEDICOS CLINICOS",
+    "2252": "MEDICOS EM ESPECIALIDADES CIRURGICAS",
+    "2253": "MEDICOS EM MEDICINA DIAGNOSTICA E TERAPEUTICA",
+    "2231": "MEDICOS (CBO 1994)",
+}
+OUTROS = "OUTROS MEDICOS"
+
+GEO = {
+    "brasil": [],
+    "regiao": ["NO_REGIAO"],
+    "uf": ["NO_REGIAO", "CO_UF", "SG_UF"],
+    "municipio": ["NO_REGIAO", "CO_UF", "SG_UF", "CO_MUNICIPIO_SEM_DIGITO"],
+}
+ESPECIALIDADE = {
+    "": [],
+    "grupo": ["GRUPO_ESPECIALIDADE"],
+    "especialidade": ["GRUPO_ESPECIALIDADE", "DS_ATIVIDADE_PROFISSIONAL"],
+}
+# (geo, especialidade, janela 12m) — município x especialidade x mês já é a cnes_estabelecimentos_metrics
+LEVELS = [
+    ("brasil", "", True), ("brasil", "grupo", True), ("brasil", "especialidade", True),
+    ("regiao", "", True), ("regiao", "grupo", True),
+    ("uf", "", True), ("uf", "grupo", True), ("uf", "especialidade", True),
+    ("municipio", "", True), ("municipio", "grupo", False),
+]
+WINDOW = 12
+
+
+def level_table(geo: str, esp: str) -> str:
+    return f"cnes_cubo_{geo}_{esp}" if esp else f"cnes_cubo_{geo}"
+
+
+def _month_index(periodo: pd.Series) -> np.ndarray:
+    p = periodo.to_numpy(dtype=np.int64)
+    return (p // 100) * 12 + (p % 100) - 1
+
+
+def _periodo(month_index: np.ndarray) -> np.ndarray:
+    return (month_index // 12) * 100 + month_index % 12 + 1
+
+
+class CnesCubo(Gold):
+    """
+    Cubo de profissionais médicos SUS: um passe sobre a silver monta a base
+    distinta (profissional, município, especialidade, mês) e cada nível de
+    LEVELS (grouping set de geografia x especialidade x mês) é agregado dela.
+
+    Contagens de profissionais são distintas e exatas em todos os níveis (não
+    somam níveis inferiores — o mesmo médico atua em vários municípios ou
+    especialidades). Por nível e mês:
+      TOTAL_PROFISSIONAIS   distintos no mês
+      PROFISSIONAIS_12M     distintos na janela de 12 meses terminada no mês
+      MEDIA_12M             média mensal de TOTAL_PROFISSIONAIS na janela
+      MESES_12M             meses da janela presentes na silver
+      POPULACAO_MENSAL / PROFISSIONAIS_POR_1000 (UFs presentes na silver)
+
+    Cada nível vira sua tabela: gold/cnes_cubo_<geo>[_<especialidade>]/YYYY=<ano>/data.parquet.
+    """
+
+    job_type = "table"
+    partition_by = "YYYY"
+
+    def __init__(self):
+        super().__init__(name="cnes_cubo")
+
+        estab = self.read_silver_parquet("cnes_estabelecimentos", columns=[
+            "CO_PROFISSIONAL_SUS", "CO_CBO", "DS_ATIVIDADE_PROFISSIONAL", "TP_SUS_NAO_SUS",
+            "CO_MUNICIPIO", "CO_SIGLA_ESTADO", "YYYYMM",
+        ])
+        years = sorted(estab["YYYYMM"].astype(str).str[:4].unique())
+        self.inputs = {
+            "estabelecimentos": estab,
+            "populacao": self.read_gold_partitions("populacao", "YYYY", values=years, columns=[
+                "CO_MUNICIPIO_SEM_DIGITO", "YYYY", "MM", "POPULACAO_MENSAL",
+            ]),
+        }
+
+    # ------------------------------
+    # Base
+    # ------------------------------
+    def _base(self) -> pd.DataFrame:
+        estab = self.inputs["estabelecimentos"]
+        mask = estab["TP_SUS_NAO_SUS"].eq("S") & estab["DS_ATIVIDADE_PROFISSIONAL"].str.startswith("MEDICO", na=False)
+        estab = estab[mask]
+
+        mun = pd.to_numeric(estab["CO_MUNICIPIO"], errors="coerce").astype("Int64")
+        co_uf = mun.astype(str).str[:2]
+        base = pd.DataFrame({
+            "PROF": pd.factorize(estab["CO_PROFISSIONAL_SUS"])[0],
+            "NO_REGIAO": co_uf.str[:1].map(REGIOES).fillna("N/D"),
+            "CO_UF": co_uf,
+            "SG_UF": estab["CO_SIGLA_ESTADO"].astype(str),
+            "CO_MUNICIPIO_SEM_DIGITO": mun,
+            "GRUPO_ESPECIALIDADE": estab["CO_CBO"].astype(str).str[:4].map(GRUPOS_CBO).fillna(OUTROS),
+            "DS_ATIVIDADE_PROFISSIONAL": estab["DS_ATIVIDADE_PROFISSIONAL"].astype(str),
+            "MES": _month_index(pd.to_numeric(estab["YYYYMM"])),
+        })
+        return base.dropna(subset=["CO_MUNICIPIO_SEM_DIGITO"]).drop_duplicates(ignore_index=True)
+
+    def _populacao(self, base: pd.DataFrame) -> pd.DataFrame:
+        """População mensal por município (só UFs presentes na base), com a mesma geografia derivada do código."""
+        pop = self.inputs["populacao"]
+        mun = pd.to_numeric(pop["CO_MUNICIPIO_SEM_DIGITO"], errors="coerce").astype("Int64")
+        co_uf = mun.astype(str).str[:2]
+        siglas = base.drop_duplicates("CO_UF").set_index("CO_UF")["SG_UF"]
+        periodo = pd.to_numeric(pop["YYYY"]) * 100 + pd.to_numeric(pop["MM"])
+        out = pd.DataFrame({
+            "NO_REGIAO": co_uf.str[:1].map(REGIOES).fillna("N/D"),
+            "CO_UF": co_uf,
+            "SG_UF": co_uf.map(siglas),
+            "CO_MUNICIPIO_SEM_DIGITO": mun,
+            "MES": _month_index(periodo.astype("int64")),
+            "POPULACAO_MENSAL": pd.to_numeric(pop["POPULACAO_MENSAL"], errors="coerce"),
+        })
+        return out[out["CO_UF"].isin(siglas.index)]
+
+    # ------------------------------
+    # Níveis
+    # ------------------------------
+    @staticmethod
+    def _distinct(base: pd.DataFrame, keys: list, name: str) -> pd.DataFrame:
+        return (base[keys + ["MES", "PROF"]].drop_duplicates()
+                .groupby(keys + ["MES"], dropna=False, sort=False).size().rename(name).reset_index())
+
+    def _level(self, base: pd.DataFrame, pop: pd.DataFrame, geo: str, esp: str, rolling: bool,
+               months: np.ndarray) -> pd.DataFrame:
+        keys = GEO[geo] + ESPECIALIDADE[esp]
+        out = self._distinct(base, keys, "TOTAL_PROFISSIONAIS")
+
+        if rolling:
+            # cada (chave, profissional, mês) conta nas janelas que terminam em mês..mês+11
+            pairs = base[keys + ["MES", "PROF"]].drop_duplicates()
+            expanded = pd.concat([pairs.assign(MES=pairs["MES"] + k) for k in range(WINDOW)], ignore_index=True)
+            # só janelas terminando em meses carregados (mês sem silver é desconhecido, não zero)
+            expanded = expanded[expanded["MES"].isin(months)]
+            window = self._distinct(expanded, keys, "PROFISSIONAIS_12M")
+
+            sums = pd.concat([out.assign(MES=out["MES"] + k) for k in range(WINDOW)], ignore_index=True)
+            sums = (sums[sums["MES"].isin(months)]
+                    .groupby(keys + ["MES"], dropna=False, sort=False)["TOTAL_PROFISSIONAIS"].sum()
+                    .rename("SOMA_12M").reset_index())
+            window = window.merge(sums, on=keys + ["MES"], how="left")
+            # meses da janela presentes na silver (início da série e lacunas encurtam a janela)
+            covered = np.searchsorted(months, window["MES"].to_numpy(), side="right") \
+                - np.searchsorted(months, window["MES"].to_numpy() - WINDOW + 1, side="left")
+            window["MESES_12M"] = covered.astype("int16")
+            window["MEDIA_12M"] = window.pop("SOMA_12M") / window["MESES_12M"]
+            # chave sem profissionais no mês, mas presente na janela, entra com total 0
+            out = out.merge(window, on=keys + ["MES"], how="outer")
+            out["TOTAL_PROFISSIONAIS"] = out["TOTAL_PROFISSIONAIS"].fillna(0).astype("int64")
+
+        geo_keys = GEO[geo]
+        pop_level = pop.groupby(geo_keys + ["MES"], dropna=False, sort=False)["POPULACAO_MENSAL"].sum().reset_index()
+        out = out.merge(pop_level, on=geo_keys + ["MES"], how="left")
+        out["PROFISSIONAIS_POR_1000"] = out["TOTAL_PROFISSIONAIS"] / out["POPULACAO_MENSAL"].replace({0: np.nan}) * 1000
+
+        periodo = _periodo(out.pop("MES").to_numpy())
+        out.insert(len(keys), "PERIODO", periodo.astype("int32"))
+        out.insert(len(keys) + 1, "YYYY", (periodo // 100).astype("int16"))
+        out.insert(len(keys) + 2, "MM", (periodo % 100).astype("int8"))
+        out.insert(0, "NIVEL", f"{geo}_{esp}" if esp else geo)
+        out["DATA_INGESTAO"] = pd.Timestamp.today().strftime("%Y-%m-%d")
+        return out.sort_values(keys + ["PERIODO"], ignore_index=True)
+
+    def definition(self) -> dict:
+        base = self._base()
+        if base.empty:
+            raise ValueError("cnes_cubo: nenhum profissional médico SUS na silver")
+        pop = self._populacao(base)
+        months = np.sort(base["MES"].unique())
+        return {level_table(geo, esp): self._level(base, pop, geo, esp, rolling, months)
+                for geo, esp, rolling in LEVELS}
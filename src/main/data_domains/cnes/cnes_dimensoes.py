@@ -0,0 +1,64 @@
+import pandas as pd
+from src.main.core.layers.silver import Silver
+from src.main.core.layers.dimensions import build_dimension, dim_table, encode
+
+
+class CnesDimensoes(Silver):
+    """
+    Dimensões do mês, lidas do bronze uma única vez e compartilhadas pelos
+    fatos (cnes_estabelecimentos, cnes_servicos):
+
+      dim_municipio               SK_MUNICIPIO      <- tbMunicipio
+      dim_atividade_profissional  SK_CBO            <- tbAtividadeProfissional
+      dim_estabelecimento         SK_ESTABELECIMENTO <- tbEstabelecimento (+ SK_MUNICIPIO do gestor)
+      dim_profissional            SK_PROFISSIONAL   <- tbDadosProfissionalSus
+      dim_classificacao_servico   SK_CLASSIFICACAO  <- tbClassificacaoServico
+    """
+
+    job_type = "table"
+
+    def __init__(self, year_month: str):
+        super().__init__(name="cnes_dimensoes")
+        self.year_month = year_month
+
+        ym = self.year_month
+        self.inputs = {
+            "tbMunicipio":             self.read_csv_from_bronze(f"{ym}/tbMunicipio{ym}.csv"),
+            "tbAtividadeProfissional": self.read_csv_from_bronze(f"{ym}/tbAtividadeProfissional{ym}.csv"),
+            "tbEstabelecimento":       self.read_csv_from_bronze(f"{ym}/tbEstabelecimento{ym}.csv"),
+            "tbDadosProfissionalSus":  self.read_csv_from_bronze(f"{ym}/tbDadosProfissionalSus{ym}.csv"),
+            "tbClassificacaoServico":  self.read_csv_from_bronze(f"{ym}/tbClassificacaoServico{ym}.csv"),
+        }
+
+    def definition(self) -> dict:
+        municipio = build_dimension(
+            self.inputs["tbMunicipio"], "CO_MUNICIPIO", "SK_MUNICIPIO",
+            ["NO_MUNICIPIO", "CO_SIGLA_ESTADO"],
+        )
+        atividade = build_dimension(
+            self.inputs["tbAtividadeProfissional"], "CO_CBO", "SK_CBO", ["DS_ATIVIDADE_PROFISSIONAL"],
+        )
+
+        estab = build_dimension(
+            self.inputs["tbEstabelecimento"], "CO_UNIDADE", "SK_ESTABELECIMENTO",
+            ["NO_FANTASIA", "NO_BAIRRO", "CO_CEP", "CO_ESTADO_GESTOR", "CO_MUNICIPIO_GESTOR"],
+        )
+        estab["CO_ESTADO_GESTOR"] = pd.to_numeric(estab["CO_ESTADO_GESTOR"], errors="coerce").astype("Int16")
+        # município do gestor já como código (-1: fora da tbMunicipio)
+        estab["SK_MUNICIPIO"] = encode(municipio, "CO_MUNICIPIO", estab.pop("CO_MUNICIPIO_GESTOR"))
+
+        profissional = build_dimension(
+            self.inputs["tbDadosProfissionalSus"], "CO_PROFISSIONAL_SUS", "SK_PROFISSIONAL", ["NO_PROFISSIONAL"],
+        )
+        classificacao = build_dimension(
+            self.inputs["tbClassificacaoServico"], ["CO_SERVICO_ESPECIALIZADO", "CO_CLASSIFICACAO_SERVICO"],
+            "SK_CLASSIFICACAO", ["DS_CLASSIFICACAO_SERVICO"],
+        )
+
+        return {
+            dim_table("municipio"): municipio,
+            dim_table("atividade_profissional"): atividade,
+            dim_table("estabelecimento"): estab,
+            dim_table("profissional"): profissional,
+            dim_table("classificacao_servico"): classificacao,
+        }
@@ -1,51 +1,122 @@
 from datetime import date
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from src.main.core.layers.silver import Silver
+from src.main.core.layers.dimensions import encode, gather
+from src.main.core.layers.columnar import concat_str, constant, first_rows, hstack
 
 class CnesEstabelecimentos(Silver):
-    
+
     job_type = "table"
+    engine = "arrow"
+    engines = ("arrow", "pandas")  # TABLE_ENGINE=pandas: caminho de compatibilidade
+    cdc_key = "SK_REGISTRO"
+    cdc_exclude = ("DATA_INGESTAO", "YYYYMM")
+    depends_on = ["cnes_dimensoes"]
 
     def __init__(self, year_month: str):
         super().__init__(name="cnes_estabelecimentos")
         self.year_month = year_month
 
         ym = self.year_month
-        # inputs necessários para ESTABELECIMENTOS (padrão: nome{YYYYMM}.csv)
+        # fato do bronze; referências vêm das dimensões do mês (job cnes_dimensoes)
         self.inputs = {
-            "tbEstabelecimento":      self.read_csv_from_bronze(f"{ym}/tbEstabelecimento{ym}.csv"),
-            "tbMunicipio":            self.read_csv_from_bronze(f"{ym}/tbMunicipio{ym}.csv"),
-            "tbCargaHorariaSus":      self.read_csv_from_bronze(f"{ym}/tbCargaHorariaSus{ym}.csv"),
-            "tbAtividadeProfissional":self.read_csv_from_bronze(f"{ym}/tbAtividadeProfissional{ym}.csv"),
-            "tbDadosProfissionalSus": self.read_csv_from_bronze(f"{ym}/tbDadosProfissionalSus{ym}.csv"),
+            "tbCargaHorariaSus":          self.read_csv_from_bronze(f"{ym}/tbCargaHorariaSus{ym}.csv"),
+            "dim_estabelecimento":        self.read_dimension("estabelecimento", ym),
+            "dim_municipio":              self.read_dimension("municipio", ym),
+            "dim_atividade_profissional": self.read_dimension("atividade_profissional", ym),
+            "dim_profissional":           self.read_dimension("profissional", ym),
         }
 
-    def definition(self) -> pd.DataFrame:
-        tbEstabelecimento      = self.inputs["tbEstabelecimento"].copy()
-        tbMunicipio            = self.inputs["tbMunicipio"].copy()
-        tbCargaHorariaSus      = self.inputs["tbCargaHorariaSus"].copy()
-        tbAtividadeProfissional= self.inputs["tbAtividadeProfissional"].copy()
-        tbDadosProfissionalSus = self.inputs["tbDadosProfissionalSus"].copy()
+    def definition(self):
+        return self._definition_arrow() if self.engine == "arrow" else self._definition_pandas()
 
-        # ---- estab + município (SP = 35)
-        tbEstabelecimento["CO_ESTADO_GESTOR"] = pd.to_numeric(
-            tbEstabelecimento.get("CO_ESTADO_GESTOR"), errors="coerce"
-        )
-        estab_sp = tbEstabelecimento[tbEstabelecimento["CO_ESTADO_GESTOR"] == 35]
-        estab_munic = estab_sp.merge(
-            tbMunicipio,
-            left_on="CO_MUNICIPIO_GESTOR",
-            right_on="CO_MUNICIPIO",
-            how="inner",
-            suffixes=("", "_mun"),
-        )
+    def _definition_arrow(self) -> pa.Table:
+        carga        = self.inputs["tbCargaHorariaSus"]
+        estab        = self.inputs["dim_estabelecimento"]
+        municipio    = self.inputs["dim_municipio"]
+        atividade    = self.inputs["dim_atividade_profissional"]
+        profissional = self.inputs["dim_profissional"]
+
+        # ---- fato -> códigos das dimensões (-1 = sem correspondência, como no inner join)
+        sk_estab = encode(estab, "CO_UNIDADE", carga["CO_UNIDADE"])
+        sk_cbo   = encode(atividade, "CO_CBO", carga["CO_CBO"])
+        sk_prof  = encode(profissional, "CO_PROFISSIONAL_SUS", carga["CO_PROFISSIONAL_SUS"])
+
+        # estabelecimentos de SP (= 35) com município conhecido
+        estab_ok = pc.fill_null(pc.equal(estab["CO_ESTADO_GESTOR"], 35), False).to_numpy() \
+            & (estab["SK_MUNICIPIO"].to_numpy() >= 0)
+        keep = (sk_estab >= 0) & (sk_cbo >= 0) & (sk_prof >= 0)
+        keep[keep] = estab_ok[sk_estab[keep]]
+        sk_estab, sk_cbo, sk_prof = sk_estab[keep], sk_cbo[keep], sk_prof[keep]
+        sk_mun = estab["SK_MUNICIPIO"].to_numpy()[sk_estab]
+
+        # ---- atributos por take nos arrays das dimensões
+        joined = hstack([
+            carga.filter(keep).select(["CO_UNIDADE", "CO_PROFISSIONAL_SUS", "CO_CBO", "TP_SUS_NAO_SUS"]),
+            gather(profissional, sk_prof, ["NO_PROFISSIONAL"]),
+            gather(atividade, sk_cbo, ["DS_ATIVIDADE_PROFISSIONAL"]),
+            gather(estab, sk_estab, ["NO_FANTASIA", "NO_BAIRRO", "CO_CEP"]),
+            gather(municipio, sk_mun, ["NO_MUNICIPIO", "CO_MUNICIPIO", "CO_SIGLA_ESTADO"]),
+        ])
+
+        # ---- seleção e normalização
+        cols = [
+            "CO_UNIDADE","CO_PROFISSIONAL_SUS","NO_PROFISSIONAL","CO_CBO",
+            "TP_SUS_NAO_SUS","DS_ATIVIDADE_PROFISSIONAL","NO_FANTASIA","NO_BAIRRO",
+            "NO_MUNICIPIO","CO_MUNICIPIO","CO_SIGLA_ESTADO","CO_CEP",
+        ]
+        # força string (evita perder zeros à esquerda)
+        curated = joined.select(cols).cast(pa.schema([(c, pa.large_string()) for c in cols]))
+
+        # campo de localidade
+        text = pa.large_string()
+        curated = curated.append_column("ds_localidade", pc.binary_join_element_wise(
+            curated["CO_CEP"], curated["NO_MUNICIPIO"], curated["CO_SIGLA_ESTADO"],
+            pa.scalar("Brasil", text), pa.scalar(",", text)))
+
+        # metadados e chave técnica
+        today_str = date.today().isoformat()
+        ym = self.year_month
+        n = curated.num_rows
+        curated = (curated
+                   .append_column("SK_REGISTRO", concat_str(curated, ["CO_UNIDADE", "CO_PROFISSIONAL_SUS", "CO_CBO"], "_"))
+                   .append_column("DATA_INGESTAO", constant(today_str, n))
+                   .append_column("YYYYMM", constant(ym, n)))
+        return first_rows(curated, "SK_REGISTRO")
+
+    def _definition_pandas(self) -> pd.DataFrame:
+        carga        = self.inputs["tbCargaHorariaSus"]
+        estab        = self.inputs["dim_estabelecimento"]
+        municipio    = self.inputs["dim_municipio"]
+        atividade    = self.inputs["dim_atividade_profissional"]
+        profissional = self.inputs["dim_profissional"]
+
+        # ---- fato -> códigos das dimensões (-1 = sem correspondência, como no inner join)
+        sk_estab = encode(estab, "CO_UNIDADE", carga["CO_UNIDADE"])
+        sk_cbo   = encode(atividade, "CO_CBO", carga["CO_CBO"])
+        sk_prof  = encode(profissional, "CO_PROFISSIONAL_SUS", carga["CO_PROFISSIONAL_SUS"])
+
+        # estabelecimentos de SP (= 35) com município conhecido
+        estab_ok = (estab["CO_ESTADO_GESTOR"] == 35).fillna(False).to_numpy(dtype=bool) \
+            & (estab["SK_MUNICIPIO"].to_numpy() >= 0)
+        keep = (sk_estab >= 0) & (sk_cbo >= 0) & (sk_prof >= 0)
+        keep[keep] = estab_ok[sk_estab[keep]]
+        sk_estab, sk_cbo, sk_prof = sk_estab[keep], sk_cbo[keep], sk_prof[keep]
+        sk_mun = estab["SK_MUNICIPIO"].to_numpy()[sk_estab]
 
-        # ---- joins para estabelecimentos
-        joined = (
-            tbCargaHorariaSus
-            .merge(tbAtividadeProfissional, on="CO_CBO", how="inner")
-            .merge(estab_munic, on="CO_UNIDADE", how="inner")
-            .merge(tbDadosProfissionalSus, on="CO_PROFISSIONAL_SUS", how="inner")
+        # ---- atributos por take nos arrays das dimensões
+        joined = pd.concat(
+            [
+                carga.loc[keep, ["CO_UNIDADE", "CO_PROFISSIONAL_SUS", "CO_CBO", "TP_SUS_NAO_SUS"]]
+                     .reset_index(drop=True),
+                gather(profissional, sk_prof, ["NO_PROFISSIONAL"]),
+                gather(atividade, sk_cbo, ["DS_ATIVIDADE_PROFISSIONAL"]),
+                gather(estab, sk_estab, ["NO_FANTASIA", "NO_BAIRRO", "CO_CEP"]),
+                gather(municipio, sk_mun, ["NO_MUNICIPIO", "CO_MUNICIPIO", "CO_SIGLA_ESTADO"]),
+            ],
+            axis=1,
         )
 
         # ---- seleção e normalização
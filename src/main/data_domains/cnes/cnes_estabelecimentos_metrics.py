@@ -1,93 +1,151 @@
 from src.main.core.layers.gold import Gold
 from datetime import date
+import numpy as np
 import pandas as pd
-import pandasql as ps
+import pyarrow as pa
+import pyarrow.compute as pc
+from src.main.core.layers.dimensions import encode, gather
+from src.main.core.layers.columnar import constant, first_rows, hstack, to_int
+
+GROUP_KEYS = [
+    "CO_MUNICIPIO_SEM_DIGITO",
+    "NO_MUNICIPIO",
+    "DS_ATIVIDADE_PROFISSIONAL",
+    "TP_SUS_NAO_SUS",
+    "YYYY",
+    "MM",
+]
+COLS_POP = [
+    "CO_UF", "NO_UF", "NO_REGIAO", "NO_MUNICIPIO_IBGE",
+    "POPULACAO_MENSAL", "POPULACAO", "GROWTH_ABS", "GROWTH_PCT"
+]
+MESES = [f"{m:02d}" for m in range(1, 13)]
+
+
+def _municipio_periodo(t):
+    """CO_MUNICIPIO_SEM_DIGITO * 10^6 + AAAAMM como int64 (nulos viram -1 / 0)."""
+    if isinstance(t, pd.DataFrame):
+        mun = pd.to_numeric(t["CO_MUNICIPIO_SEM_DIGITO"], errors="coerce").fillna(-1).astype("int64").to_numpy()
+        yyyy = pd.to_numeric(t["YYYY"], errors="coerce").fillna(0).astype("int64").to_numpy()
+        mm = pd.to_numeric(t["MM"].astype(str), errors="coerce").fillna(0).astype("int64").to_numpy()
+        return mun * 1_000_000 + yyyy * 100 + mm
+    mun = pc.fill_null(to_int(t["CO_MUNICIPIO_SEM_DIGITO"]), -1)
+    yyyy = pc.fill_null(to_int(t["YYYY"]), 0)
+    mm = pc.fill_null(to_int(t["MM"]), 0)
+    return pc.add(pc.add(pc.multiply(mun, 1_000_000), pc.multiply(yyyy, 100)), mm)
 
 
 class CnesEstabelecimentosMetrics(Gold):
     job_type = "table"
-    
+    engine = "arrow"
+    engines = ("arrow", "pandas")  # TABLE_ENGINE=pandas: caminho de compatibilidade
+    # gold/cnes_estabelecimentos_metrics/YYYY=<ano>/data.parquet: quem lê uma janela de meses
+    # (ex.: cnes_model_features) baixa só os anos dela
+    partition_by = "YYYY"
+
     def __init__(self, year_month: str = "all"):
         super().__init__(name="cnes_estabelecimentos_metrics")
         self.year_month = year_month
 
+        # só as colunas usadas (year_month None = "all": carga full)
+        estab = self.read_silver_parquet("cnes_estabelecimentos", columns=[
+            "CO_PROFISSIONAL_SUS", "NO_MUNICIPIO", "DS_ATIVIDADE_PROFISSIONAL",
+            "TP_SUS_NAO_SUS", "CO_MUNICIPIO", "YYYYMM",
+        ])
+        if self.engine == "arrow":
+            years = sorted(pc.unique(pc.utf8_slice_codeunits(pc.cast(estab["YYYYMM"], pa.large_string()), 0, 4))
+                           .drop_null().to_pylist())
+        else:
+            years = sorted(estab["YYYYMM"].dropna().astype(str).str[:4].unique())
+
         self.inputs = {
-            "estabelecimentos": self.read_silver_parquet("cnes_estabelecimentos"), # year_month None = "all" (carga full)
-            "populacao": self._read_single_parquet(fs_client=self._gold_fs, path="populacao/data.parquet"),
+            "estabelecimentos": estab,
+            # gold/populacao/YYYY=<ano>/data.parquet — só os anos presentes na silver
+            "populacao": self.read_gold_partitions(
+                "populacao", "YYYY", values=years, columns=["CO_MUNICIPIO_SEM_DIGITO", "YYYY", "MM", *COLS_POP]),
         }
 
-    def definition(self) -> pd.DataFrame:
-        estab = self.inputs["estabelecimentos"].copy()
-        pop = self.inputs["populacao"].copy()
+    def definition(self):
+        return self._definition_arrow() if self.engine == "arrow" else self._definition_pandas()
+
+    def _definition_arrow(self) -> pa.Table:
+        estab = self.inputs["estabelecimentos"]
+        pop = self.inputs["populacao"]
 
         # ============================================================
         # filtros
         # ============================================================
-        mask_sus = estab.get("TP_SUS_NAO_SUS", "").eq("S")
-        mask_med = estab.get("DS_ATIVIDADE_PROFISSIONAL", "").astype(str).str.startswith("MEDICO", na=False)
-        estab = estab[mask_sus & mask_med]
+        mask_sus = pc.equal(estab["TP_SUS_NAO_SUS"], "S")
+        mask_med = pc.starts_with(estab["DS_ATIVIDADE_PROFISSIONAL"], "MEDICO")
+        estab = estab.filter(pc.fill_null(pc.and_(mask_sus, mask_med), False))
+
+        # tipos e chaves
+        yyyymm = pc.cast(estab["YYYYMM"], pa.large_string())
+        mm = pc.utf8_slice_codeunits(yyyymm, 4, 6)
+        estab = pa.table({
+            "CO_MUNICIPIO_SEM_DIGITO": to_int(estab["CO_MUNICIPIO"]),
+            "NO_MUNICIPIO": estab["NO_MUNICIPIO"],
+            "DS_ATIVIDADE_PROFISSIONAL": estab["DS_ATIVIDADE_PROFISSIONAL"],
+            "TP_SUS_NAO_SUS": estab["TP_SUS_NAO_SUS"],
+            "YYYY": to_int(pc.utf8_slice_codeunits(yyyymm, 0, 4)),
+            "MM": pc.if_else(pc.is_in(mm, value_set=pa.array(MESES, mm.type)), mm, pa.scalar(None, mm.type)),
+            "CO_PROFISSIONAL_SUS": estab["CO_PROFISSIONAL_SUS"],
+        })
+
+        # agrega profissionais únicos (hash group-by; ordem das chaves como no GROUP BY do SQL)
+        g = (estab.group_by(GROUP_KEYS)
+             .aggregate([("CO_PROFISSIONAL_SUS", "count_distinct")])
+             .rename_columns({"CO_PROFISSIONAL_SUS_count_distinct": "TOTAL_PROFISSIONAIS"}))
+        order = pc.sort_indices(g, sort_keys=[(k, "ascending", "at_start") for k in GROUP_KEYS])
+        g = g.take(order).select(GROUP_KEYS + ["TOTAL_PROFISSIONAIS"])
 
-        keep_cols = [
-            "CO_PROFISSIONAL_SUS",
-            "NO_MUNICIPIO",
-            "DS_ATIVIDADE_PROFISSIONAL",
-            "TP_SUS_NAO_SUS",
-            "CO_MUNICIPIO",
-            "YYYYMM",
-        ]
-        estab = estab[[c for c in keep_cols if c in estab.columns]].copy()
+        # join por uma chave inteira (município, AAAAMM): index_in + take por coluna
+        pop = first_rows(pop.append_column("MUNICIPIO_PERIODO", _municipio_periodo(pop)), "MUNICIPIO_PERIODO")
+        codes = encode(pop, "MUNICIPIO_PERIODO", _municipio_periodo(g))
+        df = hstack([g, gather(pop, codes, COLS_POP, fill_missing=True)])
+
+        populacao = pc.cast(df["POPULACAO_MENSAL"], pa.float64())
+        populacao = pc.if_else(pc.equal(populacao, 0), pa.scalar(None, pa.float64()), populacao)
+        df = df.append_column("PROFISSIONAIS_POR_1000", pc.multiply(
+            pc.divide(pc.cast(df["TOTAL_PROFISSIONAIS"], pa.float64()), populacao), 1000))
+
+        return df.append_column("DATA_INGESTAO", constant(date.today().isoformat(), df.num_rows))
+
+    def _definition_pandas(self) -> pd.DataFrame:
+        estab = self.inputs["estabelecimentos"]
+        pop = self.inputs["populacao"]
+
+        # filtros
+        mask_sus = estab["TP_SUS_NAO_SUS"].eq("S")
+        mask_med = estab["DS_ATIVIDADE_PROFISSIONAL"].astype(str).str.startswith("MEDICO", na=False)
+        estab = estab[mask_sus & mask_med]
 
         # tipos e chaves
-        estab["CO_MUNICIPIO_SEM_DIGITO"] = pd.to_numeric(estab["CO_MUNICIPIO"], errors="coerce").astype("Int64")
-        estab["YYYY"] = estab["YYYYMM"].astype(str).str[:4].astype("Int16")
-        estab["MM"] = estab["YYYYMM"].astype(str).str[4:6]
-        estab["MM"] = pd.Categorical(estab["MM"], categories=[f"{m:02d}" for m in range(1, 13)], ordered=True)
-
-        # agrega profissionais únicos
-        query = """
-        SELECT
-            CO_MUNICIPIO_SEM_DIGITO,
-            NO_MUNICIPIO,
-            DS_ATIVIDADE_PROFISSIONAL,
-            TP_SUS_NAO_SUS,
-            YYYY,
-            MM,
-            COUNT(DISTINCT CO_PROFISSIONAL_SUS) AS TOTAL_PROFISSIONAIS
-        FROM estab
-        WHERE TP_SUS_NAO_SUS = 'S'
-        GROUP BY
-            CO_MUNICIPIO_SEM_DIGITO,
-            NO_MUNICIPIO,
-            DS_ATIVIDADE_PROFISSIONAL,
-            TP_SUS_NAO_SUS,
-            YYYY,
-            MM
-        """
-        g = ps.sqldf(query, locals())
-
-        # normaliza população
-        for c in ["CO_MUNICIPIO_SEM_DIGITO", "YYYY", "MM"]:
-            if c not in pop.columns:
-                raise KeyError(f"população: coluna obrigatória ausente: {c}")
-
-        pop = pop.copy()
-        pop["CO_MUNICIPIO_SEM_DIGITO"] = pd.to_numeric(pop["CO_MUNICIPIO_SEM_DIGITO"], errors="coerce").astype("Int64")
-        pop["YYYY"] = pd.to_numeric(pop["YYYY"], errors="coerce").astype("Int16")
-        pop["MM"] = pop["MM"].astype(str).str.zfill(2)
-
-        # join e métrica
-        join_keys = ["CO_MUNICIPIO_SEM_DIGITO", "YYYY", "MM"]
-        cols_pop = join_keys + [
-            "CO_UF", "NO_UF", "NO_REGIAO", "NO_MUNICIPIO_IBGE",
-            "POPULACAO_MENSAL", "POPULACAO", "GROWTH_ABS", "GROWTH_PCT"
-        ]
-        cols_pop = [c for c in cols_pop if c in pop.columns]
-
-        df = g.merge(pop[cols_pop], on=join_keys, how="left")
+        yyyymm = estab["YYYYMM"].astype(str)
+        mm = yyyymm.str[4:6]
+        estab = pd.DataFrame({
+            "CO_MUNICIPIO_SEM_DIGITO": pd.to_numeric(estab["CO_MUNICIPIO"], errors="coerce").astype("Int64"),
+            "NO_MUNICIPIO": estab["NO_MUNICIPIO"],
+            "DS_ATIVIDADE_PROFISSIONAL": estab["DS_ATIVIDADE_PROFISSIONAL"],
+            "TP_SUS_NAO_SUS": estab["TP_SUS_NAO_SUS"],
+            "YYYY": pd.to_numeric(yyyymm.str[:4], errors="coerce").astype("Int64"),
+            "MM": mm.where(mm.isin(MESES)),
+            "CO_PROFISSIONAL_SUS": estab["CO_PROFISSIONAL_SUS"],
+        })
+
+        # agrega profissionais únicos (nulos agrupados e primeiro na ordem, como no GROUP BY do SQL)
+        g = (estab.groupby(GROUP_KEYS, dropna=False, sort=False)["CO_PROFISSIONAL_SUS"].nunique()
+             .rename("TOTAL_PROFISSIONAIS").reset_index()
+             .sort_values(GROUP_KEYS, na_position="first", ignore_index=True))
+
+        # join por uma chave inteira (município, AAAAMM): get_indexer + take por coluna
+        pop_key = _municipio_periodo(pop)
+        first = ~pd.Series(pop_key).duplicated().to_numpy()
+        codes = pd.Index(pop_key[first]).get_indexer(_municipio_periodo(g))
+        df = pd.concat([g, gather(pop[first], codes, COLS_POP, fill_missing=True)], axis=1)
         df["PROFISSIONAIS_POR_1000"] = (
-            (df["TOTAL_PROFISSIONAIS"] / df["POPULACAO_MENSAL"].replace({0: pd.NA})) * 1000
+            df["TOTAL_PROFISSIONAIS"] / df["POPULACAO_MENSAL"].astype("float64").replace({0: np.nan}) * 1000
         )
 
-        df["DATA_INGESTAO"] = pd.Timestamp.today().strftime("%Y-%m-%d")
-
-        return df
\ No newline at end of file
+        df["DATA_INGESTAO"] = date.today().isoformat()
+        return df
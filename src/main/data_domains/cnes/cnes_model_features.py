@@ -0,0 +1,116 @@
+from src.main.core.layers.gold import Gold
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+import pandas as pd
+
+
+METRICS_TABLE = "cnes_estabelecimentos_metrics"  # particionada por YYYY
+SERIES_KEYS = ["CO_MUNICIPIO_SEM_DIGITO", "DS_ATIVIDADE_PROFISSIONAL"]
+TARGET_COL = "PROFISSIONAIS_POR_1000"
+
+# rolling3 precisa de m-2..m; lag1 só de m-1
+LOOKBACK_MONTHS = 2
+
+# time_index = meses desde esta época fixa + 1: não depende do histórico carregado,
+# então um backfill de meses antigos não muda partições já gravadas
+TIME_INDEX_EPOCH = "200001"
+
+METRICS_COLUMNS = SERIES_KEYS + [
+    "NO_MUNICIPIO",
+    "YYYY",
+    "MM",
+    "POPULACAO_MENSAL",
+    "GROWTH_PCT",
+    "TOTAL_PROFISSIONAIS",
+    TARGET_COL,
+]
+
+
+def shift_period(year_month: str, months: int) -> str:
+    return (datetime.strptime(year_month, "%Y%m") + relativedelta(months=months)).strftime("%Y%m")
+
+
+def months_between(start: str, end: str) -> int:
+    return (int(end[:4]) - int(start[:4])) * 12 + int(end[4:6]) - int(start[4:6])
+
+
+class CnesModelFeatures(Gold):
+    """
+    Features de modelo materializadas por mês (date, lag1, rolling3, time_index).
+
+    Incremental: para o período `year_month` baixa da metrics só as partições
+    YYYY= da janela (o próprio mês e os LOOKBACK_MONTHS anteriores) e lê delas
+    só esses meses (pushdown de filtro + projeção de colunas); grava
+    gold/cnes_model_features/year_month=YYYYMM/data.parquet.
+
+    Semântica (calendário, não por linha):
+      - lag1       -> alvo da mesma série no mês anterior (NaN se ausente)
+      - rolling3   -> média do alvo em m-2..m (NaN se faltar algum mês)
+      - time_index -> meses desde TIME_INDEX_EPOCH + 1
+    As features são calculadas sobre a série completa; filtros de segmento
+    (população, outliers) ficam a cargo de cada modelo.
+    """
+
+    job_type = "table"
+    partitioned = True
+
+    def __init__(self, year_month: str | None = None):
+        super().__init__(name="cnes_model_features")
+
+        if year_month is None:
+            # período mais recente: só a última partição, só as colunas do período
+            years = [y for y, _ in self._list_partitions(self._gold_fs, METRICS_TABLE, "YYYY")]
+            if not years:
+                raise FileNotFoundError(f"Nenhum período encontrado em gold/{METRICS_TABLE}")
+            year_month = self._periods(self.read_gold_partitions(
+                METRICS_TABLE, "YYYY", values=years[-1:], columns=["YYYY", "MM"]))[-1]
+        self.year_month = year_month
+
+        window = [shift_period(self.year_month, -k) for k in range(LOOKBACK_MONTHS, -1, -1)]
+        filters = [[("YYYY", "=", int(ym[:4])), ("MM", "=", ym[4:6])] for ym in window]
+        try:
+            metrics = self.read_gold_partitions(METRICS_TABLE, "YYYY", values={ym[:4] for ym in window},
+                                                columns=METRICS_COLUMNS, filters=filters)
+        except FileNotFoundError:
+            metrics = None
+        if metrics is None or self.year_month not in self._periods(metrics):
+            raise FileNotFoundError(f"Não achei gold/{METRICS_TABLE} para {self.year_month}")
+        self.inputs = {"metrics": metrics}
+
+    @staticmethod
+    def _periods(df: pd.DataFrame) -> list[str]:
+        p = df[["YYYY", "MM"]].dropna().drop_duplicates()
+        yyyymm = p["YYYY"].astype(int).astype(str) + p["MM"].astype(str).str.zfill(2)
+        return sorted(yyyymm.unique().tolist())
+
+    def definition(self) -> pd.DataFrame:
+        m = self.inputs["metrics"].copy()
+
+        # tipos estáveis (MM chega categórico, alvo pode vir como object por causa de pd.NA)
+        m["MM"] = m["MM"].astype(str).str.zfill(2)
+        m["YYYYMM"] = m["YYYY"].astype(int).astype(str) + m["MM"]
+        for c in ["POPULACAO_MENSAL", "GROWTH_PCT", TARGET_COL]:
+            m[c] = pd.to_numeric(m[c], errors="coerce").astype("float64")
+        m = m.dropna(subset=SERIES_KEYS).drop_duplicates(subset=SERIES_KEYS + ["YYYYMM"], keep="last")
+
+        ym = self.year_month
+        df = m[m["YYYYMM"] == ym].copy()
+
+        # lookback: valor do alvo nos meses anteriores, por série
+        for k in range(1, LOOKBACK_MONTHS + 1):
+            prev = (
+                m.loc[m["YYYYMM"] == shift_period(ym, -k), SERIES_KEYS + [TARGET_COL]]
+                .rename(columns={TARGET_COL: f"_t{k}"})
+            )
+            df = df.merge(prev, on=SERIES_KEYS, how="left")
+
+        df["date"] = pd.Timestamp(year=int(ym[:4]), month=int(ym[4:6]), day=1)
+        df["lag1"] = df["_t1"]
+        lookback_cols = [f"_t{k}" for k in range(1, LOOKBACK_MONTHS + 1)]
+        df["rolling3"] = df[[TARGET_COL] + lookback_cols].mean(axis=1, skipna=False)
+        df["time_index"] = months_between(TIME_INDEX_EPOCH, ym) + 1
+        df = df.drop(columns=lookback_cols)
+
+        df["DATA_INGESTAO"] = pd.Timestamp.today().strftime("%Y-%m-%d")
+
+        return df.reset_index(drop=True)
@@ -0,0 +1,48 @@
+from src.main.core.layers.gold import Gold
+from src.main.core.layers.models import Predictor
+from .models.cnes_linear_regression import FEATURES_TABLE, FEATURES, TARGET_COL
+import pandas as pd
+
+
+KEY_COLS = ["CO_MUNICIPIO_SEM_DIGITO", "NO_MUNICIPIO", "DS_ATIVIDADE_PROFISSIONAL", "YYYYMM", "date"]
+
+
+class CnesPredictions(Gold):
+    """
+    Scoring em lote: aplica o artefato de cnes_linear_regression sobre um mês de
+    cnes_model_features (default: o mais recente) e grava
+    gold/cnes_predictions/year_month=YYYYMM/data.parquet.
+
+    O mês inteiro é pontuado com um único predict() vetorizado; a versão é a
+    apontada por latest.json e o blob vem do ArtifactCache (por ETag), então
+    reexecuções no mesmo processo não baixam o artefato de novo.
+    """
+
+    job_type = "score"
+    partitioned = True
+
+    def __init__(self, year_month: str | None = None, artifact_name: str = "cnes_linear_regression",
+                 batch_size: int | None = None):
+        super().__init__(name="cnes_predictions")
+        self.year_month = year_month or self.latest_gold_period(FEATURES_TABLE)
+        if self.year_month is None:
+            raise FileNotFoundError(f"Nenhum Parquet encontrado em gold/{FEATURES_TABLE}")
+        self.artifact_name = artifact_name
+        self.batch_size = batch_size
+        self.predictor = Predictor(artifact_name, features=FEATURES)
+
+        columns = list(dict.fromkeys(KEY_COLS + FEATURES + [TARGET_COL]))
+        self.inputs = {
+            "features": self.read_gold_parquet(FEATURES_TABLE, year_month=self.year_month, columns=columns),
+        }
+
+    def definition(self) -> pd.DataFrame:
+        feats = self.inputs["features"]
+
+        out = feats[KEY_COLS + [TARGET_COL]].copy()
+        out[f"PREDICAO_{TARGET_COL}"] = self.predictor.predict(feats, batch_size=self.batch_size)
+        out["ARTIFACT"] = self.artifact_name
+        out["ARTIFACT_PATH"] = self.predictor.model_path
+        out["DATA_INGESTAO"] = pd.Timestamp.today().strftime("%Y-%m-%d")
+
+        return out
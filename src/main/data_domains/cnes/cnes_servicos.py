@@ -1,48 +1,95 @@
 from datetime import date
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from src.main.core.layers.silver import Silver
+from src.main.core.layers.dimensions import encode, gather
+from src.main.core.layers.columnar import concat_str, constant, first_rows, hstack
 
 class CnesServicos(Silver):
     job_type = "table"
+    engine = "arrow"
+    engines = ("arrow", "pandas")  # TABLE_ENGINE=pandas: caminho de compatibilidade
+    depends_on = ["cnes_dimensoes"]
+
     def __init__(self, year_month: str):
         super().__init__(name="cnes_servicos")
         self.year_month = year_month
         ym = self.year_month
+        # fato do bronze; referências vêm das dimensões do mês (job cnes_dimensoes)
         self.inputs = {
-            "tbEstabelecimento":      self.read_csv_from_bronze(f"{ym}/tbEstabelecimento{ym}.csv"),
-            "tbMunicipio":            self.read_csv_from_bronze(f"{ym}/tbMunicipio{ym}.csv"),
-            "rlEstabServClass":       self.read_csv_from_bronze(f"{ym}/rlEstabServClass{ym}.csv"),
-            "tbClassificacaoServico": self.read_csv_from_bronze(f"{ym}/tbClassificacaoServico{ym}.csv"),
+            "rlEstabServClass":          self.read_csv_from_bronze(f"{ym}/rlEstabServClass{ym}.csv"),
+            "dim_estabelecimento":       self.read_dimension("estabelecimento", ym),
+            "dim_municipio":             self.read_dimension("municipio", ym),
+            "dim_classificacao_servico": self.read_dimension("classificacao_servico", ym),
         }
 
-    def definition(self) -> pd.DataFrame:
-        tbEstabelecimento = self.inputs["tbEstabelecimento"].copy()
-        tbMunicipio = self.inputs["tbMunicipio"].copy()
-        rlEstabServClass = self.inputs["rlEstabServClass"].copy()
-        tbClassificacaoServico = self.inputs["tbClassificacaoServico"].copy()
+    def definition(self):
+        return self._definition_arrow() if self.engine == "arrow" else self._definition_pandas()
 
-        tbEstabelecimento["CO_ESTADO_GESTOR"] = pd.to_numeric(
-            tbEstabelecimento.get("CO_ESTADO_GESTOR"), errors="coerce"
-        )
-        estab_sp = tbEstabelecimento[tbEstabelecimento["CO_ESTADO_GESTOR"] == 35]
+    def _definition_arrow(self) -> pa.Table:
+        rlEstabServClass = self.inputs["rlEstabServClass"]
+        estab = self.inputs["dim_estabelecimento"]
+        municipio = self.inputs["dim_municipio"]
+        classificacao = self.inputs["dim_classificacao_servico"]
 
-        estab_munic = estab_sp.merge(
-            tbMunicipio,
-            left_on="CO_MUNICIPIO_GESTOR",
-            right_on="CO_MUNICIPIO",
-            how="inner",
-            suffixes=("", "_mun"),
-        )
+        # ---- fato -> códigos (-1 = sem correspondência, como no inner join)
+        sk_class = encode(classificacao, ["CO_SERVICO_ESPECIALIZADO", "CO_CLASSIFICACAO_SERVICO"],
+                          rlEstabServClass.select(["CO_SERVICO", "CO_CLASSIFICACAO"]))
+        sk_estab = encode(estab, "CO_UNIDADE", rlEstabServClass["CO_UNIDADE"])
+
+        # estabelecimentos de SP (= 35) com município conhecido
+        estab_ok = pc.fill_null(pc.equal(estab["CO_ESTADO_GESTOR"], 35), False).to_numpy() \
+            & (estab["SK_MUNICIPIO"].to_numpy() >= 0)
+        keep = (sk_class >= 0) & (sk_estab >= 0)
+        keep[keep] = estab_ok[sk_estab[keep]]
+        sk_class, sk_estab = sk_class[keep], sk_estab[keep]
+        sk_mun = estab["SK_MUNICIPIO"].to_numpy()[sk_estab]
+
+        serv_join = hstack([
+            rlEstabServClass.filter(keep).select(["CO_UNIDADE", "CO_SERVICO", "CO_CLASSIFICACAO"]),
+            gather(classificacao, sk_class, ["DS_CLASSIFICACAO_SERVICO"]),
+            gather(municipio, sk_mun, ["NO_MUNICIPIO", "CO_MUNICIPIO"]),
+        ])
+
+        cols = ["CO_UNIDADE","NO_MUNICIPIO","CO_MUNICIPIO","CO_SERVICO","CO_CLASSIFICACAO","DS_CLASSIFICACAO_SERVICO"]
+        servicos = serv_join.select(cols).cast(pa.schema([(c, pa.large_string()) for c in cols]))
+
+        today_str = date.today().isoformat()
+        ym = self.year_month
+        n = servicos.num_rows
+        servicos = (servicos
+                    .append_column("SK_REGISTRO", concat_str(servicos, ["CO_UNIDADE", "CO_SERVICO", "CO_CLASSIFICACAO"], "_"))
+                    .append_column("DATA_INGESTAO", constant(today_str, n))
+                    .append_column("YYYYMM", constant(ym, n)))
+        return first_rows(servicos, "SK_REGISTRO")
+
+    def _definition_pandas(self) -> pd.DataFrame:
+        rlEstabServClass = self.inputs["rlEstabServClass"]
+        estab = self.inputs["dim_estabelecimento"]
+        municipio = self.inputs["dim_municipio"]
+        classificacao = self.inputs["dim_classificacao_servico"]
+
+        # ---- fato -> códigos (-1 = sem correspondência, como no inner join)
+        sk_class = encode(classificacao, ["CO_SERVICO_ESPECIALIZADO", "CO_CLASSIFICACAO_SERVICO"],
+                          rlEstabServClass[["CO_SERVICO", "CO_CLASSIFICACAO"]])
+        sk_estab = encode(estab, "CO_UNIDADE", rlEstabServClass["CO_UNIDADE"])
+
+        # estabelecimentos de SP (= 35) com município conhecido
+        estab_ok = (estab["CO_ESTADO_GESTOR"] == 35).fillna(False).to_numpy(dtype=bool) \
+            & (estab["SK_MUNICIPIO"].to_numpy() >= 0)
+        keep = (sk_class >= 0) & (sk_estab >= 0)
+        keep[keep] = estab_ok[sk_estab[keep]]
+        sk_class, sk_estab = sk_class[keep], sk_estab[keep]
+        sk_mun = estab["SK_MUNICIPIO"].to_numpy()[sk_estab]
 
-        serv_join = (
-            rlEstabServClass
-            .merge(
-                tbClassificacaoServico,
-                left_on=["CO_SERVICO", "CO_CLASSIFICACAO"],
-                right_on=["CO_SERVICO_ESPECIALIZADO", "CO_CLASSIFICACAO_SERVICO"],
-                how="inner",
-            )
-            .merge(estab_munic, on="CO_UNIDADE", how="inner")
+        serv_join = pd.concat(
+            [
+                rlEstabServClass.loc[keep, ["CO_UNIDADE", "CO_SERVICO", "CO_CLASSIFICACAO"]].reset_index(drop=True),
+                gather(classificacao, sk_class, ["DS_CLASSIFICACAO_SERVICO"]),
+                gather(municipio, sk_mun, ["NO_MUNICIPIO", "CO_MUNICIPIO"]),
+            ],
+            axis=1,
         )
 
         servicos = serv_join[
@@ -6,73 +6,92 @@ from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder
 import pandas as pd
 
-class CnesLinearRegression(Model):
+# Features materializadas pelo job gold `cnes_model_features`
+FEATURES_TABLE = "cnes_model_features"
 
-    job_type = "model"
-    
-    def __init__(self, artifact_name: str = "cnes_linear_regression"):
-        super().__init__(artifact_name)
+# Target e features
+TARGET_COL = 'PROFISSIONAIS_POR_1000'   # alvo contínuo
+CAT_COLS   = ['NO_MUNICIPIO', 'DS_ATIVIDADE_PROFISSIONAL']
+NUM_COLS   = ['POPULACAO_MENSAL', 'GROWTH_PCT', 'lag1', 'rolling3', 'time_index']
+FEATURES   = CAT_COLS + NUM_COLS
 
-    def pipeline(self) -> Pipeline:
-        df_input = self.read_gold_parquet("cnes_estabelecimentos_metrics", year_month=None)
+# projeção de leitura: só o que o modelo usa
+READ_COLUMNS = FEATURES + [TARGET_COL, 'date']
 
-        df_filtered = df_input.query("POPULACAO_MENSAL >= 50000 and NO_MUNICIPIO not in ['SAO PAULO','JERIQUARA'] and PROFISSIONAIS_POR_1000 <= 10 ") # filtrar outliers
+# filtrar outliers
+OUTLIER_QUERY = "NO_MUNICIPIO not in ['SAO PAULO','JERIQUARA'] and PROFISSIONAIS_POR_1000 <= 10"
 
-        df_featured = df_filtered.copy()
 
-        # Data feature
-        df_featured['date'] = pd.to_datetime(df_featured['YYYY'].astype(str) + '-' + df_featured['MM'].astype(str) + '-01')
+def temporal_cut(dates, train_frac: float = 0.8):
+    """Data de corte (train_frac das datas distintas): treino < corte <= teste."""
+    unique_dates = sorted(pd.unique(dates))
+    return unique_dates[int(len(unique_dates) * train_frac)]
 
-        # Índice temporal (para regressão linear)
-        df_featured["time_index"] = df_featured.groupby(["CO_MUNICIPIO_SEM_DIGITO","DS_ATIVIDADE_PROFISSIONAL"]).cumcount() + 1
 
-        # Lags e rolling
-        df_featured["lag1"] = df_featured.groupby(["CO_MUNICIPIO_SEM_DIGITO","DS_ATIVIDADE_PROFISSIONAL"])["PROFISSIONAIS_POR_1000"].shift(1)
-        df_featured["rolling3"] = df_featured.groupby(["CO_MUNICIPIO_SEM_DIGITO","DS_ATIVIDADE_PROFISSIONAL"])["PROFISSIONAIS_POR_1000"].transform(lambda x: x.rolling(3).mean())
+def training_metadata(df_model: pd.DataFrame, cut_date=None) -> dict:
+    """Resumo do treino para o sidecar do artefato."""
+    period = {
+        "start": str(pd.Timestamp(df_model['date'].min()).date()),
+        "end": str(pd.Timestamp(df_model['date'].max()).date()),
+    }
+    if cut_date is not None:
+        period["test_from"] = str(pd.Timestamp(cut_date).date())
+    return {
+        "features": FEATURES,
+        "target": TARGET_COL,
+        "training_period": period,
+        "n_rows": int(len(df_model)),
+    }
 
-        # Target e features
-        TARGET_COL = 'PROFISSIONAIS_POR_1000'   # alvo contínuo
-        CAT_COLS   = ['NO_MUNICIPIO', 'DS_ATIVIDADE_PROFISSIONAL']
-        NUM_COLS   = ['POPULACAO_MENSAL', 'GROWTH_PCT', 'lag1', 'rolling3', 'time_index']
 
-        FEATURES = CAT_COLS + NUM_COLS
+def build_pipeline() -> Pipeline:
+    pre = ColumnTransformer([
+        ('cat', OneHotEncoder(handle_unknown='ignore'), CAT_COLS),
+        ('num', 'passthrough', NUM_COLS)
+    ])
 
-        # Sanidade: remover linhas sem as features ou sem alvo
-        df_model = df_featured.dropna(subset=FEATURES + [TARGET_COL]).copy()
+    return Pipeline([
+        ('pre', pre),
+        ('lr', LinearRegression())
+    ])
+
+
+class CnesLinearRegression(Model):
+
+    job_type = "model"
 
+    def __init__(self, artifact_name: str = "cnes_linear_regression", compression: str | None = None,
+                 cv_folds: int = 12):
+        super().__init__(artifact_name, compression=compression)
+        self.cv_folds = cv_folds
 
-        # Split Temporal (80% treino, 20% teste)
-        # Data de corte (80% das datas distintas)
-        unique_dates = sorted(df_model['date'].unique())
-        cut_idx = int(len(unique_dates) * 0.8)
-        cut_date = unique_dates[cut_idx]
+    def pipeline(self) -> Pipeline:
+        df_input = self.read_gold_parquet(FEATURES_TABLE, year_month=None, columns=READ_COLUMNS)
 
-        X = df_model[FEATURES].copy()
-        y = df_model[TARGET_COL].copy()
+        df_filtered = df_input.query(f"POPULACAO_MENSAL >= 50000 and {OUTLIER_QUERY}")
 
-        X_train = X[df_model['date'] <  cut_date]
-        y_train = y[df_model['date'] <  cut_date]
-        X_test  = X[df_model['date'] >= cut_date]
-        y_test  = y[df_model['date'] >= cut_date]
+        # Sanidade: remover linhas sem as features ou sem alvo
+        df_model = df_filtered.dropna(subset=FEATURES + [TARGET_COL])
 
-        pre = ColumnTransformer([
-            ('cat', OneHotEncoder(handle_unknown='ignore'), CAT_COLS),
-            ('num', 'passthrough', NUM_COLS)
-        ])
 
-        pipe = Pipeline([
-            ('pre', pre),
-            ('lr', LinearRegression())
-        ])
+        X = df_model[FEATURES]
+        y = df_model[TARGET_COL]
 
-        pipe.fit(X_train, y_train)
+        pipe = build_pipeline()
 
-        self.execute_quality_check(
+        # QC: validação cruzada de origem móvel (um fold por mês, últimos cv_folds meses)
+        self.cross_validate(
             pipe,
-            X_test,
-            y_test,
-            thresholds={"MAE": 0.008, "RMSE": 0.01, "R2": 0.25}
+            X,
+            y,
+            dates=df_model['date'].to_numpy(),
+            thresholds={"MAE": 0.008, "RMSE": 0.01, "R2": 0.25},
+            n_folds=self.cv_folds,
         )
 
+        # aprovado no QC -> artefato final treinado com todo o histórico
+        pipe.fit(X, y)
+
+        self.metadata = training_metadata(df_model)
 
         return pipe
@@ -0,0 +1,139 @@
+# src/main/data_domains/cnes/models/cnes_linear_regression_segments.py
+from __future__ import annotations
+import os
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.main.core.layers.models import Model, quality_metrics
+from .cnes_linear_regression import (
+    FEATURES_TABLE, TARGET_COL, CAT_COLS, NUM_COLS, FEATURES, READ_COLUMNS, OUTLIER_QUERY,
+    build_pipeline, temporal_cut, training_metadata,
+)
+
+# Faixas de população (POPULACAO_MENSAL) — mesmas variantes de exploration/entregas/
+# nome -> (mínimo inclusivo, máximo exclusivo); None = sem limite
+SEGMENTS: dict[str, tuple[float | None, float | None]] = {
+    "abaixo_20k":  (None, 20000),
+    "abaixo_100k": (None, 100000),
+    "acima_20k":   (20000, None),
+    "acima_50k":   (50000, None),
+    "acima_100k":  (100000, None),
+}
+
+THRESHOLDS = {"MAE": 0.008, "RMSE": 0.01, "R2": 0.25}
+
+
+def _fit_segment(name: str, bounds: tuple, cat_codes: np.ndarray, categories: list,
+                 num: np.ndarray, y: np.ndarray, dates: np.ndarray):
+    """
+    Worker: recebe as matrizes compartilhadas (memmap somente-leitura, via joblib),
+    seleciona as linhas do segmento e treina/avalia um pipeline.
+    """
+    lo, hi = bounds
+    pop = num[:, NUM_COLS.index("POPULACAO_MENSAL")]
+    mask = np.ones(len(y), dtype=bool)
+    if lo is not None:
+        mask &= pop >= lo
+    if hi is not None:
+        mask &= pop < hi
+    if not mask.any():
+        return name, None, None, {"n_rows": 0}
+
+    X = pd.DataFrame(num[mask], columns=NUM_COLS)
+    for i, c in enumerate(CAT_COLS):
+        X[c] = pd.Categorical.from_codes(cat_codes[mask, i], categories=categories[i])
+    X = X[FEATURES]
+    y_seg = y[mask]
+    d_seg = dates[mask]
+
+    cut_date = temporal_cut(d_seg)
+    train = d_seg < cut_date
+
+    pipe = build_pipeline()
+    pipe.fit(X[train], y_seg[train])
+    metrics = quality_metrics(pipe, X[~train], y_seg[~train])
+    info = {
+        **training_metadata(pd.DataFrame({"date": d_seg}), cut_date),
+        "n_train": int(train.sum()),
+        "n_test": int((~train).sum()),
+    }
+    return name, pipe, metrics, info
+
+
+class CnesLinearRegressionSegments(Model):
+    """
+    Um modelo por faixa de população, a partir de uma única carga da gold.
+
+    A tabela de features é lida uma vez e codificada em arrays numéricos
+    (códigos das categóricas + matriz numérica). O joblib (loky) grava esses
+    arrays uma vez em memmap e os workers leem somente-leitura, sem cópia por
+    processo. Cada segmento publica uma versão em
+    artifacts/<artifact_name>/<segmento>/ com as métricas de QC no sidecar.
+
+    Sobrescreve run() (vários artefatos por job) em vez de pipeline(): as
+    faixas se sobrepõem, então não há um estimador único que as combine.
+    """
+
+    job_type = "model"
+
+    def __init__(self, artifact_name: str = "cnes_linear_regression_segments",
+                 segments: dict | None = None, n_jobs: int | None = None,
+                 compression: str | None = None):
+        super().__init__(artifact_name, compression=compression)
+        self.segments = segments or SEGMENTS
+        self.n_jobs = n_jobs or min(len(self.segments), os.cpu_count() or 1)
+
+    def _design_arrays(self):
+        df = self.read_gold_parquet(FEATURES_TABLE, year_month=None, columns=READ_COLUMNS)
+        df = df.query(OUTLIER_QUERY).dropna(subset=FEATURES + [TARGET_COL])
+
+        codes, categories = [], []
+        for c in CAT_COLS:
+            cod, uniq = pd.factorize(df[c], sort=True)
+            codes.append(cod.astype(np.int32))
+            categories.append(list(uniq))
+
+        cat_codes = np.column_stack(codes)
+        num = df[NUM_COLS].to_numpy(dtype=np.float64)
+        y = df[TARGET_COL].to_numpy(dtype=np.float64)
+        dates = df["date"].to_numpy(dtype="datetime64[ns]")
+        return cat_codes, categories, num, y, dates
+
+    def train_segments(self) -> dict:
+        cat_codes, categories, num, y, dates = self._design_arrays()
+        print(f"→ Treinando {len(self.segments)} segmentos ({len(y)} linhas, n_jobs={self.n_jobs})")
+
+        results = Parallel(n_jobs=self.n_jobs, backend="loky", max_nbytes="1M", mmap_mode="r")(
+            delayed(_fit_segment)(name, bounds, cat_codes, categories, num, y, dates)
+            for name, bounds in self.segments.items()
+        )
+        return {name: (pipe, metrics, info) for name, pipe, metrics, info in results}
+
+    def run(self) -> None:
+        failed = []
+        for name, (pipe, metrics, info) in self.train_segments().items():
+            if pipe is None:
+                failed.append(f"{name}: sem linhas")
+                continue
+            try:
+                self.check_thresholds(metrics, THRESHOLDS)
+            except ValueError as e:
+                failed.append(f"{name}: {e}")
+                continue
+
+            dest = self._save_artifact(
+                pipe,
+                name=f"{self.artifact_name}/{name}",
+                extra_metadata={
+                    **info,
+                    "segment": name,
+                    "bounds": list(self.segments[name]),
+                    "qc_metrics": metrics,
+                },
+            )
+            print(f"✅ [{name}] QC métricas: MAE={metrics['MAE']}, RMSE={metrics['RMSE']}, R2={metrics['R2']}")
+            print(f"✅ Artifact salvo em artifacts/{dest}")
+
+        if failed:
+            raise ValueError("Segmentos reprovados: " + "; ".join(failed))
@@ -0,0 +1,205 @@
+from src.main.core.layers.gold import Gold
+from src.main.core.infra.storage import bronze
+from src.main.core.infra.profiling import profiler
+import io
+import re
+import numpy as np
+import pandas as pd
+
+
+RAW_PATH = "populacao/populacao_estados.csv"
+
+ID_COLS = ["CO_MUNICIPIO", "NO_MUNICIPIO", "CO_UF", "NO_UF", "NO_REGIAO", "CO_MUNICIPIO_COMPLETO"]
+
+
+# ============================================================
+# Helpers vetorizados (substituem parse_number / norm_city / fix_* do notebook)
+# ============================================================
+def parse_ptbr_numbers(s: pd.Series) -> pd.Series:
+    """'1.234.567' / '12,5' -> float; lixo não numérico é descartado antes da 2ª tentativa."""
+    s = s.astype("string").str.strip()
+    first = pd.to_numeric(s.str.replace(".", "", regex=False).str.replace(",", ".", regex=False),
+                          errors="coerce")
+    cleaned = (s.str.replace(r"[^0-9\.,-]+", "", regex=True)
+                .str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    second = pd.to_numeric(cleaned, errors="coerce")
+    return first.fillna(second).astype("float64")
+
+
+def norm_city(s: pd.Series) -> pd.Series:
+    """Remove acentos (NFKD -> ASCII), strip e upper — sem loop Python por linha."""
+    return (s.astype("string")
+             .str.normalize("NFKD")
+             .str.encode("ascii", errors="ignore")
+             .str.decode("ascii")
+             .str.strip()
+             .str.upper())
+
+
+def fix_scale(values: np.ndarray, round_to_10: bool = True) -> np.ndarray:
+    """
+    Valores escritos em milhares ('12,5' = 12.500) quando a magnitude típica
+    é >= 1000: multiplica por 1000 os fracionários < 100. Demais -> inteiro.
+    """
+    out = values.copy()
+    typical_mag = np.nanmedian(out) if np.isfinite(out).any() else 0.0
+    if typical_mag >= 1000:
+        frac = np.abs(out - np.trunc(out)) > 1e-9
+        mask = (out < 100) & frac & ~np.isnan(out)
+        scaled = out[mask] * 1000.0
+        out[mask] = np.round(scaled, -1) if round_to_10 else np.round(scaled)
+    return np.round(out)
+
+
+def fix_digit_drop(values: np.ndarray) -> np.ndarray:
+    """
+    Por município (linha), compara o nº de dígitos de cada ano com a moda da
+    linha e recupera quedas de 1 ou 2 dígitos (x10 / x100).
+    """
+    out = values.copy()
+    valid = ~np.isnan(out)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        digits = np.where(out == 0, 1, np.floor(np.log10(np.abs(out))) + 1)
+    digits = np.where(valid, digits, 0).astype(np.int64)
+
+    # moda por linha (empate -> menor nº de dígitos, como Series.mode().iloc[0])
+    max_d = max(int(digits.max()), 1)
+    counts = np.stack([(digits == d).sum(axis=1) for d in range(1, max_d + 1)], axis=1)
+    target = counts.argmax(axis=1) + 1
+    has_any = valid.any(axis=1)
+
+    delta = target[:, None] - digits
+    bump = np.where(valid & has_any[:, None] & np.isin(delta, [1, 2]), delta, 0)
+    return np.where(bump > 0, np.rint(out * np.power(10.0, bump)), out)
+
+
+def fill_linear(y: np.ndarray) -> np.ndarray:
+    """
+    Interpolação linear por linha entre valores válidos; bordas recebem o
+    valor válido mais próximo (= interpolate(limit_direction="both")).
+    Linhas sem nenhum valor válido ficam NaN.
+    """
+    n = y.shape[1]
+    idx = np.arange(n)
+    valid = ~np.isnan(y)
+
+    prev = np.maximum.accumulate(np.where(valid, idx, -1), axis=1)
+    nxt = np.minimum.accumulate(np.where(valid, idx, n)[:, ::-1], axis=1)[:, ::-1]
+
+    rows = np.arange(y.shape[0])[:, None]
+    y_prev = y[rows, np.clip(prev, 0, n - 1)]
+    y_next = y[rows, np.clip(nxt, 0, n - 1)]
+
+    span = np.where((nxt - prev) > 0, nxt - prev, 1)
+    w = (idx - prev) / span
+    interp = y_prev + (y_next - y_prev) * w
+
+    out = np.where(prev < 0, y_next, np.where(nxt >= n, y_prev, interp))
+    return np.where(valid, y, out)
+
+
+def monthly_geometric(annual: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """
+    Anual (1º de janeiro) -> mensal (1º de cada mês, jan/ano_min .. dez/ano_max)
+    com interpolação log-linear no tempo (dias). Após o último 1º de janeiro,
+    repete o último valor.
+    """
+    n_years = len(years)
+    month_dates = pd.date_range(f"{years[0]}-01-01", f"{years[-1]}-12-01", freq="MS")
+    anchors = pd.to_datetime([f"{y}-01-01" for y in years] + [f"{years[-1] + 1}-01-01"])
+
+    year_pos = np.repeat(np.arange(n_years), 12)
+    start = anchors[year_pos]
+    end = anchors[year_pos + 1]
+    frac = ((month_dates - start).days / (end - start).days).to_numpy()
+
+    logp = np.log(annual)
+    left = logp[:, year_pos]
+    right = logp[:, np.minimum(year_pos + 1, n_years - 1)]
+    frac = np.where(year_pos + 1 < n_years, frac, 0.0)
+    return np.exp(left + (right - left) * frac)
+
+
+class Populacao(Gold):
+    """
+    População municipal mensal (IBGE), a partir do CSV anual em
+    bronze/populacao/populacao_estados.csv.
+
+    Tudo vetorizado sobre todos os municípios de uma vez (matriz município x ano):
+      parse pt-BR -> correção de escala/dígitos -> imputação geométrica de anos
+      faltantes -> interpolação geométrica mensal -> GROWTH_ABS / GROWTH_PCT.
+    Saída particionada por ano: gold/populacao/YYYY=<ano>/data.parquet.
+    """
+
+    job_type = "table"
+    allowed_layers = ["bronze", "gold"]
+    partition_by = "YYYY"
+
+    def __init__(self, bronze_store=bronze):
+        super().__init__(name="populacao")
+        self._bronze_fs = bronze_store.fs
+
+        data = self._download_bytes(self._bronze_fs, RAW_PATH)
+        with profiler.phase("parse", path=RAW_PATH) as ph:
+            self.inputs = {
+                "populacao_estados": pd.read_csv(io.BytesIO(data), dtype=str),
+            }
+            ph.rows_out = len(self.inputs["populacao_estados"])
+
+    def definition(self) -> pd.DataFrame:
+        raw = self.inputs["populacao_estados"]
+        year_cols = sorted((c for c in raw.columns if re.fullmatch(r"\d{4}", str(c))), key=int)
+        if not year_cols:
+            raise KeyError("populacao: nenhuma coluna de ano (YYYY) encontrada")
+
+        ids = raw[ID_COLS].drop_duplicates(subset=["CO_MUNICIPIO", "NO_MUNICIPIO"]).reset_index(drop=True)
+        wide = (raw.drop_duplicates(subset=["CO_MUNICIPIO", "NO_MUNICIPIO"])
+                   .reset_index(drop=True)[year_cols])
+
+        # ---- parse + correções (matriz município x ano)
+        parsed = np.column_stack([parse_ptbr_numbers(wide[c]).to_numpy() for c in year_cols])
+        values = fix_digit_drop(fix_scale(parsed))
+
+        # ---- anos faltantes (colunas ausentes e valores vazios): imputação geométrica
+        years = np.arange(int(year_cols[0]), int(year_cols[-1]) + 1)
+        annual = np.full((len(ids), len(years)), np.nan)
+        annual[:, [int(y) - years[0] for y in year_cols]] = values
+        annual = np.where(annual > 0, annual, np.nan)
+        imputed = np.isnan(annual)
+        annual = np.exp(fill_linear(np.log(annual)))
+
+        keep = ~np.isnan(annual).all(axis=1)
+        ids, annual, imputed = ids[keep].reset_index(drop=True), annual[keep], imputed[keep]
+        annual_int = np.round(annual)
+
+        ids["NO_MUNICIPIO_IBGE"] = norm_city(ids["NO_MUNICIPIO"]).astype(str)
+        ids["CO_MUNICIPIO_SEM_DIGITO"] = pd.to_numeric(
+            ids["CO_MUNICIPIO_COMPLETO"].astype(str).str[:-1], errors="coerce"
+        ).astype("Int64")
+
+        # ---- mensal + crescimento
+        monthly = np.round(monthly_geometric(annual_int, years))
+        growth_abs = np.full_like(monthly, np.nan)
+        growth_abs[:, 1:] = np.diff(monthly, axis=1)
+        growth_pct = np.full_like(monthly, np.nan)
+        growth_pct[:, 1:] = growth_abs[:, 1:] / monthly[:, :-1]
+
+        # ---- formato longo (município x mês)
+        n_cities, n_months = monthly.shape
+        month_year = np.repeat(years, 12)
+        month_num = np.tile(np.arange(1, 13), len(years))
+        year_pos = np.repeat(np.arange(len(years)), 12)
+        city_idx = np.repeat(np.arange(n_cities), n_months)
+
+        df = ids.iloc[city_idx].reset_index(drop=True)
+        df["YYYY"] = pd.array(np.tile(month_year, n_cities), dtype="Int64")
+        df["MM"] = pd.array(np.tile(month_num, n_cities), dtype="Int64")
+        df["DATE"] = pd.to_datetime({"year": df["YYYY"].astype(int), "month": df["MM"].astype(int), "day": 1})
+        df["POPULACAO_MENSAL"] = pd.array(monthly.ravel(), dtype="Int64")
+        df["POPULACAO"] = pd.array(annual_int[:, year_pos].ravel(), dtype="Int64")
+        df["IMPUTED"] = pd.array(imputed[:, year_pos].ravel(), dtype="boolean")
+        df["GROWTH_ABS"] = growth_abs.ravel()
+        df["GROWTH_PCT"] = growth_pct.ravel()
+
+        df["DATA_INGESTAO"] = pd.Timestamp.today().strftime("%Y-%m-%d")
+        return df
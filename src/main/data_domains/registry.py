@@ -1,22 +1,40 @@
 # src/main/data_domains/registry.py
-from typing import Dict, Type
+import inspect
+from typing import Dict, List, Optional, Tuple, Type
+
+from ..core.infra.backfill import chain_periods
 
 # Tabelas
+from .ibge.populacao import Populacao
+from .cnes.cnes_dimensoes import CnesDimensoes
 from .cnes.cnes_servicos import CnesServicos
 from .cnes.cnes_estabelecimentos import CnesEstabelecimentos
 from .cnes.cnes_estabelecimentos_metrics import CnesEstabelecimentosMetrics
+from .cnes.cnes_cubo import CnesCubo
+from .cnes.cnes_model_features import CnesModelFeatures
 
 # Modelos
 from .cnes.models.cnes_linear_regression import CnesLinearRegression
+from .cnes.models.cnes_linear_regression_segments import CnesLinearRegressionSegments
+
+# Scoring
+from .cnes.cnes_predictions import CnesPredictions
 
 #registry.py
 JOBS: Dict[str, Type] = {
     # Tables
+    "populacao": Populacao,  # consumida pela metrics
+    "cnes_dimensoes": CnesDimensoes,  # dimensões do mês, lidas pelos fatos abaixo
     "cnes_servicos": CnesServicos,
     "cnes_estabelecimentos": CnesEstabelecimentos,
     "cnes_estabelecimentos_metrics": CnesEstabelecimentosMetrics,
+    "cnes_cubo": CnesCubo,  # rollups da silver por nível (gold/cnes_cubo_<nível>)
+    "cnes_model_features": CnesModelFeatures,  # depende da metrics (ordem importa no pipeline)
     # Models
     "cnes_linear_regression": CnesLinearRegression,
+    "cnes_linear_regression_segments": CnesLinearRegressionSegments,
+    # Scoring
+    "cnes_predictions": CnesPredictions,
 }
 
 def list_jobs() -> Dict[str, Type]:
@@ -27,3 +45,97 @@ def get_job(name: str):
         return JOBS[name]
     except KeyError:
         raise SystemExit(f"Job desconhecido: {name}. Use `python -m src.main list`.")
+
+
+# ordem das etapas do pipeline (job_type)
+STAGES = ["table", "model", "score"]
+
+
+def pipeline_units(year_months: List[str], stages: List[str] = STAGES,
+                   jobs: Optional[List[str]] = None) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Unidades (stage, job, year_month) na ordem de execução do pipeline:
+      - table: silver um por mês; tabelas sem year_month só uma vez — antes de
+        tudo se leem apenas o bronze (ex.: populacao), senão depois de toda a
+        silver mensal (ex.: cnes_cubo). Gold não particionada (carga full, ex.:
+        metrics) também roda uma vez só, mesmo aceitando year_month; gold
+        particionada por mês (ex.: cnes_model_features) vem depois dela, mês a mês
+      - model/score: uma vez, sem year_month (usam o período mais recente)
+    """
+    units: List[Tuple[str, str, Optional[str]]] = []
+    selected = {k: v for k, v in JOBS.items() if jobs is None or k in jobs}
+    for stage in stages:
+        for name, JobCls in selected.items():
+            if getattr(JobCls, "job_type", None) != stage:
+                continue
+            if stage == "table" and _is_monthly(JobCls):
+                units.extend((stage, name, ym) for ym in year_months)
+            else:
+                units.append((stage, name, None))
+    if "table" in stages:
+        order = {ym: i for i, ym in enumerate(year_months)}
+        tables = [u for u in units if u[0] == "table"]
+
+        def position(u):
+            JobCls = JOBS[u[1]]
+            if u[2] is None:
+                return (0, 0) if "silver" not in JobCls.allowed_layers else (2, 0)
+            # silver mês a mês (todas as tabelas de um período antes do próximo), depois a gold mensal
+            return (1, order[u[2]]) if JobCls.layer == "silver" else (3, order[u[2]])
+
+        tables.sort(key=position)
+        units = tables + [u for u in units if u[0] != "table"]
+    return units
+
+
+def _is_monthly(JobCls) -> bool:
+    """Tabela que roda por mês: aceita year_month e, se gold, grava partição por mês."""
+    if "year_month" not in inspect.signature(JobCls.__init__).parameters:
+        return False
+    return JobCls.layer != "gold" or getattr(JobCls, "partitioned", False)
+
+
+def backfill_plan(year_months: List[str], stages: List[str] = STAGES, extract: bool = False):
+    """
+    Unidades do backfill e suas dependências ({unit: set(units)}):
+      - extract (se pedido): uma por mês, sem dependências
+      - tabelas silver: por mês, dependem do extract do mês e dos jobs em
+        depends_on (ex.: cnes_dimensoes) no mesmo mês; com cdc_key, também do
+        mesmo job no mês anterior (o delta é calculado contra ele)
+      - tabelas gold: dependem de toda a silver e das gold anteriores no registry;
+        gold não particionada (carga full, ex.: metrics) vira uma unidade só
+      - model: depende de todas as tabelas; score: de todos os modelos
+    """
+    units: List[Tuple[str, str, Optional[str]]] = [("extract", "extract", ym) for ym in year_months] if extract else []
+    units += pipeline_units(year_months, stages)
+
+    job_order = {name: i for i, name in enumerate(JOBS)}
+    silver = {u for u in units if u[0] == "table" and JOBS[u[1]].layer == "silver"}
+    deps = {}
+    for unit in units:
+        stage, name, ym = unit
+        if stage == "extract":
+            deps[unit] = set()
+        elif unit in silver:
+            deps[unit] = {("extract", "extract", ym)} if extract else set()
+            deps[unit] |= {("table", dep, ym) for dep in JOBS[name].depends_on if ("table", dep, ym) in units}
+        elif stage == "table":
+            deps[unit] = silver | {u for u in units if u[0] == "table" and u not in silver
+                                   and job_order[u[1]] < job_order[name]}
+        else:
+            earlier = ["extract", *STAGES[:STAGES.index(stage)]]
+            deps[unit] = {u for u in units if u[0] in earlier}
+    chain_periods(units, deps, {name for name, JobCls in JOBS.items() if getattr(JobCls, "cdc_key", None)})
+
+    # ordem topológica (e de prioridade): extract, silver mês a mês, gold por job, model, score
+    month = {ym: i for i, ym in enumerate(sorted(year_months))}
+
+    def rank(u):
+        m = -1 if u[2] is None else month[u[2]]
+        if u[0] == "extract":
+            return (0, m, 0)
+        if u in silver:
+            return (1, m, job_order[u[1]])
+        return (2 + STAGES.index(u[0]), job_order[u[1]], m)
+
+    return sorted(units, key=rank), deps
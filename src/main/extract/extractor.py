@@ -8,6 +8,7 @@ import shutil
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import subprocess, shlex
+from src.main.core.infra.profiling import profiler
 
 # --- Defina o verificador SSL global aqui ---
 try:
@@ -43,6 +44,11 @@ class Extractor:
         self.download_url = f"https://cnes.datasus.gov.br/EstatisticasServlet?path=BASE_DE_DADOS_CNES_{self.year_month}.ZIP"
 
     def download_zip(self):
+        with profiler.phase("download", path=self.download_url) as ph:
+            self._download_zip()
+            ph.bytes = os.path.getsize(self.local_zip_path)
+
+    def _download_zip(self):
         os.makedirs(os.path.dirname(self.local_zip_path), exist_ok=True)
         print(f"Starting File Download: {self.download_url}")
 
@@ -68,8 +74,10 @@ class Extractor:
     def extract_zip(self):
         os.makedirs(self.local_extract_dir, exist_ok=True)
         print(f"Extracting ZIP to {self.local_extract_dir}")
-        with zipfile.ZipFile(self.local_zip_path, 'r') as zip_ref:
+        with profiler.phase("extract", path=self.local_zip_path) as ph, \
+                zipfile.ZipFile(self.local_zip_path, 'r') as zip_ref:
             zip_ref.extractall(self.local_extract_dir)
+            ph.bytes = sum(i.file_size for i in zip_ref.infolist())
         print("Extraction completed.")
 
     def upload_to_datalake(self):
@@ -80,6 +88,12 @@ class Extractor:
         )
         file_system_client = datalake_client.get_file_system_client(self.file_system_name)
 
+        with profiler.phase("upload", path=self.datalake_target_path) as ph:
+            ph.bytes = self._upload_csvs(file_system_client)
+        print("Upload completed successfully.")
+
+    def _upload_csvs(self, file_system_client) -> int:
+        total = 0
         for root, _, files in os.walk(self.local_extract_dir):
             for file_name in files:
                 if file_name.lower().endswith(".csv"):
@@ -96,7 +110,8 @@ class Extractor:
                             max_concurrency=8,
                             chunk_size=4 * 1024 * 1024
                         )
-        print("Upload completed successfully.")
+                    total += os.path.getsize(local_file_path)
+        return total
 
     def cleanup(self):
         """
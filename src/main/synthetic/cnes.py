@@ -0,0 +1,359 @@
+from __future__ import annotations
+import csv
+import hashlib
+import io
+import numpy as np
+import pandas as pd
+
+
+# mesmo caminho lido por data_domains/ibge/populacao.py (não importado aqui para
+# o gerador não depender dos stores inicializados no import)
+POPULACAO_PATH = "populacao/populacao_estados.csv"
+
+# ============================================================
+# Vocabulário fixo (não escala)
+# ============================================================
+UFS = [  # (CO_UF, sigla, NO_UF, NO_REGIAO, peso)
+    ("35", "SP", "São Paulo", "Sudeste", 0.70),
+    ("33", "RJ", "Rio de Janeiro", "Sudeste", 0.15),
+    ("31", "MG", "Minas Gerais", "Sudeste", 0.15),
+]
+
+CBOS = [  # (CO_CBO, DS_ATIVIDADE_PROFISSIONAL, peso)
+    ("225125", "MEDICO CLINICO", 10), ("225250", "MEDICO GINECOLOGISTA E OBSTETRA", 6),
+    ("225124", "MEDICO PEDIATRA", 6), ("225133", "MEDICO PSIQUIATRA", 4),
+    ("225120", "MEDICO CARDIOLOGISTA", 4), ("225320", "MEDICO EM RADIOLOGIA E DIAGNOSTICO POR IMAGEM", 4),
+    ("225270", "MEDICO ORTOPEDISTA E TRAUMATOLOGISTA", 4), ("225142", "MEDICO DA ESTRATEGIA DE SAUDE DA FAMILIA", 4),
+    ("225265", "MEDICO OFTALMOLOGISTA", 3), ("225225", "MEDICO CIRURGIAO GERAL", 3),
+    ("225112", "MEDICO NEUROLOGISTA", 3), ("225135", "MEDICO DERMATOLOGISTA", 3),
+    ("225285", "MEDICO UROLOGISTA", 2), ("225275", "MEDICO OTORRINOLARINGOLOGISTA", 2),
+    ("225151", "MEDICO ANESTESIOLOGISTA", 2), ("225110", "MEDICO ALERGISTA E IMUNOLOGISTA", 1),
+    ("223505", "ENFERMEIRO", 14), ("322205", "TÉCNICO DE ENFERMAGEM", 18),
+    ("223208", "CIRURGIÃO DENTISTA - CLÍNICO GERAL", 6), ("223405", "FARMACÊUTICO", 3),
+    ("223605", "FISIOTERAPEUTA GERAL", 4), ("515105", "AGENTE COMUNITÁRIO DE SAÚDE", 10),
+    ("251510", "PSICÓLOGO CLÍNICO", 3), ("223710", "NUTRICIONISTA", 2),
+]
+
+SERVICOS = [  # (CO_SERVICO, [DS_CLASSIFICACAO_SERVICO...])
+    ("100", ["ATENÇÃO BÁSICA", "SAÚDE DA FAMÍLIA", "ACOLHIMENTO"]),
+    ("105", ["CARDIOLOGIA CLÍNICA", "ELETROCARDIOGRAFIA", "ECOCARDIOGRAFIA"]),
+    ("113", ["MAMOGRAFIA", "RADIOLOGIA", "ULTRASSONOGRAFIA", "TOMOGRAFIA COMPUTADORIZADA"]),
+    ("115", ["SAÚDE MENTAL", "CAPS I", "CAPS II"]),
+    ("120", ["ODONTOLOGIA BÁSICA", "ENDODONTIA", "PERIODONTIA", "PRÓTESE DENTÁRIA"]),
+    ("125", ["FARMÁCIA BÁSICA", "DISPENSAÇÃO"]),
+    ("126", ["FISIOTERAPIA EM ALTERAÇÕES NEUROLÓGICAS", "FISIOTERAPIA CARDIOVASCULAR"]),
+    ("135", ["REABILITAÇÃO FÍSICA", "REABILITAÇÃO INTELECTUAL", "REABILITAÇÃO AUDITIVA"]),
+    ("145", ["PATOLOGIA CLÍNICA", "ANATOMIA PATOLÓGICA", "CITOPATOLOGIA"]),
+    ("159", ["URGÊNCIA E EMERGÊNCIA", "PRONTO ATENDIMENTO"]),
+]
+
+_CITY_A = ["SÃO", "SANTA", "BOM JESUS DE", "NOVA", "PORTO", "ÁGUAS DE", "CAMPOS DE", "VILA", "RIBEIRÃO", "ITÁ",
+           "MONTE", "PIRAÍ DO"]
+_CITY_B = ["JOSÉ", "PAULO", "MARIA", "LUZIA", "JOÃO", "BRANCA", "ESPERANÇA", "ARAÇÁ", "PIRACÊ", "CONCEIÇÃO",
+           "BÁRBARA", "ANDRÉ", "LINDÓIA", "IGUAÇU"]
+_CITY_C = ["", " DO SUL", " DO NORTE", " DA SERRA", " PAULISTA", " DO OESTE", " DAS FLORES", " DO CAMPO"]
+_UNIT = ["UBS", "USF", "HOSPITAL", "CLÍNICA", "POLICLÍNICA", "PRONTO SOCORRO", "CENTRO DE SAÚDE", "LABORATÓRIO",
+         "CAPS", "AMBULATÓRIO"]
+_BAIRRO = ["CENTRO", "JARDIM SÃO JOSÉ", "VILA NOVA", "JARDIM AMÉRICA", "PARQUE INDUSTRIAL", "BELA VISTA",
+           "JARDIM PAULISTA", "VILA SÃO JOÃO", "CONCEIÇÃO", "JARDIM DAS FLORES", "ZONA RURAL"]
+_FIRST = ["JOSÉ", "MARIA", "ANA", "JOÃO", "ANTÔNIO", "FRANCISCO", "CARLOS", "PAULO", "LUCIANA", "FERNANDA",
+          "MÁRCIA", "SÉRGIO", "PATRÍCIA", "CLÁUDIA", "ROGÉRIO", "CÉSAR", "LÚCIA", "ÂNGELA", "INÊS", "JÚLIO"]
+_LAST = ["SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "RODRIGUES", "FERREIRA", "ALVES", "PEREIRA", "LIMA", "GOMES",
+         "RIBEIRO", "CONCEIÇÃO", "ARAÚJO", "MAGALHÃES", "GONÇALVES", "BRAGANÇA", "FALCÃO", "ASSUNÇÃO"]
+
+# tamanhos na escala 1.0 (tbCargaHorariaSus ~ 2 vínculos por profissional)
+BASE_MUNICIPIOS = 80
+BASE_ESTABELECIMENTOS = 3_000
+BASE_PROFISSIONAIS = 12_000
+
+# janela (em meses absolutos) em que vínculos e serviços começam/terminam
+_EPOCH = 2024 * 12
+_START_RANGE = (-72, 36)
+_MEAN_DURATION = 120
+
+
+def ibge_check_digit(code6: str) -> str:
+    """Dígito verificador do código IBGE de município (7º dígito)."""
+    total = 0
+    for d, w in zip(code6, (1, 2, 1, 2, 1, 2)):
+        p = int(d) * w
+        total += p // 10 + p % 10
+    return str((10 - total % 10) % 10)
+
+
+def ascii_upper(s: pd.Series) -> pd.Series:
+    return (s.str.normalize("NFKD").str.encode("ascii", errors="ignore").str.decode("ascii").str.upper())
+
+
+def month_index(year_month: str) -> int:
+    return int(year_month[:4]) * 12 + int(year_month[4:6]) - 1
+
+
+def to_bronze_csv(df: pd.DataFrame) -> bytes:
+    """Como os arquivos do DATASUS: ';', tudo entre aspas, latin-1, CRLF."""
+    buf = io.StringIO()
+    df.to_csv(buf, sep=";", index=False, quoting=csv.QUOTE_ALL, lineterminator="\r\n")
+    return buf.getvalue().encode("latin-1")
+
+
+class SyntheticCnes:
+    """
+    Gerador determinístico de meses sintéticos do CNES (bronze) e da tabela
+    anual de população do IBGE, com chaves consistentes entre os arquivos.
+
+    Um "universo" (municípios, estabelecimentos, profissionais, vínculos e
+    serviços) é sorteado uma vez a partir de (scale, seed). Cada vínculo e
+    serviço tem início/fim em meses absolutos, então meses consecutivos
+    compartilham quase todas as linhas (churn pequeno e tendência suave),
+    como nos dados reais. O nº de vínculos por município é proporcional à
+    população, para que PROFISSIONAIS_POR_1000 tenha sinal.
+
+    Peculiaridades reproduzidas: latin-1 com acentos, campos entre aspas,
+    zeros à esquerda, espaços sobrando, colunas DT_ATUALIZACAO repetidas
+    entre arquivos, CO_MUNICIPIO_GESTOR vazio ocasional e, na população,
+    números pt-BR, valores em milhares ("12,5"), dígito perdido e buracos.
+
+        gen = SyntheticCnes(scale=1.0)
+        gen.write_month(bronze.fs, "202401")
+        gen.write_populacao(bronze.fs, [2023, 2024])
+    """
+
+    def __init__(self, scale: float = 1.0, seed: int = 42):
+        if scale <= 0:
+            raise ValueError("scale deve ser > 0")
+        self.scale = scale
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._municipios = self._build_municipios(rng, max(8, round(BASE_MUNICIPIOS * scale)))
+        self._estabelecimentos = self._build_estabelecimentos(rng, max(20, round(BASE_ESTABELECIMENTOS * scale)))
+        self._profissionais = self._build_profissionais(rng, max(50, round(BASE_PROFISSIONAIS * scale)))
+        self._vinculos = self._build_vinculos(rng)
+        self._classificacoes = self._build_classificacoes()
+        self._servicos_estab = self._build_servicos_estab(rng)
+
+    # ------------------------------
+    # Universo
+    # ------------------------------
+    @staticmethod
+    def _lifetimes(rng, n: int) -> tuple[np.ndarray, np.ndarray]:
+        start = _EPOCH + rng.integers(*_START_RANGE, size=n)
+        end = start + 1 + rng.exponential(_MEAN_DURATION, size=n).astype(np.int64)
+        return start, end
+
+    def _build_municipios(self, rng, n: int) -> pd.DataFrame:
+        uf_idx = rng.choice(len(UFS), size=n, p=[u[4] for u in UFS])
+        uf_idx[0] = 0  # sempre há pelo menos um município de SP (filtro CO_ESTADO_GESTOR == 35)
+
+        rows, seq = [], {}
+        for i, k in enumerate(uf_idx):
+            co_uf, sigla, no_uf, regiao, _ = UFS[k]
+            seq[co_uf] = seq.get(co_uf, 0) + 1
+            code6 = f"{co_uf}{seq[co_uf]:04d}"
+            j = i % (len(_CITY_A) * len(_CITY_B) * len(_CITY_C))
+            name = (f"{_CITY_A[j % len(_CITY_A)]} {_CITY_B[(j // len(_CITY_A)) % len(_CITY_B)]}"
+                    f"{_CITY_C[j // (len(_CITY_A) * len(_CITY_B))]}")
+            if i >= len(_CITY_A) * len(_CITY_B) * len(_CITY_C):
+                name = f"{name} {i}"
+            rows.append((code6, co_uf, sigla, no_uf, regiao, name))
+
+        df = pd.DataFrame(rows, columns=["CO_MUNICIPIO", "CO_UF", "CO_SIGLA_ESTADO", "NO_UF", "NO_REGIAO", "NOME"])
+        df["CO_MUNICIPIO_COMPLETO"] = df["CO_MUNICIPIO"] + df["CO_MUNICIPIO"].map(ibge_check_digit)
+        df["NO_MUNICIPIO"] = ascii_upper(df["NOME"])
+        df["NO_MUNICIPIO_IBGE_RAW"] = df["NOME"].str.title()
+        # população anual de referência (2024) e crescimento anual
+        df["POP_BASE"] = np.clip(rng.lognormal(mean=10.0, sigma=1.3, size=n), 800, 12_000_000).round()
+        df["GROWTH"] = rng.normal(0.008, 0.005, size=n)
+        return df
+
+    def _build_estabelecimentos(self, rng, n: int) -> pd.DataFrame:
+        mun = self._municipios
+        weights = mun["POP_BASE"].to_numpy() / mun["POP_BASE"].sum()
+        m = rng.choice(len(mun), size=n, p=weights)
+        cnes = 1_000_000 + rng.choice(9_000_000, size=n, replace=False)
+
+        df = pd.DataFrame({
+            "CO_UNIDADE": mun["CO_MUNICIPIO"].to_numpy()[m] + pd.Series(cnes).astype(str).str.zfill(7).to_numpy(),
+            "CO_CNES": pd.Series(cnes).astype(str).str.zfill(7).to_numpy(),
+            "NO_FANTASIA": [f"{_UNIT[a]} {_BAIRRO[b]}" for a, b in
+                            zip(rng.integers(len(_UNIT), size=n), rng.integers(len(_BAIRRO), size=n))],
+            "NO_BAIRRO": [_BAIRRO[b] + (" " * s) for b, s in
+                          zip(rng.integers(len(_BAIRRO), size=n), rng.choice([0, 0, 0, 1, 2], size=n))],
+            "CO_CEP": pd.Series(rng.integers(1_000_000, 99_999_999, size=n)).astype(str).str.zfill(8).to_numpy(),
+            "TP_UNIDADE": rng.choice(["01", "02", "05", "36", "39", "70"], size=n),
+            "CO_ESTADO_GESTOR": mun["CO_UF"].to_numpy()[m],
+            "CO_MUNICIPIO_GESTOR": mun["CO_MUNICIPIO"].to_numpy()[m],
+        })
+        df.loc[rng.random(n) < 0.005, "CO_MUNICIPIO_GESTOR"] = ""
+        df["_MUN"] = m
+        df["_START"], df["_END"] = self._lifetimes(rng, n)
+        df["_START"] = np.minimum(df["_START"], _EPOCH - 24)  # a maioria já existe antes da janela
+        return df
+
+    def _build_profissionais(self, rng, n: int) -> pd.DataFrame:
+        ids = rng.choice(2 ** 63 - 1, size=n, replace=False)
+        return pd.DataFrame({
+            "CO_PROFISSIONAL_SUS": [f"{x:016X}" for x in ids],
+            "NO_PROFISSIONAL": [f"{_FIRST[a]} {_LAST[b]} {_LAST[c]}" for a, b, c in
+                                zip(rng.integers(len(_FIRST), size=n), rng.integers(len(_LAST), size=n),
+                                    rng.integers(len(_LAST), size=n))],
+            "CO_CNS": pd.Series(rng.integers(10 ** 14, 10 ** 15 - 1, size=n)).astype(str).to_numpy(),
+            "_CBO": rng.choice(len(CBOS), size=n, p=np.array([c[2] for c in CBOS]) / sum(c[2] for c in CBOS)),
+        })
+
+    def _build_vinculos(self, rng) -> pd.DataFrame:
+        prof, est = self._profissionais, self._estabelecimentos
+        per_prof = rng.choice([1, 2, 3], size=len(prof), p=[0.45, 0.35, 0.20])
+        p = np.repeat(np.arange(len(prof)), per_prof)
+        n = len(p)
+
+        # estabelecimento ponderado pela população do município -> densidade ~ constante
+        est_w = self._municipios["POP_BASE"].to_numpy()[est["_MUN"].to_numpy()]
+        e = rng.choice(len(est), size=n, p=est_w / est_w.sum())
+        cbo = prof["_CBO"].to_numpy()[p]
+        other = rng.random(n) < 0.1  # às vezes o vínculo é em outra ocupação
+        cbo = np.where(other, rng.integers(len(CBOS), size=n), cbo)
+
+        df = pd.DataFrame({
+            "CO_UNIDADE": est["CO_UNIDADE"].to_numpy()[e],
+            "CO_PROFISSIONAL_SUS": prof["CO_PROFISSIONAL_SUS"].to_numpy()[p],
+            "CO_CBO": np.array([c[0] for c in CBOS])[cbo],
+            "TP_SUS_NAO_SUS": np.where(rng.random(n) < 0.85, "S", "N"),
+            "QT_CARGA_HORARIA_AMBULATORIAL": rng.choice(["0", "10", "20", "30", "40"], size=n),
+            "QT_CARGA_HORARIA_OUTROS": rng.choice(["0", "0", "4", "8"], size=n),
+            "QT_CARGA_HORARIA_HOSPITALAR": rng.choice(["0", "0", "12", "24"], size=n),
+        })
+        df = df.drop_duplicates(subset=["CO_UNIDADE", "CO_PROFISSIONAL_SUS", "CO_CBO"]).reset_index(drop=True)
+        df["_START"], df["_END"] = self._lifetimes(rng, len(df))
+        return df
+
+    @staticmethod
+    def _build_classificacoes() -> pd.DataFrame:
+        rows = [(serv, f"{k + 1:03d}", ds) for serv, dss in SERVICOS for k, ds in enumerate(dss)]
+        return pd.DataFrame(rows, columns=["CO_SERVICO_ESPECIALIZADO", "CO_CLASSIFICACAO_SERVICO",
+                                           "DS_CLASSIFICACAO_SERVICO"])
+
+    def _build_servicos_estab(self, rng) -> pd.DataFrame:
+        est, cls = self._estabelecimentos, self._classificacoes
+        per_est = rng.poisson(2.5, size=len(est))
+        e = np.repeat(np.arange(len(est)), per_est)
+        c = rng.integers(len(cls), size=len(e))
+        df = pd.DataFrame({
+            "CO_UNIDADE": est["CO_UNIDADE"].to_numpy()[e],
+            "CO_SERVICO": cls["CO_SERVICO_ESPECIALIZADO"].to_numpy()[c],
+            "CO_CLASSIFICACAO": cls["CO_CLASSIFICACAO_SERVICO"].to_numpy()[c],
+            "TP_CARACTERISTICA": rng.choice(["1", "2"], size=len(e)),
+        }).drop_duplicates(subset=["CO_UNIDADE", "CO_SERVICO", "CO_CLASSIFICACAO"]).reset_index(drop=True)
+        df["_START"], df["_END"] = self._lifetimes(rng, len(df))
+        return df
+
+    # ------------------------------
+    # Um mês (bronze)
+    # ------------------------------
+    def _month_rng(self, year_month: str):
+        digest = hashlib.sha256(f"{self.seed}:{self.scale}:{year_month}".encode()).digest()
+        return np.random.default_rng(int.from_bytes(digest[:8], "little"))
+
+    @staticmethod
+    def _active(df: pd.DataFrame, t: int) -> pd.DataFrame:
+        mask = (df["_START"].to_numpy() <= t) & (t < df["_END"].to_numpy())
+        return df.loc[mask, [c for c in df.columns if not c.startswith("_")]]
+
+    def month(self, year_month: str) -> dict[str, pd.DataFrame]:
+        """Os 7 arquivos do mês, como DataFrames de strings (colunas na ordem do DATASUS)."""
+        t = month_index(year_month)
+        rng = self._month_rng(year_month)
+        dt = f"{year_month[4:6]}/{year_month[:4]}"
+
+        est = self._active(self._estabelecimentos, t).copy()
+        est = est[["CO_UNIDADE", "CO_CNES", "NO_FANTASIA", "NO_BAIRRO", "CO_CEP", "TP_UNIDADE",
+                   "CO_ESTADO_GESTOR", "CO_MUNICIPIO_GESTOR"]]
+        est["DT_ATUALIZACAO"] = "15/" + dt
+
+        vinc = self._active(self._vinculos, t).copy()
+        vinc = vinc[vinc["CO_UNIDADE"].isin(est["CO_UNIDADE"])]
+        flip = rng.random(len(vinc)) < 0.01  # mudanças de atributo mês a mês
+        vinc.loc[flip, "TP_SUS_NAO_SUS"] = np.where(vinc.loc[flip, "TP_SUS_NAO_SUS"] == "S", "N", "S")
+        vinc["DT_ATUALIZACAO"] = "20/" + dt
+
+        prof = self._profissionais
+        prof = prof.loc[prof["CO_PROFISSIONAL_SUS"].isin(vinc["CO_PROFISSIONAL_SUS"]),
+                        ["CO_PROFISSIONAL_SUS", "NO_PROFISSIONAL", "CO_CNS"]]
+
+        serv = self._active(self._servicos_estab, t)
+        serv = serv[serv["CO_UNIDADE"].isin(est["CO_UNIDADE"])].copy()
+        serv["DT_ATUALIZACAO"] = "10/" + dt
+
+        mun = self._municipios[["CO_MUNICIPIO", "NO_MUNICIPIO", "CO_SIGLA_ESTADO"]]
+        ativ = pd.DataFrame({
+            "CO_CBO": [c[0] for c in CBOS],
+            "DS_ATIVIDADE_PROFISSIONAL": [c[1] for c in CBOS],
+            "TP_CLASSIFICACAO_PROFISSIONAL": ["1"] * len(CBOS),
+        })
+        cls = self._classificacoes.copy()
+        cls["DT_ATUALIZACAO"] = "01/" + dt
+
+        return {
+            "tbEstabelecimento": est.reset_index(drop=True),
+            "tbMunicipio": mun.reset_index(drop=True),
+            "tbCargaHorariaSus": vinc.reset_index(drop=True),
+            "tbAtividadeProfissional": ativ,
+            "tbDadosProfissionalSus": prof.reset_index(drop=True),
+            "rlEstabServClass": serv.reset_index(drop=True),
+            "tbClassificacaoServico": cls,
+        }
+
+    def write_month(self, fs_client, year_month: str) -> dict[str, int]:
+        """Grava bronze/<ym>/<tabela><ym>.csv; retorna {tabela: nº de linhas}."""
+        counts = {}
+        for table, df in self.month(year_month).items():
+            fs_client.get_file_client(f"{year_month}/{table}{year_month}.csv").upload_data(
+                to_bronze_csv(df), overwrite=True
+            )
+            counts[table] = len(df)
+        return counts
+
+    # ------------------------------
+    # População (bronze/populacao/populacao_estados.csv)
+    # ------------------------------
+    def populacao(self, years: list[int]) -> pd.DataFrame:
+        """Formato largo do IBGE: uma coluna por ano, números pt-BR como texto."""
+        rng = np.random.default_rng(self.seed + 1)
+        mun = self._municipios
+        years = sorted(int(y) for y in years)
+
+        out = pd.DataFrame({
+            "CO_MUNICIPIO": mun["CO_MUNICIPIO_COMPLETO"].str[2:],
+            "NO_MUNICIPIO": mun["NO_MUNICIPIO_IBGE_RAW"],
+            "CO_UF": mun["CO_UF"],
+            "NO_UF": mun["NO_UF"],
+            "NO_REGIAO": mun["NO_REGIAO"],
+            "CO_MUNICIPIO_COMPLETO": mun["CO_MUNICIPIO_COMPLETO"],
+        })
+        for y in years:
+            values = np.round(mun["POP_BASE"] * (1 + mun["GROWTH"]) ** (y - 2024)).astype(np.int64)
+            text = values.map(lambda v: f"{v:,}".replace(",", "."))
+            u = rng.random(len(values))
+            big = values >= 10_000
+            thousands = big & (values < 100_000) & (values % 1000 >= 100)
+            text = text.mask(u < 0.02, "")                                              # buraco
+            text = text.mask((u >= 0.02) & (u < 0.03) & thousands,                      # em milhares
+                             (values / 1000).round(1).map(lambda v: f"{v}".replace(".", ",")))
+            text = text.mask((u >= 0.03) & (u < 0.04) & big,                            # dígito perdido
+                             (values // 10).map(lambda v: f"{v:,}".replace(",", ".")))
+            out[str(y)] = text
+        return out
+
+    def write_populacao(self, fs_client, years: list[int]) -> int:
+        df = self.populacao(years)
+        fs_client.get_file_client(POPULACAO_PATH).upload_data(df.to_csv(index=False).encode("utf-8"),
+                                                              overwrite=True)
+        return len(df)
+
+
+def generate_bronze(fs_client, year_months: list[str], scale: float = 1.0, seed: int = 42) -> dict:
+    """Gera os meses pedidos + a população (anos dos meses, com um ano de folga antes)."""
+    gen = SyntheticCnes(scale=scale, seed=seed)
+    counts = {ym: gen.write_month(fs_client, ym) for ym in year_months}
+    years = sorted({int(ym[:4]) for ym in year_months})
+    counts["populacao"] = gen.write_populacao(fs_client, list(range(years[0] - 1, years[-1] + 1)))
+    return counts
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from src.main.data_domains.cnes.cnes_cubo import CnesCubo, _month_index
+
+SP, RJ = 355030, 330455
+
+
+def _base(rows):
+    """(profissional, município, AAAAMM) -> base distinta como a de CnesCubo._base."""
+    df = pd.DataFrame(rows, columns=["PROF", "CO_MUNICIPIO_SEM_DIGITO", "PERIODO"])
+    co_uf = df["CO_MUNICIPIO_SEM_DIGITO"].astype(str).str[:2]
+    return pd.DataFrame({
+        "PROF": df["PROF"],
+        "NO_REGIAO": "Sudeste",
+        "CO_UF": co_uf,
+        "SG_UF": co_uf.map({"35": "SP", "33": "RJ"}),
+        "CO_MUNICIPIO_SEM_DIGITO": df["CO_MUNICIPIO_SEM_DIGITO"].astype("Int64"),
+        "GRUPO_ESPECIALIDADE": "MEDICOS CLINICOS",
+        "DS_ATIVIDADE_PROFISSIONAL": "MEDICO CLINICO",
+        "MES": _month_index(df["PERIODO"]),
+    })
+
+
+def _level(base, geo):
+    cubo = object.__new__(CnesCubo)  # sem __init__: não lê o lake
+    pop = pd.DataFrame({"NO_REGIAO": ["Sudeste"], "CO_UF": ["35"], "SG_UF": ["SP"],
+                        "CO_MUNICIPIO_SEM_DIGITO": pd.array([SP], dtype="Int64"),
+                        "MES": _month_index(pd.Series([202401])), "POPULACAO_MENSAL": [2000]})
+    months = np.sort(base["MES"].unique())
+    return cubo._level(base, pop, geo, "", True, months).set_index(
+        [*(["CO_MUNICIPIO_SEM_DIGITO"] if geo == "municipio" else []), "PERIODO"])
+
+
+def test_window_counts_distinct_professionals_across_gap():
+    # profissional 1 em dois municípios; 202403 ausente da silver
+    base = _base([(1, SP, 202401), (1, RJ, 202401), (2, SP, 202402), (1, SP, 202404)])
+
+    brasil = _level(base, "brasil")
+    assert list(brasil.index) == [202401, 202402, 202404]  # mês sem silver não vira zero
+    assert brasil["TOTAL_PROFISSIONAIS"].tolist() == [1, 1, 1]  # 1 conta uma vez no país
+    assert brasil["PROFISSIONAIS_12M"].tolist() == [1, 2, 2]
+    assert brasil["MESES_12M"].tolist() == [1, 2, 3]  # a lacuna não conta na janela
+    assert brasil["MEDIA_12M"].tolist() == [1.0, 1.0, 1.0]
+
+    municipio = _level(base, "municipio")
+    assert municipio.loc[(SP, 202401), "TOTAL_PROFISSIONAIS"] == 1
+    assert municipio.loc[(RJ, 202401), "TOTAL_PROFISSIONAIS"] == 1
+    assert municipio.loc[(SP, 202401), "PROFISSIONAIS_POR_1000"] == 0.5
+    # RJ sem ninguém depois de 202401, mas ainda na janela
+    assert municipio.loc[(RJ, 202404), "TOTAL_PROFISSIONAIS"] == 0
+    assert municipio.loc[(RJ, 202404), "PROFISSIONAIS_12M"] == 1
+    assert municipio.loc[(SP, 202404), "PROFISSIONAIS_12M"] == 2
+    assert municipio.loc[(RJ, 202404), "MEDIA_12M"] == 1 / 3  # (1 + 0 + 0) / 3 meses carregados
+    assert municipio.loc[(RJ, 202404), "MESES_12M"] == 3
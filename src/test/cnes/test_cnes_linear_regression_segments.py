@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.main.data_domains.cnes.models.cnes_linear_regression import CAT_COLS, NUM_COLS
+from src.main.data_domains.cnes.models.cnes_linear_regression_segments import (
+    THRESHOLDS, CnesLinearRegressionSegments, _fit_segment,
+)
+
+
+def _segment_metrics(noise: float) -> dict:
+    """Treina o segmento "tudo" sobre 24 meses sintéticos; alvo = rolling3 + ruído."""
+    rng = np.random.default_rng(0)
+    n_series, n_months = 40, 24
+    n = n_series * n_months
+    num = rng.uniform(0.5, 3.0, size=(n, len(NUM_COLS)))
+    num[:, NUM_COLS.index("POPULACAO_MENSAL")] = 30_000
+    y = num[:, NUM_COLS.index("rolling3")] + rng.normal(0, noise, n)
+    dates = np.repeat(pd.date_range("2023-01-01", periods=n_months, freq="MS").to_numpy(), n_series)
+    cat_codes = np.column_stack([np.tile(np.arange(n_series) % 4, n_months) for _ in CAT_COLS]).astype(np.int32)
+    categories = [[f"{c}_{i}" for i in range(4)] for c in CAT_COLS]
+    _, pipe, metrics, _ = _fit_segment("tudo", (None, None), cat_codes, categories, num, y, dates)
+    assert pipe is not None
+    return metrics
+
+
+def test_well_fitting_segment_passes_qc():
+    metrics = _segment_metrics(noise=0.001)
+    assert metrics["MAE"] < THRESHOLDS["MAE"]  # erro baixo é bom: não pode reprovar
+    CnesLinearRegressionSegments.check_thresholds(metrics, THRESHOLDS)
+
+
+def test_bad_segment_fails_qc():
+    metrics = _segment_metrics(noise=1.0)
+    with pytest.raises(ValueError, match="QC falhou"):
+        CnesLinearRegressionSegments.check_thresholds(metrics, THRESHOLDS)
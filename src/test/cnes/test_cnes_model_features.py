@@ -0,0 +1,71 @@
+import io
+import math
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.main.core.infra.storage import gold as gold_store
+from src.main.data_domains.cnes.cnes_model_features import METRICS_TABLE, CnesModelFeatures
+
+SP = 355030
+
+
+def _metrics(rows):
+    """(atividade, AAAAMM, alvo) -> linhas da metrics como gravadas em gold."""
+    return pd.DataFrame({
+        "CO_MUNICIPIO_SEM_DIGITO": SP,
+        "DS_ATIVIDADE_PROFISSIONAL": [a for a, _, _ in rows],
+        "NO_MUNICIPIO": "SAO PAULO",
+        "YYYY": [int(ym[:4]) for _, ym, _ in rows],
+        "MM": [ym[4:] for _, ym, _ in rows],
+        "POPULACAO_MENSAL": 2000.0,
+        "GROWTH_PCT": 0.0,
+        "TOTAL_PROFISSIONAIS": 1,
+        "PROFISSIONAIS_POR_1000": [v for _, _, v in rows],
+    })
+
+
+def _write_metrics(df):
+    for yyyy, part in df.groupby("YYYY"):
+        buf = io.BytesIO()
+        pq.write_table(pa.Table.from_pandas(part.reset_index(drop=True), preserve_index=False), buf)
+        gold_store.fs.get_file_client(f"{METRICS_TABLE}/YYYY={yyyy}/data.parquet").upload_data(
+            buf.getvalue(), overwrite=True)
+    # partição fora da janela: ilegível, falharia se fosse baixada
+    gold_store.fs.get_file_client(f"{METRICS_TABLE}/YYYY=2022/data.parquet").upload_data(
+        b"not parquet", overwrite=True)
+
+
+def test_features_use_calendar_months_across_gaps_and_year_boundary():
+    _write_metrics(_metrics([
+        ("CHEIA", "202311", 100.0),  # antes da janela
+        ("CHEIA", "202312", 1.0),
+        ("CHEIA", "202401", 2.0),
+        ("CHEIA", "202402", 4.0),
+        ("CHEIA", "202403", 999.0),  # depois do período
+        ("LACUNA", "202312", 3.0),  # sem 202401
+        ("LACUNA", "202402", 6.0),
+        ("NO_MEIO", "202401", 5.0),  # começa dentro da janela
+        ("NO_MEIO", "202402", 7.0),
+        ("NOVA", "202402", 8.0),
+    ]))
+
+    features = CnesModelFeatures("202402")
+    # só o mês e os 2 anteriores chegam do lake
+    assert CnesModelFeatures._periods(features.inputs["metrics"]) == ["202312", "202401", "202402"]
+
+    out = features.definition().set_index("DS_ATIVIDADE_PROFISSIONAL")
+    assert sorted(out.index) == ["CHEIA", "LACUNA", "NOVA", "NO_MEIO"]
+
+    assert out.loc["CHEIA", "lag1"] == 2.0
+    assert out.loc["CHEIA", "rolling3"] == (1.0 + 2.0 + 4.0) / 3
+    assert math.isnan(out.loc["LACUNA", "lag1"])  # 202401 ausente: não usa 202312
+    assert math.isnan(out.loc["LACUNA", "rolling3"])
+    assert out.loc["NO_MEIO", "lag1"] == 5.0
+    assert math.isnan(out.loc["NO_MEIO", "rolling3"])  # falta 202312
+    assert math.isnan(out.loc["NOVA", "lag1"])
+
+    # 2000-01 -> 1; 2024-02 = 24 anos + 1 mês depois
+    assert (out["time_index"] == 24 * 12 + 1 + 1).all()
+    assert (out["date"] == pd.Timestamp("2024-02-01")).all()
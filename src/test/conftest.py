@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# storage.py cria os clientes na importação: testes sempre no backend local, num diretório descartável
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["STORAGE_LOCAL_ROOT"] = tempfile.mkdtemp(prefix="cnes-test-lake-")
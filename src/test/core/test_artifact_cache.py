@@ -0,0 +1,25 @@
+import os
+
+import joblib
+
+from src.main.core.infra.local_storage import LocalFileSystemClient
+from src.main.core.layers.models.cache import ArtifactCache
+
+
+def test_new_etag_replaces_the_cached_copy(tmp_path):
+    fs = LocalFileSystemClient(str(tmp_path / "lake"))
+    cache = ArtifactCache(fs, cache_dir=str(tmp_path / "cache"))
+
+    def publish(obj):
+        path = tmp_path / "model.joblib"
+        joblib.dump(obj, path)
+        fs.get_file_client("m/model.joblib").upload_data(path.read_bytes(), overwrite=True)
+
+    publish({"v": 1})
+    _, first = cache.get("m/model.joblib")
+    publish({"v": 2, "pad": "x" * 100})
+    obj, second = cache.get("m/model.joblib")
+
+    assert first != second and obj["v"] == 2
+    local_dir = tmp_path / "cache" / cache._safe("m/model.joblib")
+    assert os.listdir(local_dir) == [f"{cache._safe(second)}.joblib"]
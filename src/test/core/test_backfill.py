@@ -0,0 +1,160 @@
+import threading
+import time
+
+from src.main.core.infra.backfill import run_worker
+from src.main.core.infra.leases import LeaseManager
+from src.main.core.infra.local_storage import LocalFileSystemClient
+
+SILVER = [("table", "silver_a", ym) for ym in ("202401", "202402", "202403", "202404")]
+GOLD = ("table", "gold_a", None)
+DEPS = {**{u: set() for u in SILVER}, GOLD: set(SILVER)}
+
+
+class FakeClock:
+    """Relógio manual compartilhado pelos LeaseManager: expiração sem sleep."""
+
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lease_is_exclusive_until_it_expires(tmp_path):
+    fs = LocalFileSystemClient(str(tmp_path))
+    clock = FakeClock()
+    unit = SILVER[0]
+    a = LeaseManager(fs, "backfills/t", owner="a", ttl=10, heartbeat=None, clock=clock)
+    b = LeaseManager(fs, "backfills/t", owner="b", ttl=10, heartbeat=None, clock=clock)
+
+    assert a.acquire(unit)
+    assert not b.acquire(unit)
+    clock.now += 11  # sem heartbeat: expira
+    assert b.acquire(unit)
+    assert not a.renew(unit)  # a percebe que perdeu
+    assert b.renew(unit)
+    b.complete(unit, outputs=[])
+    assert b.done_units() == {unit}
+    a.close(), b.close()
+
+
+def test_stale_worker_result_is_dropped(tmp_path):
+    fs = LocalFileSystemClient(str(tmp_path))
+    clock = FakeClock()
+    unit = SILVER[0]
+    a = LeaseManager(fs, "backfills/t", owner="a", ttl=10, heartbeat=None, clock=clock)
+    b = LeaseManager(fs, "backfills/t", owner="b", ttl=10, heartbeat=None, clock=clock)
+
+    def run(stage, job, ym):
+        # a trava (sem heartbeat); o lease expira e b assume e conclui a unidade
+        clock.now += 11
+        assert b.acquire(unit)
+        b.complete(unit, outputs=["b"])
+        return ["a"]
+
+    result = run_worker(a, [unit], {unit: set()}, run, poll=0)
+    assert result["stale"] == [unit] and result["ran"] == []
+    assert not a.holds(unit)
+    from src.main.core.infra.leases import unit_path
+    assert a._read(f"backfills/t/done/{unit_path(unit)}.json")["owner"] == "b"
+    a.close(), b.close()
+
+
+def test_workers_split_units_and_gold_waits_for_silver(tmp_path):
+    fs = LocalFileSystemClient(str(tmp_path))
+    events, lock = [], threading.Lock()
+
+    def run(stage, job, ym):
+        with lock:
+            events.append(("start", job, ym))
+        with lock:
+            events.append(("end", job, ym))
+        return [f"{job}/{ym}"]
+
+    workers = [threading.Thread(target=run_worker, args=(
+        LeaseManager(fs, "backfills/t", owner=f"w{i}", ttl=60, heartbeat=None), SILVER + [GOLD], DEPS, run),
+        kwargs={"poll": 0.01}) for i in range(3)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(timeout=30)
+
+    starts = [(job, ym) for kind, job, ym in events if kind == "start"]
+    assert sorted(starts) == sorted((u[1], u[2]) for u in SILVER + [GOLD])  # cada unidade uma vez
+    gold_start = events.index(("start", "gold_a", None))
+    assert all(events.index(("end", "silver_a", u[2])) < gold_start for u in SILVER)
+    assert LeaseManager(fs, "backfills/t").done_units() == set(SILVER + [GOLD])
+
+
+def test_stale_worker_does_not_write_data(tmp_path):
+    from src.main.core.infra.leases import check_fence
+
+    fs = LocalFileSystemClient(str(tmp_path))
+    clock = FakeClock()
+    unit = SILVER[0]
+    a = LeaseManager(fs, "backfills/t", owner="a", ttl=10, heartbeat=None, clock=clock)
+    b = LeaseManager(fs, "backfills/t", owner="b", ttl=10, heartbeat=None, clock=clock)
+    written = []
+
+    def run(stage, job, ym):
+        check_fence()  # lease em dia: grava
+        written.append("a:1")
+        clock.now += 11
+        assert b.acquire(unit)
+        check_fence()  # como os jobs fazem antes de cada upload
+        written.append("a:2")
+        return ["a"]
+
+    result = run_worker(a, [unit], {unit: set()}, run, poll=0)
+    assert written == ["a:1"]
+    assert result["stale"] == [unit] and a.failures() == {}
+    check_fence()  # fora do backfill não faz nada
+    a.close(), b.close()
+
+def test_cdc_months_run_in_order_with_two_workers(tmp_path):
+    from src.main.data_domains.registry import backfill_plan
+
+    units, deps = backfill_plan(["202403", "202401", "202402"], stages=["table"])
+    estab = [("table", "cnes_estabelecimentos", ym) for ym in ("202401", "202402", "202403")]
+    assert estab[0] in deps[estab[1]] and estab[1] in deps[estab[2]]
+    assert ("table", "cnes_servicos", "202401") not in deps[("table", "cnes_servicos", "202402")]
+
+    fs = LocalFileSystemClient(str(tmp_path))
+    events, lock = [], threading.Lock()
+
+    def run(stage, job, ym):
+        with lock:
+            events.append(("start", job, ym))
+        if job == "cnes_estabelecimentos":
+            time.sleep(0.05)  # dá tempo do outro worker tentar o mês seguinte
+        with lock:
+            events.append(("end", job, ym))
+        return []
+
+    # lista invertida: sem a cadeia, o worker pegaria 202403 primeiro
+    workers = [threading.Thread(target=run_worker, args=(
+        LeaseManager(fs, "backfills/t", owner=f"w{i}", ttl=60, heartbeat=None), units[::-1], deps, run),
+        kwargs={"poll": 0.01}) for i in range(2)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(timeout=30)
+
+    seq = [(kind, ym) for kind, job, ym in events if job == "cnes_estabelecimentos"]
+    assert seq == [(k, ym) for ym in ("202401", "202402", "202403") for k in ("start", "end")]
+
+
+def test_pipeline_runs_unmonthly_gold_after_monthly_silver():
+    from src.main.data_domains.registry import pipeline_units
+
+    units = pipeline_units(["202401", "202402"], stages=["table"])
+    names = [job for _, job, _ in units]
+    assert names[0] == "populacao"  # só lê o bronze
+    cubo = names.index("cnes_cubo")
+    assert all(i < cubo for i, job in enumerate(names)
+               if job in ("cnes_dimensoes", "cnes_servicos", "cnes_estabelecimentos"))
+    # metrics (gold full, particionada por ano) roda uma vez; features (por mês) depois dela
+    assert names.count("cnes_estabelecimentos_metrics") == 1
+    metrics = names.index("cnes_estabelecimentos_metrics")
+    assert units[metrics - 1][2] == "202402" and metrics < cubo  # depois do último mês
+    assert [ym for _, job, ym in units[metrics:] if job == "cnes_model_features"] == ["202401", "202402"]
@@ -0,0 +1,63 @@
+import pandas as pd
+import pyarrow as pa
+
+from src.main.core.infra.local_storage import LocalFileSystemClient
+from src.main.core.layers import cdc
+
+
+def _snapshot(rows):
+    df = pd.DataFrame(rows, columns=["SK_REGISTRO", "TP_SUS_NAO_SUS", "YYYYMM"])
+    df[cdc.HASH_COL] = cdc.row_hash(df, cdc.value_columns(df, "SK_REGISTRO", ["YYYYMM"]))
+    return df
+
+
+def _write(fs, path, df):
+    fs.get_file_client(path).upload_data(df.to_parquet(index=False), overwrite=True)
+
+
+def test_delta_classifies_rows_and_rebuilds_month(tmp_path):
+    jan = _snapshot([("a", "S", "202401"), ("b", "S", "202401"), ("c", "N", "202401")])
+    fev = _snapshot([("a", "S", "202402"), ("b", "N", "202402"), ("d", "S", "202402")])
+
+    upserts, removed = cdc.compute_delta(jan, fev, "SK_REGISTRO")
+    assert dict(zip(upserts["SK_REGISTRO"], upserts[cdc.OP_COL])) == {"b": "U", "d": "I"}
+    assert list(removed) == ["c"]
+
+    deleted = jan[jan["SK_REGISTRO"].isin(removed)].assign(**{cdc.OP_COL: "D"})
+    delta = pd.concat([upserts, deleted], ignore_index=True).assign(**{cdc.BASE_COL: "202401"})
+
+    fs = LocalFileSystemClient(str(tmp_path))
+    _write(fs, "t/202401.parquet", jan)
+    _write(fs, "t_delta/202402.parquet", delta)
+
+    rebuilt = cdc.rebuild_snapshot(fs, "t", "202402", "SK_REGISTRO").set_index("SK_REGISTRO")
+    assert rebuilt["TP_SUS_NAO_SUS"].to_dict() == {"a": "S", "b": "N", "d": "S"}
+
+
+def test_arrow_delta_matches_pandas():
+    jan = _snapshot([("a", "S", "202401"), ("b", "S", "202401"), ("c", "N", "202401")])
+    fev = pd.DataFrame([("a", "S", "202402"), ("b", "N", "202402"), ("d", "S", "202402")],
+                       columns=["SK_REGISTRO", "TP_SUS_NAO_SUS", "YYYYMM"])
+    cols = cdc.value_columns(fev, "SK_REGISTRO", ["YYYYMM"])
+    fev_pa = cdc.with_row_hash(pa.Table.from_pandas(fev), cols)
+    assert fev_pa[cdc.HASH_COL].to_pylist() == cdc.with_row_hash(fev, cols)[cdc.HASH_COL].tolist()
+
+    upserts, removed = cdc.compute_delta(pa.Table.from_pandas(jan), fev_pa, "SK_REGISTRO")
+    assert dict(zip(upserts["SK_REGISTRO"].to_pylist(), upserts[cdc.OP_COL].to_pylist())) == {"b": "U", "d": "I"}
+    assert list(removed) == ["c"]
+
+
+def test_period_delta_is_the_same_for_pandas_and_arrow():
+    jan = _snapshot([("a", "S", "202401"), ("b", "S", "202401"), ("c", "N", "202401")])
+    fev = _snapshot([("a", "S", "202402"), ("b", "N", "202402"), ("d", "S", "202402")])
+    previous = jan.to_parquet(index=False)
+
+    by_pandas = cdc.with_base(cdc.compute_period_delta(fev, "SK_REGISTRO", previous, ["YYYYMM"]), "202401")
+    by_arrow = cdc.with_base(cdc.compute_period_delta(pa.Table.from_pandas(fev), "SK_REGISTRO", previous,
+                                                      ["YYYYMM"]), "202401")
+    assert cdc.op_counts(by_pandas) == cdc.op_counts(by_arrow) == {"U": 1, "I": 1, "D": 1}
+    key = ["SK_REGISTRO"]
+    pd.testing.assert_frame_equal(by_pandas.sort_values(key, ignore_index=True),
+                                  by_arrow.to_pandas().sort_values(key, ignore_index=True), check_dtype=False)
+    deleted = by_pandas[by_pandas[cdc.OP_COL] == "D"]
+    assert deleted[["SK_REGISTRO", "YYYYMM"]].values.tolist() == [["c", "202401"]]  # valores antigos
@@ -0,0 +1,21 @@
+import io
+
+import pandas as pd
+import pyarrow as pa
+
+from src.main.core.layers import columnar
+
+
+def test_read_csv_matches_pandas_strings_and_nulls():
+    data = '"CO";"NO";"QT"\n"007";"SÃO PAULO";""\n"010";"NA";"3"\n'.encode("latin-1")
+    got = columnar.read_csv(data)
+    expected = pd.read_csv(io.BytesIO(data), sep=";", dtype=str, encoding="latin-1")
+    assert got.schema.types == [pa.large_string()] * 3
+    pd.testing.assert_frame_equal(got.to_pandas(), expected, check_dtype=False)
+
+
+def test_first_rows_to_int_and_partitions():
+    t = pa.table({"K": ["a", "b", "a", None, None], "V": ["1", "x", " 3", "4", "5"]})
+    assert columnar.first_rows(t, "K")["V"].to_pylist() == ["1", "x", "4"]
+    assert columnar.to_int(t["V"]).to_pylist() == [1, None, 3, 4, 5]
+    assert [(v, p.num_rows) for v, p in columnar.partitions(t, "K")] == [("a", 2), ("b", 1)]
@@ -0,0 +1,44 @@
+import pandas as pd
+import pyarrow as pa
+
+from src.main.core.layers.dimensions import build_dimension, encode, gather
+
+
+def test_codes_gather_same_rows_as_inner_merge():
+    ref = pd.DataFrame({"CO_CBO": ["225125", "223505", "225125", None],
+                        "DS": ["MEDICO CLINICO", "ENFERMEIRO", "DUPLICADO", "SEM CHAVE"]})
+    fato = pd.DataFrame({"CO_CBO": ["223505", "999999", "225125", "225125"], "N": [1, 2, 3, 4]})
+
+    dim = build_dimension(ref, "CO_CBO", "SK_CBO", ["DS"])
+    assert dim["CO_CBO"].tolist() == ["223505", "225125"]  # ordenada, 1ª ocorrência, sem chave nula
+    assert dim["SK_CBO"].tolist() == [0, 1]
+
+    codes = encode(dim, "CO_CBO", fato["CO_CBO"])
+    assert codes.tolist() == [0, -1, 1, 1]
+
+    keep = codes >= 0
+    got = pd.concat([fato[keep].reset_index(drop=True), gather(dim, codes[keep], ["DS"])], axis=1)
+    expected = fato.merge(ref.drop_duplicates("CO_CBO"), on="CO_CBO", how="inner")
+    pd.testing.assert_frame_equal(got, expected)
+
+    left = gather(dim, codes, ["DS"], fill_missing=True)
+    assert left["DS"].isna().tolist() == [False, True, False, False]
+
+
+def test_composite_key():
+    ref = pd.DataFrame({"S": ["1", "1", "2"], "C": ["a", "b", "a"], "DS": ["x", "y", "z"]})
+    dim = build_dimension(ref, ["S", "C"], "SK", ["DS"])
+    fato = pd.DataFrame({"CO_SERVICO": ["2", "1", "3"], "CO_CLASS": ["a", "b", "a"]})
+    assert encode(dim, ["S", "C"], fato).tolist() == [2, 1, -1]
+
+
+def test_arrow_tables_match_pandas_codes():
+    ref = pd.DataFrame({"S": ["1", "1", "2"], "C": ["a", "b", "a"], "DS": ["x", "y", "z"]})
+    dim = build_dimension(ref, ["S", "C"], "SK", ["DS"])
+    fato = pd.DataFrame({"CO_SERVICO": ["2", "1", "3", None], "CO_CLASS": ["a", "b", "a", "a"]})
+
+    dim_pa, fato_pa = pa.Table.from_pandas(dim), pa.Table.from_pandas(fato)
+    codes = encode(dim_pa, ["S", "C"], fato_pa)
+    assert codes.tolist() == encode(dim, ["S", "C"], fato).tolist() == [2, 1, -1, -1]
+    assert encode(dim_pa, "DS", pa.chunked_array([["y", "q", None]])).tolist() == [1, -1, -1]
+    assert gather(dim_pa, codes, ["DS"], fill_missing=True)["DS"].to_pylist() == ["z", "y", None, None]
@@ -0,0 +1,80 @@
+import pyarrow as pa
+
+from src.main.core.layers.gold_query import ResidentTable
+
+
+def test_repeated_in_values_do_not_repeat_rows():
+    table = pa.table({
+        "CO_MUNICIPIO_SEM_DIGITO": [350001, 350002, 350002, 350003, 350002],
+        "DS_ATIVIDADE_PROFISSIONAL": ["A", "A", "B", "A", "A"],
+        "PERIODO": [202401, 202401, 202401, 202402, 202402],
+    })
+    resident = ResidentTable("t", table, (), list(table.column_names))
+
+    once = resident.select({"CO_MUNICIPIO_SEM_DIGITO": [350002]})
+    twice = resident.select({"CO_MUNICIPIO_SEM_DIGITO": [350002, 350002]})
+    assert once.num_rows == twice.num_rows == 3
+
+    both = resident.select({"CO_MUNICIPIO_SEM_DIGITO": ["350002", 350002],
+                            "DS_ATIVIDADE_PROFISSIONAL": ["A", "A"]})
+    assert both["PERIODO"].to_pylist() == [202401, 202402]
+
+
+def _lake(tmp_path):
+    import io
+    import pyarrow.parquet as pq
+    from types import SimpleNamespace
+    from src.main.core.infra.local_storage import LocalFileSystemClient
+
+    fs = LocalFileSystemClient(str(tmp_path))
+    for name in ("a", "b"):
+        buf = io.BytesIO()
+        pq.write_table(pa.table({"CO_MUNICIPIO_SEM_DIGITO": [1, 2], "YYYYMM": ["202401", "202401"]}), buf)
+        fs.get_file_client(f"{name}/data.parquet").upload_data(buf.getvalue(), overwrite=True)
+    return fs, SimpleNamespace(fs=fs)
+
+
+def test_loading_one_table_does_not_block_others(tmp_path):
+    import threading
+    from src.main.core.layers.gold_query import GoldQuery
+
+    _, store = _lake(tmp_path)
+    engine = GoldQuery(gold_store=store)
+    started, release = threading.Event(), threading.Event()
+    load = engine._load
+
+    def slow_load(name, files):
+        if name == "a":
+            started.set()
+            release.wait(5)
+        return load(name, files)
+
+    engine._load = slow_load
+    loader = threading.Thread(target=engine.table, args=("a",))
+    loader.start()
+    assert started.wait(5)
+    assert engine.lookup("b", CO_MUNICIPIO_SEM_DIGITO=2).num_rows == 1  # não espera a carga de "a"
+    assert loader.is_alive()  # "a" ainda carregando
+    release.set()
+    loader.join(5)
+    assert engine.lookup("a").num_rows == 2
+
+
+def test_missing_etag_falls_back_to_size_and_mtime(tmp_path):
+    from types import SimpleNamespace
+    from src.main.core.layers.gold_query import GoldQuery
+
+    fs, _ = _lake(tmp_path)
+
+    class NoEtag:  # backend sem ETag na listagem
+        def get_paths(self, path, recursive=True):
+            return [SimpleNamespace(name=p.name, is_directory=p.is_directory, etag=None,
+                                    content_length=p.content_length, last_modified=None)
+                    for p in fs.get_paths(path=path, recursive=recursive)]
+
+        def get_file_client(self, path):
+            return fs.get_file_client(path)
+
+    engine = GoldQuery(gold_store=SimpleNamespace(fs=NoEtag()), refresh_interval=0)
+    first = engine.table("a")
+    assert engine.table("a") is first  # mesmo tamanho: não relê
@@ -0,0 +1,72 @@
+import pytest
+
+from src.main.core.infra.journal import RunJournal
+from src.main.core.infra.local_storage import LocalFileSystemClient
+
+
+def test_run_unit_retries_transient_errors_and_persists(tmp_path):
+    fs = LocalFileSystemClient(str(tmp_path))
+    journal = RunJournal(fs, "r1", params={"year_months": ["202401"]})
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("timeout")
+        return ["silver/x/202401.parquet"]
+
+    assert journal.run_unit("table", "x", "202401", flaky, max_retries=2, backoff=0) == ["silver/x/202401.parquet"]
+
+    loaded = RunJournal.load(fs, "r1")
+    unit = loaded.units["table:x:202401"]
+    assert (unit["status"], unit["attempts"], unit["outputs"]) == ("done", 3, ["silver/x/202401.parquet"])
+    assert loaded.is_done("table", "x", "202401")
+    assert loaded.params == {"year_months": ["202401"]}
+
+
+def test_run_unit_does_not_retry_deterministic_errors(tmp_path):
+    journal = RunJournal(LocalFileSystemClient(str(tmp_path)), "r2")
+    calls = []
+
+    def qc_fails():
+        calls.append(1)
+        raise ValueError("QC falhou")
+
+    with pytest.raises(ValueError):
+        journal.run_unit("model", "m", None, qc_fails, max_retries=5, backoff=0)
+    assert len(calls) == 1
+    assert journal.units["model:m:-"]["status"] == "failed"
+    assert not journal.is_done("model", "m", None)
+
+
+def test_reset_from_forgets_later_stages(tmp_path):
+    journal = RunJournal(LocalFileSystemClient(str(tmp_path)), "r3")
+    for stage in ("extract", "table", "model"):
+        journal.record(stage, stage, None, "done")
+    journal.reset_from(["extract", "table", "model", "score"], "table")
+    assert journal.is_done("extract", "extract", None)
+    assert not journal.is_done("table", "table", None)
+    assert not journal.is_done("model", "model", None)
+
+
+def test_retried_unit_records_only_the_last_attempt_outputs(tmp_path, monkeypatch):
+    from src.main import cli
+    from src.main.core.infra.singleton import SingletonMeta
+
+    class Flaky(metaclass=SingletonMeta):
+        runs = 0
+
+        def __init__(self, year_month):
+            self.outputs = []
+
+        def run(self):
+            Flaky.runs += 1
+            self.outputs.append(f"silver/flaky/{Flaky.runs}.parquet")
+            if Flaky.runs == 1:
+                raise ConnectionError("timeout")
+
+    monkeypatch.setattr(cli, "get_job", lambda name: Flaky)
+    journal = RunJournal(LocalFileSystemClient(str(tmp_path)), "r3")
+    outputs = journal.run_unit("table", "flaky", "202401",
+                               lambda: cli._run_pipeline_unit("table", "flaky", "202401", {}), backoff=0)
+    assert outputs == ["silver/flaky/2.parquet"]
@@ -0,0 +1,35 @@
+import os
+import time
+
+import pytest
+
+from src.main.core.infra.profiling import Profiler
+
+
+def test_phases_outside_a_job_are_not_recorded():
+    profiler = Profiler()
+    for _ in range(3):
+        with profiler.phase("list", path="t"):
+            pass
+    assert profiler.jobs == []
+
+    with profiler.job("t", year_month="202401"):
+        with profiler.phase("download") as ph:
+            ph.bytes = 10
+    assert [p["phase"] for p in profiler.jobs[0]["phases"]] == ["download"]
+    assert profiler.jobs[0]["bytes_read"] == 10
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="amostragem de RSS requer /proc")
+def test_phase_peak_rss_is_measured_within_the_phase():
+    profiler = Profiler()
+    with profiler.job("t"):
+        with profiler.phase("fit"):
+            block = b"x" * (200 * 1024 * 1024)
+            time.sleep(0.1)  # a amostragem roda quando o GIL é liberado
+            del block
+        with profiler.phase("upload"):
+            pass
+    fit, upload = profiler.jobs[0]["phases"]
+    assert fit["peak_rss_mb"] - upload["peak_rss_mb"] > 150
+    assert profiler.jobs[0]["peak_rss_mb"] >= fit["peak_rss_mb"]
@@ -0,0 +1,27 @@
+import pytest
+
+from src.main.core.infra.table import Table
+
+
+class _Ported(Table):
+    engine = "arrow"
+    engines = ("arrow", "pandas")
+
+
+class _Legacy(Table):
+    pass
+
+
+def test_table_engine_env_applies_only_to_supported_engines(monkeypatch):
+    monkeypatch.delenv("TABLE_ENGINE", raising=False)
+    assert _Ported.resolve_engine() == "arrow" and _Legacy.resolve_engine() == "pandas"
+
+    monkeypatch.setenv("TABLE_ENGINE", "pandas")
+    assert _Ported.resolve_engine() == "pandas"
+
+    monkeypatch.setenv("TABLE_ENGINE", "arrow")
+    assert _Legacy.resolve_engine() == "pandas"  # job só tem definition pandas
+
+    monkeypatch.setenv("TABLE_ENGINE", "polars")
+    with pytest.raises(ValueError):
+        _Ported.resolve_engine()
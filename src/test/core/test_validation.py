@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from src.main.core.layers.models import time_series_cv
+
+
+class _MeanRegressor(BaseEstimator, RegressorMixin):
+    """Prevê a média do treino e anota quantas colunas recebeu no fit."""
+    n_features_seen: list = []
+
+    def fit(self, X, y):
+        _MeanRegressor.n_features_seen.append(X.shape[1])
+        self.mean_ = float(np.mean(y))
+        return self
+
+    def predict(self, X):
+        return np.full(X.shape[0], self.mean_)
+
+
+def test_encoder_vocabulary_comes_only_from_each_training_fold():
+    dates = pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01", "2024-04-01"]).repeat(2)
+    x = pd.DataFrame({"ATIVIDADE": ["A", "A", "A", "A", "A", "C", "A", "B"]})  # C só em 03, B só em 04
+    y = pd.Series([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0])
+    pipe = Pipeline([
+        ("pre", ColumnTransformer([("cat", OneHotEncoder(handle_unknown="ignore"), ["ATIVIDADE"])])),
+        ("model", _MeanRegressor()),
+    ])
+
+    _MeanRegressor.n_features_seen.clear()
+    summary = time_series_cv(pipe, x, y, dates, n_folds=2, horizon=1, n_jobs=1)
+
+    # fold 1 treina só com A; fold 2 já viu C. B (só no último teste) nunca entra no vocabulário
+    assert _MeanRegressor.n_features_seen == [1, 2]
+    assert [f["n_train"] for f in summary["folds"]] == [4, 6]
+    assert summary["folds"][1]["MAE"] == abs(7.0 - 3.5) / 2 + abs(8.0 - 3.5) / 2
@@ -0,0 +1,83 @@
+import io
+
+import pandas as pd
+import pytest
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+from src.main.core.infra.local_storage import LocalFileSystemClient
+from src.main.synthetic.cnes import SyntheticCnes, generate_bronze, ibge_check_digit, to_bronze_csv
+
+
+def _read_bronze(data: bytes) -> pd.DataFrame:
+    # mesmos parâmetros de Silver._parse_csv
+    return pd.read_csv(io.BytesIO(data), sep=";", quotechar='"', dtype=str, encoding="latin-1", engine="python")
+
+
+def test_month_keys_match_across_files():
+    month = SyntheticCnes(scale=0.1, seed=7).month("202401")
+
+    carga = month["tbCargaHorariaSus"]
+    assert set(carga["CO_UNIDADE"]) <= set(month["tbEstabelecimento"]["CO_UNIDADE"])
+    assert set(carga["CO_CBO"]) <= set(month["tbAtividadeProfissional"]["CO_CBO"])
+    assert set(carga["CO_PROFISSIONAL_SUS"]) == set(month["tbDadosProfissionalSus"]["CO_PROFISSIONAL_SUS"])
+
+    serv = month["rlEstabServClass"].merge(
+        month["tbClassificacaoServico"],
+        left_on=["CO_SERVICO", "CO_CLASSIFICACAO"],
+        right_on=["CO_SERVICO_ESPECIALIZADO", "CO_CLASSIFICACAO_SERVICO"],
+    )
+    assert len(serv) == len(month["rlEstabServClass"])
+    assert (month["tbEstabelecimento"]["CO_ESTADO_GESTOR"] == "35").any()
+
+
+def test_consecutive_months_share_most_rows_and_are_deterministic():
+    gen = SyntheticCnes(scale=0.1, seed=7)
+    a = gen.month("202401")["tbCargaHorariaSus"]
+    b = gen.month("202402")["tbCargaHorariaSus"]
+    key = ["CO_UNIDADE", "CO_PROFISSIONAL_SUS", "CO_CBO"]
+    shared = a.merge(b, on=key)
+    assert len(shared) > 0.9 * len(a)
+    pd.testing.assert_frame_equal(a, SyntheticCnes(scale=0.1, seed=7).month("202401")["tbCargaHorariaSus"])
+
+
+def test_bronze_csv_is_latin1_and_keeps_leading_zeros():
+    df = pd.DataFrame({"CO_CEP": ["01310100"], "NO_BAIRRO": ["JARDIM SÃO JOSÉ  "]})
+    data = to_bronze_csv(df)
+    with pytest.raises(UnicodeDecodeError):
+        data.decode("utf-8")
+    pd.testing.assert_frame_equal(_read_bronze(data), df)
+
+
+def test_ibge_check_digit():
+    assert ibge_check_digit("355030") == "8"  # São Paulo: 3550308
+    assert ibge_check_digit("330455") == "7"  # Rio de Janeiro: 3304557
+
+
+def test_generate_bronze_on_local_storage(tmp_path):
+    fs = LocalFileSystemClient(str(tmp_path / "bronze"))
+    counts = generate_bronze(fs, ["202312", "202401"], scale=0.1)
+
+    names = {p.name for p in fs.get_paths("202401") if not p.is_directory}
+    assert "202401/tbCargaHorariaSus202401.csv" in names
+    carga = _read_bronze(fs.get_file_client("202401/tbCargaHorariaSus202401.csv").download_file().readall())
+    assert len(carga) == counts["202401"]["tbCargaHorariaSus"]
+
+    pop = pd.read_csv(io.BytesIO(fs.get_file_client("populacao/populacao_estados.csv").download_file().readall()),
+                      dtype=str)
+    assert {"2022", "2023", "2024"} <= set(pop.columns)
+
+
+def test_local_storage_follows_sdk_contract(tmp_path):
+    fs = LocalFileSystemClient(str(tmp_path))
+    fc = fs.get_file_client("a/b/data.json")
+    fc.upload_data(b"1", overwrite=False)
+    etag = fc.get_file_properties().etag
+    with pytest.raises(ResourceExistsError):
+        fc.upload_data(b"2", overwrite=False)
+    fc.upload_data(b"3", overwrite=True)
+    assert fc.download_file().readall() == b"3"
+    assert fc.get_file_properties().etag != etag
+    with pytest.raises(ResourceNotFoundError):
+        fs.get_file_client("missing").download_file()
+    with pytest.raises(ResourceNotFoundError):
+        list(fs.get_paths("missing"))